@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 20:40
+# @Author  : fzf
+# @FileName: bench_hedging.py
+# @Software: PyCharm
+"""
+Tail latency with and without hedged requests, against a slow-replica tail.
+
+    uv run python benchmarks/bench_hedging.py [--requests 2000] [--slow-ratio 0.02]
+
+The transport answers in ~2 ms, except ``--slow-ratio`` of calls that take
+``--slow-ms`` (one slow replica). Requests are sent one at a time through
+``SyncClient``; hedging uses a fixed delay and the observed p95 (which only
+helps while fewer than 5% of calls are slow).
+"""
+import argparse
+import random
+import time
+
+from relihttp.bench.histogram import LatencyHistogram
+from relihttp.bench.result import summarize
+from relihttp.client.SyncClient import SyncClient
+from relihttp.models import Context, Response
+from relihttp.transport.base import Transport
+from relihttp.transport.faults import Fault, FaultInjectionTransport
+from relihttp.transport.hedging import HedgingTransport
+
+
+class CannedTransport(Transport):
+    def send(self, ctx: Context) -> Response:
+        return Response(
+            status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b""
+        )
+
+
+def _run(transport: Transport, requests: int) -> LatencyHistogram:
+    client = SyncClient(transport=transport, max_retries=0)
+    hist = LatencyHistogram()
+    for _ in range(requests):
+        start = time.perf_counter_ns()
+        client.get("https://example.com/items")
+        hist.record((time.perf_counter_ns() - start) // 1000)
+    return hist
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--slow-ratio", type=float, default=0.02)
+    parser.add_argument("--slow-ms", type=float, default=100.0)
+    args = parser.parse_args()
+
+    slow_s = args.slow_ms / 1000.0
+
+    def latency(rng: random.Random) -> float:
+        return slow_s if rng.random() < args.slow_ratio else 0.002
+
+    def faulty() -> Transport:
+        return FaultInjectionTransport(CannedTransport(), [Fault(latency=latency)], seed=1)
+
+    runs = {
+        "no hedging": faulty(),
+        "hedge after 10ms": HedgingTransport(faulty(), delay=0.01, budget=0.1),
+        "hedge after p95": HedgingTransport(faulty(), delay=0.01, percentile=95, budget=0.1),
+    }
+    for name, transport in runs.items():
+        summary = summarize(_run(transport, args.requests))
+        line = " ".join(f"{k}={summary[k]:.1f}" for k in ("p50", "p90", "p99", "p99.9", "max"))
+        if isinstance(transport, HedgingTransport):
+            stats = transport.stats()
+            line += f"  hedged={stats['hedged']} wins={stats['hedge_wins']}"
+            transport.close()
+        print(f"{name:<18} latency_ms {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 12:10
+# @Author  : fzf
+# @FileName: bench_json_codec.py
+# @Software: PyCharm
+"""
+Per-request JSON encode/decode cost of each installed codec.
+
+    uv run python benchmarks/bench_json_codec.py [--repeat 5]
+
+"encode" is ``codec.dumps`` of a request body, "decode" is ``Response.json()``
+on a fresh response (what a client pays per call), "request" is both.
+"""
+import argparse
+import timeit
+from typing import Any, Callable, Dict, List
+
+from relihttp.codecs import JsonCodec, available_codecs
+from relihttp.models import Response
+
+
+def _record(i: int) -> Dict[str, Any]:
+    return {
+        "id": i,
+        "name": f"user-{i}",
+        "email": f"user-{i}@example.com",
+        "active": i % 2 == 0,
+        "score": i * 1.5,
+        "tags": ["alpha", "beta", "gamma"],
+    }
+
+
+PAYLOADS: Dict[str, Any] = {
+    "small (~110 B)": _record(1),
+    "medium (~12 KB)": [_record(i) for i in range(100)],
+    "large (~1.2 MB)": [_record(i) for i in range(10_000)],
+}
+
+
+def _per_call_us(fn: Callable[[], Any], repeat: int) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e6
+
+
+def run(repeat: int) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for codec_name, codec_cls in available_codecs().items():
+        codec = codec_cls()
+        for label, payload in PAYLOADS.items():
+            body = codec.dumps(payload)
+
+            def decode(body: bytes = body, codec: JsonCodec = codec) -> Any:
+                return Response(200, {}, content=body, json_codec=codec).json()
+
+            def encode(payload: Any = payload, codec: JsonCodec = codec) -> bytes:
+                return codec.dumps(payload)
+
+            encode_us = _per_call_us(encode, repeat)
+            decode_us = _per_call_us(decode, repeat)
+            rows.append(
+                {
+                    "codec": codec_name,
+                    "payload": label,
+                    "bytes": len(body),
+                    "encode_us": encode_us,
+                    "decode_us": decode_us,
+                    "request_us": encode_us + decode_us,
+                }
+            )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats (best is kept)")
+    args = parser.parse_args()
+
+    print(f"{'codec':<9} {'payload':<17} {'bytes':>9} {'encode_us':>11} {'decode_us':>11} {'request_us':>11}")
+    for row in run(args.repeat):
+        print(
+            f"{row['codec']:<9} {row['payload']:<17} {row['bytes']:>9} "
+            f"{row['encode_us']:>11.2f} {row['decode_us']:>11.2f} {row['request_us']:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 16:55
+# @Author  : fzf
+# @FileName: bench_pipeline.py
+# @Software: PyCharm
+"""
+Per-request policy pipeline overhead: naive per-policy loop vs compiled hooks.
+
+    uv run python benchmarks/bench_pipeline.py [--requests 200000]
+
+Both pipelines run every built-in policy against a transport that returns a
+canned response, so the numbers are pure client-side overhead. "naive" calls
+every hook on every policy, as the client loops did before hooks were compiled.
+"""
+import argparse
+import asyncio
+import time
+from typing import List
+
+from relihttp.models import Context, Request, Response
+from relihttp.policies.base import Policy
+from relihttp.policies.circuit import CircuitBreakerPolicy
+from relihttp.policies.idempotency import IdempotencyPolicy
+from relihttp.policies.pipeline import Pipeline, compile_pipeline
+from relihttp.policies.rate_limit import RateLimitPolicy
+from relihttp.policies.retry import RetryPolicy
+from relihttp.policies.timeout import TimeoutPolicy
+from relihttp.policies.tracing import TracingPolicy
+
+RESPONSE = Response(status_code=200, headers={}, url="", elapsed_ms=0, content=b"")
+
+
+def _policies() -> List[Policy]:
+    return [
+        TimeoutPolicy(),
+        RetryPolicy(),
+        RateLimitPolicy(rate_limit=1e12),
+        CircuitBreakerPolicy(),
+        IdempotencyPolicy(),
+        TracingPolicy(),
+    ]
+
+
+def _ctx() -> Context:
+    return Context(request=Request(method="POST", url="https://example.com/items"), max_retries=3)
+
+
+def naive(policies: List[Policy], ctx: Context) -> None:
+    for p in policies:
+        p.before_request(ctx)
+    ctx.response = RESPONSE
+    for p in reversed(policies):
+        p.after_response(ctx)
+    for p in policies:
+        if p.should_retry(ctx):
+            float(p.get_retry_delay_seconds(ctx))
+
+
+def compiled(pipeline: Pipeline, ctx: Context) -> None:
+    for hook in pipeline.before:
+        hook(ctx)
+    ctx.response = RESPONSE
+    for hook in pipeline.after:
+        hook(ctx)
+    for wants_retry, get_delay in pipeline.retry:
+        if wants_retry(ctx):
+            float(get_delay(ctx) or 0.0)
+
+
+async def async_naive(policies: List[Policy], ctx: Context) -> None:
+    for p in policies:
+        await p.async_before_request(ctx)
+    ctx.response = RESPONSE
+    for p in reversed(policies):
+        await p.async_after_response(ctx)
+    for p in policies:
+        if await p.async_should_retry(ctx):
+            float(await p.async_get_retry_delay_seconds(ctx))
+
+
+async def async_compiled(pipeline: Pipeline, ctx: Context) -> None:
+    for hook, is_async in pipeline.async_before:
+        await hook(ctx) if is_async else hook(ctx)
+    ctx.response = RESPONSE
+    for hook, is_async in pipeline.async_after:
+        await hook(ctx) if is_async else hook(ctx)
+    for (wants_retry, retry_async), (get_delay, delay_async) in pipeline.async_retry:
+        if await wants_retry(ctx) if retry_async else wants_retry(ctx):
+            float((await get_delay(ctx) if delay_async else get_delay(ctx)) or 0.0)
+
+
+def _report(name: str, elapsed: float, n: int) -> None:
+    print(f"{name:<16} {elapsed / n * 1e6:>8.2f} us/request")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200000)
+    args = parser.parse_args()
+    n = args.requests
+
+    policies = _policies()
+    pipeline = compile_pipeline(policies)
+    print(f"policies={len(policies)} requests={n}")
+
+    for name, fn, arg in (("sync naive", naive, policies), ("sync compiled", compiled, pipeline)):
+        start = time.perf_counter()
+        for _ in range(n):
+            fn(arg, _ctx())
+        _report(name, time.perf_counter() - start, n)
+
+    async def run_async() -> None:
+        for name, fn, arg in (("async naive", async_naive, policies), ("async compiled", async_compiled, pipeline)):
+            start = time.perf_counter()
+            for _ in range(n):
+                await fn(arg, _ctx())
+            _report(name, time.perf_counter() - start, n)
+
+    asyncio.run(run_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 15:30
+# @Author  : fzf
+# @FileName: bench_shared_client.py
+# @Software: PyCharm
+"""
+Throughput of one shared SyncClient vs one client per thread vs one per request.
+
+    uv run python benchmarks/bench_shared_client.py [--threads 64] [--requests 20000]
+
+Runs against an in-process stub server with every built-in policy enabled.
+On a free-threaded CPython build (3.13t+) the GIL status is printed so runs
+can be compared across builds.
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from relihttp.client.SyncClient import SyncClient
+
+from stub_server import start_threaded_server
+
+
+def _make_client(threads: int) -> SyncClient:
+    return SyncClient(
+        timeout=5.0,
+        rate_limit=1_000_000,
+        circuit_breaker=True,
+        idempotency=True,
+        trace=True,
+        pool_maxsize=threads,
+    )
+
+
+def _run(threads: int, requests: int, get_client: Callable[[], SyncClient], url: str) -> float:
+    def call(_: int) -> None:
+        get_client().post(url, json={"n": 1})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    server, base_url = start_threaded_server()
+    url = base_url + "/items"
+
+    shared = _make_client(args.threads)
+    local = threading.local()
+
+    def per_thread() -> SyncClient:
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = _make_client(1)
+        return client
+
+    modes: Dict[str, Callable[[], SyncClient]] = {
+        "shared": lambda: shared,
+        "per-thread": per_thread,
+        "per-request": lambda: _make_client(1),
+    }
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"python={sys.version.split()[0]} gil_enabled={gil} threads={args.threads} requests={args.requests}")
+    for name, get_client in modes.items():
+        # warm connections/caches so every mode starts hot
+        _run(args.threads, args.threads * 4, get_client, url)
+        rps = _run(args.threads, args.requests, get_client, url)
+        print(f"{name:<12} {rps:>10.0f} req/s")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
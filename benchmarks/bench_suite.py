@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 18:50
+# @Author  : fzf
+# @FileName: bench_suite.py
+# @Software: PyCharm
+"""
+Per-request overhead of SyncClient/AsyncClient vs raw requests/aiohttp.
+
+    uv run python benchmarks/bench_suite.py [--quick] [--filter sync] [--baseline old.json]
+
+Starts threaded and asyncio stub servers in-process and sends sequential
+requests (concurrency 1), so each number is one request's latency:
+
+* policies: POST with a ~100 B JSON body, for every client policy flag
+  (``logger``, ``rate_limit``, ``circuit_breaker``, ``idempotency``,
+  ``trace``) on its own, the defaults, and all of them together;
+* bodies: GET downloads and POST uploads of 100 B, 10 KB, 1 MB and 10 MB.
+
+Results are written as JSON (``--output``, one row per case keyed by a
+stable case id). ``overhead_us`` is the mean latency minus that of the raw
+library for the same server/method/size. ``--baseline`` prints the change
+of every case against an earlier results file.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import aiohttp
+import requests
+
+from relihttp.bench.histogram import LatencyHistogram
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+
+from stub_server import payload, start_asyncio_server, start_threaded_server
+
+SCHEMA_VERSION = 1
+SIZES = {"100B": 100, "10KB": 10_000, "1MB": 1_000_000, "10MB": 10_000_000}
+POLICY_COMBOS: Dict[str, Dict[str, Any]] = {
+    "defaults": {},
+    "logger": {"logger": True},
+    "rate_limit": {"rate_limit": 1e9},
+    "circuit_breaker": {"circuit_breaker": True},
+    "idempotency": {"idempotency": True},
+    "trace": {"trace": True},
+    "all": {
+        "logger": True,
+        "rate_limit": 1e9,
+        "circuit_breaker": True,
+        "idempotency": True,
+        "trace": True,
+    },
+}
+# ~100 B of JSON once encoded
+SMALL_JSON = {"id": 1, "name": "relihttp", "tags": ["a", "b", "c"], "pad": "x" * 40}
+# cap on bytes moved per case, so the 10 MB cases don't run for minutes
+BYTES_PER_CASE = 200_000_000
+TIMEOUT = 60.0
+
+
+class Case:
+    def __init__(self, stack: str, server: str, policies: str, method: str, size: str) -> None:
+        self.stack, self.server, self.policies = stack, server, policies
+        self.method, self.size = method, size
+
+    @property
+    def id(self) -> str:
+        return f"{self.stack}/{self.server}/{self.policies}/{self.method}-{self.size}"
+
+    @property
+    def baseline_id(self) -> str:
+        raw = "requests" if self.stack == "relihttp-sync" else "aiohttp"
+        return f"{raw}/{self.server}/none/{self.method}-{self.size}"
+
+    @property
+    def is_raw(self) -> bool:
+        return self.stack in ("requests", "aiohttp")
+
+    def request_args(self, base_url: str) -> Dict[str, Any]:
+        size = SIZES[self.size]
+        if self.method == "GET":
+            return {"method": "GET", "url": f"{base_url}/bytes/{size}"}
+        if self.size == "100B":
+            return {"method": "POST", "url": f"{base_url}/items", "json": SMALL_JSON}
+        return {"method": "POST", "url": f"{base_url}/upload", "data": payload(size)}
+
+
+def build_cases(stacks: List[str], servers: List[str], sizes: List[str]) -> List[Case]:
+    cases = []
+    for server in servers:
+        for stack in stacks:
+            raw = stack in ("requests", "aiohttp")
+            for policies in (["none"] if raw else list(POLICY_COMBOS)):
+                cases.append(Case(stack, server, policies, "POST", "100B"))
+            for size in sizes:
+                for method in ("GET", "POST"):
+                    if method == "POST" and size == "100B":
+                        continue
+                    cases.append(Case(stack, server, "none" if raw else "defaults", method, size))
+    return cases
+
+
+def _iterations(case: Case, requests_per_case: int) -> int:
+    return max(10, min(requests_per_case, BYTES_PER_CASE // SIZES[case.size]))
+
+
+def _measure_sync(send: Callable[[], None], n: int) -> Dict[str, Any]:
+    for _ in range(max(5, n // 20)):
+        send()
+    hist = LatencyHistogram()
+    start = time.perf_counter()
+    for _ in range(n):
+        t0 = time.perf_counter_ns()
+        send()
+        hist.record((time.perf_counter_ns() - t0) // 1000)
+    return _row(hist, time.perf_counter() - start)
+
+
+async def _measure_async(send: Callable[[], Any], n: int) -> Dict[str, Any]:
+    for _ in range(max(5, n // 20)):
+        await send()
+    hist = LatencyHistogram()
+    start = time.perf_counter()
+    for _ in range(n):
+        t0 = time.perf_counter_ns()
+        await send()
+        hist.record((time.perf_counter_ns() - t0) // 1000)
+    return _row(hist, time.perf_counter() - start)
+
+
+def _row(hist: LatencyHistogram, elapsed_s: float) -> Dict[str, Any]:
+    return {
+        "n": hist.count,
+        "mean_us": round(hist.mean, 1),
+        "p50_us": hist.percentile(50),
+        "p90_us": hist.percentile(90),
+        "p99_us": hist.percentile(99),
+        "rps": round(hist.count / elapsed_s, 1),
+    }
+
+
+def run_sync_case(case: Case, base_url: str, n: int) -> Dict[str, Any]:
+    args = case.request_args(base_url)
+    if case.stack == "requests":
+        session = requests.Session()
+
+        def send() -> None:
+            r = session.request(timeout=TIMEOUT, **args)
+            r.raise_for_status()
+            _ = r.content
+    else:
+        client = SyncClient(timeout=TIMEOUT, **POLICY_COMBOS[case.policies])
+
+        def send() -> None:
+            _ = client.request(**args).content
+
+    return _measure_sync(send, n)
+
+
+async def run_async_case(case: Case, base_url: str, n: int) -> Dict[str, Any]:
+    args = case.request_args(base_url)
+    if case.stack == "aiohttp":
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as session:
+            async def send() -> None:
+                async with session.request(**args) as r:
+                    r.raise_for_status()
+                    await r.read()
+
+            return await _measure_async(send, n)
+
+    async with AsyncClient(timeout=TIMEOUT, **POLICY_COMBOS[case.policies]) as client:
+        async def send() -> None:
+            _ = (await client.request(**args)).content
+
+        return await _measure_async(send, n)
+
+
+def _print_table(rows: List[Dict[str, Any]], baseline: Optional[Dict[str, Dict[str, Any]]]) -> None:
+    header = f"{'case':<58}{'mean_us':>10}{'p99_us':>10}{'overhead_us':>13}"
+    if baseline is not None:
+        header += f"{'vs baseline':>13}"
+    print(header)
+    for row in rows:
+        line = f"{row['case']:<58}{row['mean_us']:>10.1f}{row['p99_us']:>10}"
+        overhead = row.get("overhead_us")
+        line += f"{overhead:>13.1f}" if overhead is not None else f"{'':>13}"
+        if baseline is not None:
+            old = baseline.get(row["case"])
+            if old and old["mean_us"]:
+                line += f"{(row['mean_us'] - old['mean_us']) / old['mean_us'] * 100:>+12.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per small-body case")
+    parser.add_argument("--quick", action="store_true", help="200 requests per case, no 10 MB bodies")
+    parser.add_argument("--servers", default="threaded,asyncio")
+    parser.add_argument("--stacks", default="requests,relihttp-sync,aiohttp,relihttp-async")
+    parser.add_argument("--filter", default="", help="only run cases whose id contains this")
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(__file__), "results", "suite.json"))
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    requests_per_case = 200 if args.quick else args.requests
+    sizes = [s for s in SIZES if not (args.quick and s == "10MB")]
+    cases = [
+        c
+        for c in build_cases(args.stacks.split(","), args.servers.split(","), sizes)
+        if args.filter in c.id
+    ]
+
+    servers = {}
+    if "threaded" in args.servers:
+        servers["threaded"] = start_threaded_server()
+    if "asyncio" in args.servers:
+        servers["asyncio"] = start_asyncio_server()
+
+    rows: List[Dict[str, Any]] = []
+    for case in cases:
+        base_url = servers[case.server][1]
+        n = _iterations(case, requests_per_case)
+        if case.stack in ("requests", "relihttp-sync"):
+            row = run_sync_case(case, base_url, n)
+        else:
+            row = asyncio.run(run_async_case(case, base_url, n))
+        rows.append({
+            "case": case.id,
+            "stack": case.stack,
+            "server": case.server,
+            "policies": case.policies,
+            "method": case.method,
+            "size": SIZES[case.size],
+            **row,
+        })
+
+    by_id = {row["case"]: row for row in rows}
+    for case, row in zip(cases, rows):
+        raw = by_id.get(case.baseline_id)
+        if not case.is_raw and raw is not None:
+            row["overhead_us"] = round(row["mean_us"] - raw["mean_us"], 1)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {row["case"]: row for row in json.load(f)["results"]}
+    _print_table(rows, baseline)
+
+    for server, _ in servers.values():
+        server.shutdown()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "schema": SCHEMA_VERSION,
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "requests": requests.__version__,
+                "aiohttp": aiohttp.__version__,
+                "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "requests_per_case": requests_per_case,
+            },
+            "results": sorted(rows, key=lambda r: r["case"]),
+        }, f, indent=2)
+    print(f"saved {len(rows)} cases to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 15:20
+# @Author  : fzf
+# @FileName: stub_server.py
+# @Software: PyCharm
+"""
+In-process HTTP stub servers for the benchmarks.
+
+Every GET/POST is answered with a small JSON body, except ``GET /bytes/<n>``
+which returns ``n`` bytes. Request bodies are read and discarded.
+"""
+import asyncio
+import functools
+import http.server
+import threading
+from typing import Tuple
+
+SMALL_BODY = b'{"ok":true}'
+
+
+@functools.lru_cache(maxsize=16)
+def payload(size: int) -> bytes:
+    return b"x" * size
+
+
+def response_body(method: str, path: str) -> bytes:
+    if method == "GET" and path.startswith("/bytes/"):
+        return payload(int(path[len("/bytes/"):].split("?", 1)[0]))
+    return SMALL_BODY
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Keep-alive handler for the threaded server."""
+
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; without TCP_NODELAY every
+    # response waits out the peer's delayed ACK (~40ms)
+    disable_nagle_algorithm = True
+
+    def _reply(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        body = response_body(self.command, self.path)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+class StubServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    # default backlog (5) drops connections under a 64-thread burst
+    request_queue_size = 1024
+
+
+def start_threaded_server(host: str = "127.0.0.1") -> Tuple[StubServer, str]:
+    """Start a threaded server on a free port; returns ``(server, base_url)``."""
+    server = StubServer((host, 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+async def _handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, path, _ = lines[0].split(" ", 2)
+            length = 0
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            if length:
+                await reader.readexactly(length)
+            body = response_body(method, path)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                b"Content-Length: %d\r\n\r\n" % len(body)
+            )
+            writer.write(body)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+class AsyncioStubServer:
+    """asyncio server running on its own event loop thread."""
+
+    def __init__(self, host: str = "127.0.0.1") -> None:
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(_handle_connection, host, 0, backlog=1024), self.loop
+        ).result()
+        self.server_port = self.server.sockets[0].getsockname()[1]
+
+    def shutdown(self) -> None:
+        self.loop.call_soon_threadsafe(self.server.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def start_asyncio_server(host: str = "127.0.0.1") -> Tuple[AsyncioStubServer, str]:
+    """Start an asyncio server on a free port; returns ``(server, base_url)``."""
+    server = AsyncioStubServer(host)
+    return server, f"http://{host}:{server.server_port}"
@@ -4,13 +4,32 @@
 # @FileName: __main__.py
 # @Software: PyCharm
 import argparse
+import asyncio
+import dataclasses
+import datetime
+import functools
 import json
+import platform
 import sys
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-from .client import SyncClient
+from .bench.compare import SCHEMA_VERSION, Thresholds, compare, load_report
+from .bench.engines import BenchConfig, run_async, run_threaded
+from .bench.processes import run_processes
+from .bench.result import format_report
+from .bench.scenario import load_scenario
+from .bench.simulate import SimConfig, format_table, simulate
+from .client import AsyncClient, SyncClient
+from .policies.backoff import BACKOFF_STRATEGIES
+from .transport.faults import (
+    AsyncFaultInjectionTransport,
+    Fault,
+    FaultInjectionTransport,
+    parse_faults,
+)
+from .transport.aiohttp import AiohttpTransport
+from .transport.async_base import AsyncTransport
+from .transport.replay import AsyncReplayTransport, Cassette, ReplayTransport
 
 
 def _positive_int(value: str) -> int:
@@ -23,6 +42,26 @@ def _positive_int(value: str) -> int:
     return parsed
 
 
+def _non_negative_int(value: str) -> int:
+    try:
+        parsed = int(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value}") from exc
+    if parsed < 0:
+        raise argparse.ArgumentTypeError("value must be >= 0")
+    return parsed
+
+
+def _positive_float(value: str) -> float:
+    try:
+        parsed = float(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid float value: {value}") from exc
+    if parsed <= 0:
+        raise argparse.ArgumentTypeError("value must be > 0")
+    return parsed
+
+
 def _parse_headers(values: Optional[Iterable[str]]) -> Dict[str, str]:
     headers: Dict[str, str] = {}
     if not values:
@@ -48,13 +87,59 @@ def _parse_json_payload(raw: Optional[str]) -> Optional[object]:
         raise ValueError(f"invalid json payload: {exc}") from exc
 
 
-def _build_client(timeout: Optional[float], max_retries: Optional[int]) -> SyncClient:
-    kwargs = {}
+@functools.lru_cache(maxsize=None)
+def _load_cassette(path: str) -> Cassette:
+    # shared by every client of a bench run
+    return Cassette.load(path)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_faults(path: str) -> Tuple[Fault, ...]:
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    if not isinstance(raw, list):
+        raise ValueError("faults file must hold a JSON list of rules")
+    return tuple(parse_faults(raw))
+
+
+def _build_client(
+    timeout: Optional[float],
+    max_retries: Optional[int],
+    replay: Optional[str] = None,
+    faults: Optional[str] = None,
+) -> SyncClient:
+    kwargs: Dict[str, Any] = {}
     if timeout is not None:
         kwargs["timeout"] = float(timeout)
     if max_retries is not None:
         kwargs["max_retries"] = int(max_retries)
-    return SyncClient(**kwargs)
+    if replay is not None:
+        kwargs["transport"] = ReplayTransport(_load_cassette(replay))
+    client = SyncClient(**kwargs)
+    if faults is not None:
+        client.transport = FaultInjectionTransport(client.transport, _load_faults(faults))
+    return client
+
+
+def _build_async_client(
+    timeout: Optional[float],
+    max_retries: Optional[int],
+    limit: int,
+    replay: Optional[str] = None,
+    faults: Optional[str] = None,
+) -> AsyncClient:
+    kwargs: Dict[str, Any] = {}
+    if timeout is not None:
+        kwargs["timeout"] = float(timeout)
+    if max_retries is not None:
+        kwargs["max_retries"] = int(max_retries)
+    transport: Optional[AsyncTransport] = None
+    if replay is not None:
+        transport = AsyncReplayTransport(_load_cassette(replay))
+    if faults is not None:
+        inner = transport or AiohttpTransport(limit=limit)
+        transport = AsyncFaultInjectionTransport(inner, _load_faults(faults))
+    return AsyncClient(transport=transport, limit=limit, **kwargs)
 
 
 def _handle_test(args: argparse.Namespace) -> int:
@@ -89,60 +174,171 @@ def _handle_test(args: argparse.Namespace) -> int:
     return 0
 
 
-def _bench_request(
-    url: str,
-    timeout: Optional[float],
-    max_retries: Optional[int],
-) -> Tuple[bool, Optional[int], Optional[int], Optional[str]]:
-    client = _build_client(timeout, max_retries)
-    try:
-        response = client.get(url, timeout=timeout, max_retries=max_retries)
-    except Exception as exc:
-        return False, None, None, str(exc)
-    if response is None:
-        return False, None, None, "no response"
-    return True, int(response.elapsed_ms), int(response.status_code), None
+def _client_factory(args: argparse.Namespace) -> Callable[[], Any]:
+    if args.engine == "async":
+        # one AsyncClient per event loop; its connector is sized to the loop's concurrency
+        limit = -(-args.concurrency // args.processes)
+        return functools.partial(
+            _build_async_client, args.timeout, args.max_retries, limit, args.replay, args.faults
+        )
+    # one client per worker: connections are reused across its requests
+    return functools.partial(
+        _build_client, args.timeout, args.max_retries, args.replay, args.faults
+    )
 
 
 def _handle_bench(args: argparse.Namespace) -> int:
-    start = time.perf_counter()
-    durations: List[int] = []
-    failures: List[str] = []
-
-    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
-        futures = [
-            executor.submit(_bench_request, args.url, args.timeout, args.max_retries)
-            for _ in range(args.requests)
-        ]
-        for future in as_completed(futures):
-            ok, elapsed_ms, _status, error = future.result()
-            if ok and elapsed_ms is not None:
-                durations.append(elapsed_ms)
-            else:
-                failures.append(error or "unknown error")
-
-    total_time_ms = int((time.perf_counter() - start) * 1000)
-    success = len(durations)
-    failed = len(failures)
+    args.started_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    scenario = None
+    if args.scenario:
+        try:
+            scenario = load_scenario(args.scenario)
+        except (OSError, ValueError) as exc:
+            print(str(exc), file=sys.stderr)
+            return 2
 
-    print(
-        f"total={args.requests} success={success} failed={failed} "
-        f"concurrency={args.concurrency} total_time_ms={total_time_ms}"
-    )
-    if durations:
-        durations.sort()
-        avg_ms = sum(durations) / len(durations)
-        print(
-            f"min_ms={durations[0]} avg_ms={avg_ms:.2f} "
-            f"max_ms={durations[-1]}"
-        )
+    if args.replay:
+        try:
+            _load_cassette(args.replay)
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"invalid cassette: {exc}", file=sys.stderr)
+            return 2
+
+    if args.faults:
+        try:
+            _load_faults(args.faults)
+        except (OSError, ValueError, TypeError) as exc:
+            print(f"invalid faults: {exc}", file=sys.stderr)
+            return 2
+
+    config = BenchConfig(
+        url=args.url,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        warmup=args.warmup,
+        timeout=args.timeout,
+        max_retries=args.max_retries,
+        rate=args.rate,
+        scenario=scenario,
+    )
+    factory = _client_factory(args)
+    if args.processes > 1:
+        try:
+            result = run_processes(config, args.engine, args.processes, factory)
+        except (RuntimeError, ValueError) as exc:
+            print(str(exc), file=sys.stderr)
+            return 2
+    elif args.engine == "async":
+        result = asyncio.run(run_async(config, factory))
     else:
-        print("no successful responses")
+        result = run_threaded(config, factory)
+    if args.output == "json":
+        report = {"schema": SCHEMA_VERSION, "meta": _bench_meta(args), "result": result.to_dict()}
+        print(json.dumps(report, indent=2))
+    else:
+        print(format_report(result, args.concurrency, args.rate))
+    return 0 if result.failed == 0 else 1
+
 
-    if failures:
-        sample = "; ".join(failures[:3])
-        print(f"sample_errors={sample}")
-    return 0 if failed == 0 else 1
+# run settings that make two reports comparable
+_COMPARABLE = ("url", "engine", "processes", "concurrency", "rate", "scenario", "replay", "faults")
+
+
+def _bench_meta(args: argparse.Namespace) -> Dict[str, object]:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+
+        relihttp_version = version("relihttp")
+    except PackageNotFoundError:
+        relihttp_version = "unknown"
+    return {
+        "relihttp": relihttp_version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "started_at": args.started_at,
+        "url": args.url,
+        "engine": args.engine,
+        "processes": args.processes,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "rate": args.rate,
+        "scenario": args.scenario,
+        "replay": args.replay,
+        "faults": args.faults,
+        "timeout": args.timeout,
+        "max_retries": args.max_retries,
+    }
+
+
+def _handle_bench_compare(args: argparse.Namespace) -> int:
+    try:
+        old_meta, old = load_report(args.old)
+        new_meta, new = load_report(args.new)
+    except (OSError, ValueError) as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+    print(f"old: relihttp {old_meta.get('relihttp')} at {old_meta.get('started_at')}")
+    print(f"new: relihttp {new_meta.get('relihttp')} at {new_meta.get('started_at')}")
+    for key in _COMPARABLE:
+        if old_meta.get(key) != new_meta.get(key):
+            print(f"warning: {key} differs ({old_meta.get(key)!r} vs {new_meta.get(key)!r})")
+
+    thresholds = Thresholds(
+        latency_pct=args.latency_threshold,
+        throughput_pct=args.throughput_threshold,
+        error_rate_pp=args.error_rate_threshold,
+    )
+    lines, regressions = compare(old, new, thresholds)
+    print("\n".join(lines))
+    if regressions:
+        print("regressed: " + ", ".join(regressions))
+        return 1
+    return 0
+
+
+def _parse_window(value: str) -> Tuple[float, float]:
+    try:
+        start, end = (float(part) for part in value.split(":", 1))
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"invalid window: {value}. expected START:END") from exc
+    return start, end
+
+
+def _handle_simulate(args: argparse.Namespace) -> int:
+    try:
+        config = SimConfig(
+            clients=args.clients,
+            rate=args.rate,
+            capacity=args.capacity,
+            burst=args.burst,
+            outage_start=args.outage[0],
+            outage_end=args.outage[1],
+            degraded=args.degraded,
+            duration=args.duration,
+            arrivals=args.arrivals,
+            max_retries=args.max_retries,
+            base_delay=args.base_delay,
+            max_delay=args.max_delay,
+            seed=args.seed,
+        )
+    except ValueError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+
+    results = [simulate(name, config) for name in args.strategy or BACKOFF_STRATEGIES]
+    if args.output == "json":
+        report = {"config": dataclasses.asdict(config), "results": [r.to_dict() for r in results]}
+        print(json.dumps(report, indent=2))
+        return 0
+    print(
+        f"{config.clients} clients x {config.rate:g} req/s ({config.arrivals}), "
+        f"capacity {config.capacity:g} req/s, outage {config.outage_start:g}-"
+        f"{config.outage_end:g}s at {config.degraded:.0%}, {config.max_retries} attempts"
+    )
+    print(format_table(results))
+    return 0
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -172,12 +368,12 @@ def _build_parser() -> argparse.ArgumentParser:
     test_parser.set_defaults(func=_handle_test)
 
     bench_parser = subparsers.add_parser("bench", help="basic benchmark")
-    bench_parser.add_argument("url", help="request url")
+    bench_parser.add_argument("url", help="request url (base url with --scenario)")
     bench_parser.add_argument(
         "--concurrency",
         type=_positive_int,
         default=10,
-        help="number of concurrent workers",
+        help="number of concurrent workers (threads, or in-flight requests for --engine async)",
     )
     bench_parser.add_argument(
         "--requests",
@@ -185,10 +381,127 @@ def _build_parser() -> argparse.ArgumentParser:
         default=100,
         help="total requests",
     )
+    bench_parser.add_argument(
+        "--engine",
+        choices=["thread", "async"],
+        default="thread",
+        help="thread: SyncClient per worker thread; async: one AsyncClient on an event loop",
+    )
+    bench_parser.add_argument(
+        "--scenario",
+        help="JSONL endpoint mix (method, path, headers, json/body, weight) "
+        "or an access log to replay against url",
+    )
+    bench_parser.add_argument(
+        "--replay",
+        help="answer requests from a recorded cassette (JSONL) instead of the network",
+    )
+    bench_parser.add_argument(
+        "--faults",
+        help="JSON list of fault rules (latency, timeout/reset/status rates, url match, "
+        "after/until window) injected into every request",
+    )
+    bench_parser.add_argument(
+        "--processes",
+        type=_positive_int,
+        default=1,
+        help="worker processes, each running its own engine; "
+        "--requests/--concurrency/--rate/--warmup are split across them",
+    )
+    bench_parser.add_argument(
+        "--rate",
+        type=_positive_float,
+        help="open-loop: send at a fixed N requests/second and report latency "
+        "from each request's intended send time (--concurrency caps in-flight requests)",
+    )
+    bench_parser.add_argument(
+        "--warmup",
+        type=_non_negative_int,
+        default=0,
+        help="requests sent before measuring, excluded from results",
+    )
     bench_parser.add_argument("--timeout", type=float, help="request timeout in seconds")
     bench_parser.add_argument("--max-retries", type=int, help="max retries (including first try)")
+    bench_parser.add_argument(
+        "--output",
+        choices=["text", "json"],
+        default="text",
+        help="json: full histograms, per-status counts and run metadata, for bench-compare",
+    )
     bench_parser.set_defaults(func=_handle_bench)
 
+    compare_parser = subparsers.add_parser(
+        "bench-compare",
+        help="compare two 'bench --output json' reports; exit 1 on regression",
+    )
+    compare_parser.add_argument("old", help="baseline report")
+    compare_parser.add_argument("new", help="candidate report")
+    compare_parser.add_argument(
+        "--latency-threshold",
+        type=float,
+        default=10.0,
+        help="allowed slowdown of any latency percentile, in percent (default 10)",
+    )
+    compare_parser.add_argument(
+        "--throughput-threshold",
+        type=float,
+        default=10.0,
+        help="allowed throughput drop, in percent (default 10)",
+    )
+    compare_parser.add_argument(
+        "--error-rate-threshold",
+        type=float,
+        default=1.0,
+        help="allowed error rate increase, in percentage points (default 1)",
+    )
+    compare_parser.set_defaults(func=_handle_bench_compare)
+
+    sim_parser = subparsers.add_parser(
+        "simulate",
+        help="compare retry backoff strategies against a capacity-limited server "
+        "on a virtual clock (no network)",
+    )
+    sim_parser.add_argument(
+        "--strategy",
+        action="append",
+        choices=sorted(BACKOFF_STRATEGIES),
+        help="backoff strategy, repeatable (default: all)",
+    )
+    sim_parser.add_argument("--clients", type=_positive_int, default=100)
+    sim_parser.add_argument(
+        "--rate", type=_positive_float, default=1.0, help="requests/second per client"
+    )
+    sim_parser.add_argument(
+        "--capacity", type=_positive_float, default=120.0, help="requests/second the server serves"
+    )
+    sim_parser.add_argument(
+        "--burst", type=_positive_float, default=20.0, help="requests the server absorbs at once"
+    )
+    sim_parser.add_argument(
+        "--outage",
+        type=_parse_window,
+        default=(10.0, 20.0),
+        help="START:END seconds during which capacity drops to --degraded (default 10:20)",
+    )
+    sim_parser.add_argument(
+        "--degraded", type=float, default=0.0, help="fraction of capacity left during the outage"
+    )
+    sim_parser.add_argument("--duration", type=_positive_float, default=60.0)
+    sim_parser.add_argument(
+        "--arrivals",
+        choices=["poisson", "aligned"],
+        default="poisson",
+        help="poisson: independent clients; aligned: every client fires on the same tick",
+    )
+    sim_parser.add_argument(
+        "--max-retries", type=_positive_int, default=3, help="max attempts (including first try)"
+    )
+    sim_parser.add_argument("--base-delay", type=_positive_float, default=0.2)
+    sim_parser.add_argument("--max-delay", type=_positive_float, default=5.0)
+    sim_parser.add_argument("--seed", type=int, default=1)
+    sim_parser.add_argument("--output", choices=["text", "json"], default="text")
+    sim_parser.set_defaults(func=_handle_simulate)
+
     return parser
 
 
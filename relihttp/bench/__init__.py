@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 17:10
+# @Author  : fzf
+# @FileName: __init__.py
+# @Software: PyCharm
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 18:30
+# @Author  : fzf
+# @FileName: compare.py
+# @Software: PyCharm
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+from .result import PERCENTILES, BenchResult
+
+SCHEMA_VERSION = 1
+
+
+@dataclass
+class Thresholds:
+    # allowed slowdown of each latency percentile, in percent
+    latency_pct: float = 10.0
+    # allowed drop in throughput, in percent
+    throughput_pct: float = 10.0
+    # allowed increase of the error rate, in percentage points
+    error_rate_pp: float = 1.0
+
+
+def load_report(path: str) -> Tuple[Dict[str, Any], BenchResult]:
+    """Read a ``bench --output json`` file; returns ``(meta, result)``."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: not a relihttp bench report (schema {SCHEMA_VERSION})")
+    return data.get("meta") or {}, BenchResult.from_dict(data.get("result") or {})
+
+
+def _pct_change(old: float, new: float) -> float:
+    if old == 0:
+        return 0.0 if new == 0 else float("inf")
+    return (new - old) / old * 100.0
+
+
+def _error_rate(result: BenchResult) -> float:
+    return result.failed / result.total * 100.0 if result.total else 0.0
+
+
+def compare(old: BenchResult, new: BenchResult, thresholds: Thresholds) -> Tuple[List[str], List[str]]:
+    """
+    Compare two runs; returns ``(report lines, regressions)``.
+
+    Latency is compared per percentile from the histograms (corrected
+    latency for open-loop runs), so higher is worse; throughput lower is worse.
+    """
+    lines = [f"{'metric':<16}{'old':>12}{'new':>12}{'delta':>10}"]
+    regressions: List[str] = []
+
+    def row(name: str, old_v: float, new_v: float, delta: str, bad: bool) -> None:
+        lines.append(f"{name:<16}{old_v:>12.3f}{new_v:>12.3f}{delta:>10}" + ("  REGRESSION" if bad else ""))
+        if bad:
+            regressions.append(name)
+
+    change = _pct_change(old.throughput, new.throughput)
+    row("throughput", old.throughput, new.throughput, f"{change:+.1f}%", -change > thresholds.throughput_pct)
+
+    for p in PERCENTILES:
+        old_v, new_v = old.latency.percentile(p) / 1000, new.latency.percentile(p) / 1000
+        change = _pct_change(old_v, new_v)
+        row(f"p{p:g}_ms", old_v, new_v, f"{change:+.1f}%", change > thresholds.latency_pct)
+
+    old_e, new_e = _error_rate(old), _error_rate(new)
+    row("error_rate_%", old_e, new_e, f"{new_e - old_e:+.2f}pp", new_e - old_e > thresholds.error_rate_pp)
+    return lines, regressions
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 17:20
+# @Author  : fzf
+# @FileName: engines.py
+# @Software: PyCharm
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from ..client.AsyncClient import AsyncClient
+from ..client.SyncClient import SyncClient
+from .result import BenchResult
+from .scenario import Scenario
+
+
+@dataclass
+class BenchConfig:
+    url: str
+    method: str = "GET"
+    requests: int = 100
+    concurrency: int = 10
+    # requests sent before measuring starts (same workers, same clients)
+    warmup: int = 0
+    timeout: Optional[float] = None
+    max_retries: Optional[int] = None
+    # open-loop: requests/second on a fixed arrival timeline (None = closed-loop)
+    rate: Optional[float] = None
+    # open-loop: shift this worker's timeline, so processes splitting one rate interleave
+    phase_s: float = 0.0
+    # weighted endpoint mix; ``url`` is then the base url the paths are appended to
+    scenario: Optional[Scenario] = None
+
+
+class _Tickets:
+    """Hands out request numbers 0..n-1 to whichever worker asks first."""
+
+    def __init__(self, n: int) -> None:
+        self._n = n
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def take(self) -> Optional[int]:
+        with self._lock:
+            if self._next >= self._n:
+                return None
+            self._next += 1
+            return self._next - 1
+
+
+def _intended_ns(config: BenchConfig, start_ns: int, i: int) -> Optional[int]:
+    if not config.rate:
+        return None
+    return start_ns + int((config.phase_s + i / config.rate) * 1e9)
+
+
+def _next_request(config: BenchConfig, rng: random.Random) -> Tuple[Optional[str], Dict[str, Any]]:
+    """``(endpoint name, client.request kwargs)`` for the next request."""
+    kwargs: Dict[str, Any] = {"timeout": config.timeout, "max_retries": config.max_retries}
+    if config.scenario is None:
+        kwargs.update(method=config.method, url=config.url)
+        return None, kwargs
+    endpoint = config.scenario.pick(rng)
+    kwargs.update(
+        method=endpoint.method,
+        url=config.url.rstrip("/") + endpoint.path,
+        headers=endpoint.headers,
+        json=endpoint.json,
+        data=endpoint.data,
+    )
+    return endpoint.name, kwargs
+
+
+def _record(
+    result: Optional[BenchResult],
+    endpoint: Optional[str],
+    start_ns: int,
+    intended_ns: Optional[int],
+    response=None,
+    error: Optional[BaseException] = None,
+) -> None:
+    if result is None:
+        return
+    if error is not None:
+        result.record_error(error, endpoint=endpoint)
+        return
+    end_ns = time.perf_counter_ns()
+    if intended_ns is None:
+        result.record_response(end_ns - start_ns, response, endpoint=endpoint)
+    else:
+        # coordinated-omission correction: latency counts from when the request
+        # should have been sent, so time spent queued behind slow responses shows up
+        result.record_response(
+            end_ns - intended_ns, response, service_ns=end_ns - start_ns, endpoint=endpoint
+        )
+
+
+def _call_sync(
+    client: SyncClient,
+    config: BenchConfig,
+    rng: random.Random,
+    result: Optional[BenchResult],
+    intended_ns: Optional[int] = None,
+) -> None:
+    endpoint, kwargs = _next_request(config, rng)
+    start = time.perf_counter_ns()
+    try:
+        response = client.request(**kwargs)
+    except Exception as exc:
+        _record(result, endpoint, start, intended_ns, error=exc)
+        return
+    _record(result, endpoint, start, intended_ns, response)
+
+
+def run_threaded(
+    config: BenchConfig,
+    client_factory: Callable[[], SyncClient],
+    on_ready: Optional[Callable[[], None]] = None,
+) -> BenchResult:
+    """
+    ``concurrency`` threads, one client each.
+
+    Closed-loop by default: every thread sends its next request as soon as
+    the previous one finishes. With ``config.rate`` request ``i`` is due at
+    ``start + i / rate`` and threads only pick up requests that are due.
+    ``on_ready`` is called once after warm-up, right before measuring starts.
+    """
+    warmup, tickets = _Tickets(config.warmup), _Tickets(config.requests)
+    started: List[int] = []
+
+    def start() -> None:
+        if on_ready is not None:
+            on_ready()
+        started.append(time.perf_counter_ns())
+
+    # measuring starts only once every worker is through its warm-up
+    barrier = threading.Barrier(config.concurrency, action=start)
+    results: List[BenchResult] = []
+    crashed: List[BaseException] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        result = BenchResult()
+        rng = random.Random()
+        try:
+            client = client_factory()
+            while warmup.take() is not None:
+                _call_sync(client, config, rng, None)
+            barrier.wait()
+            while True:
+                i = tickets.take()
+                if i is None:
+                    break
+                intended = _intended_ns(config, started[0], i)
+                if intended is not None:
+                    delay = intended - time.perf_counter_ns()
+                    if delay > 0:
+                        time.sleep(delay / 1e9)
+                _call_sync(client, config, rng, result, intended)
+        except BaseException as exc:
+            # release the others from the barrier; re-raised below
+            barrier.abort()
+            crashed.append(exc)
+            return
+        with lock:
+            results.append(result)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(config.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for exc in crashed:
+        if not isinstance(exc, threading.BrokenBarrierError):
+            raise exc
+
+    merged = BenchResult()
+    for result in results:
+        merged.merge(result)
+    if started:
+        merged.elapsed_s = (time.perf_counter_ns() - started[0]) / 1e9
+    return merged
+
+
+async def _call_async(
+    client: AsyncClient,
+    config: BenchConfig,
+    rng: random.Random,
+    result: Optional[BenchResult],
+    intended_ns: Optional[int] = None,
+) -> None:
+    endpoint, kwargs = _next_request(config, rng)
+    start = time.perf_counter_ns()
+    try:
+        response = await client.request(**kwargs)
+    except Exception as exc:
+        _record(result, endpoint, start, intended_ns, error=exc)
+        return
+    _record(result, endpoint, start, intended_ns, response)
+
+
+async def _drive(
+    n: int,
+    sem: asyncio.Semaphore,
+    call: Callable[[Optional[int]], Awaitable[None]],
+    config: Optional[BenchConfig] = None,
+) -> None:
+    pending: Set[asyncio.Task] = set()
+    start_ns = time.perf_counter_ns()
+
+    def done(task: asyncio.Task) -> None:
+        pending.discard(task)
+        sem.release()
+
+    for i in range(n):
+        intended = _intended_ns(config, start_ns, i) if config is not None else None
+        if intended is not None:
+            delay = intended - time.perf_counter_ns()
+            if delay > 0:
+                await asyncio.sleep(delay / 1e9)
+        # at most ``concurrency`` requests in flight on the loop
+        await sem.acquire()
+        task = asyncio.ensure_future(call(intended))
+        pending.add(task)
+        task.add_done_callback(done)
+    if pending:
+        await asyncio.gather(*pending)
+
+
+async def run_async(
+    config: BenchConfig,
+    client_factory: Callable[[], AsyncClient],
+    on_ready: Optional[Callable[[], None]] = None,
+) -> BenchResult:
+    """
+    One ``AsyncClient`` on one event loop with up to ``concurrency`` requests
+    in flight, bounded by a semaphore. ``config.rate`` schedules requests and
+    ``on_ready`` is called as in ``run_threaded``.
+    """
+    result = BenchResult()
+    rng = random.Random()
+    sem = asyncio.Semaphore(config.concurrency)
+    async with client_factory() as client:
+        # warm-up is always closed-loop
+        await _drive(config.warmup, sem, lambda _: _call_async(client, config, rng, None))
+        if on_ready is not None:
+            # blocking is fine here: nothing else is scheduled on the loop yet
+            on_ready()
+        start = time.perf_counter()
+        await _drive(
+            config.requests,
+            sem,
+            lambda intended: _call_async(client, config, rng, result, intended),
+            config,
+        )
+        result.elapsed_s = time.perf_counter() - start
+    return result
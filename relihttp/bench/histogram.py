@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 17:10
+# @Author  : fzf
+# @FileName: histogram.py
+# @Software: PyCharm
+import math
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# 2**SUB_BITS linear sub-buckets per power of two: values are kept within
+# 1/2**SUB_BITS (~0.8%) relative error, and below 2**(SUB_BITS+1) exactly
+SUB_BITS = 7
+_SUB = 1 << SUB_BITS
+
+
+def _index(value: int) -> int:
+    if value < 2 * _SUB:
+        return value
+    shift = value.bit_length() - (SUB_BITS + 1)
+    return shift * _SUB + (value >> shift)
+
+
+def _bounds(index: int) -> Tuple[int, int]:
+    """``(lowest, highest)`` value that lands in bucket ``index``."""
+    if index < 2 * _SUB:
+        return index, index
+    shift = index // _SUB - 1
+    low = (index - shift * _SUB) << shift
+    return low, low + (1 << shift) - 1
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram over integer microseconds.
+
+    Constant memory per order of magnitude, O(1) ``record``, and mergeable:
+    histograms from several workers (or processes) add up bucket by bucket.
+    """
+
+    __slots__ = ("_counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self._counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def record(self, value_us: int, count: int = 1) -> None:
+        value = max(0, int(value_us))
+        idx = _index(value)
+        self._counts[idx] = self._counts.get(idx, 0) + count
+        self.count += count
+        self.total += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for idx, n in other._counts.items():
+            self._counts[idx] = self._counts.get(idx, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p: float) -> int:
+        """Highest value equivalent to the ``p``-th percentile (0 when empty)."""
+        if not self.count:
+            return 0
+        # record() sets max along with count
+        top = self.max if self.max is not None else 0
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for idx in sorted(self._counts):
+            seen += self._counts[idx]
+            if seen >= rank:
+                return min(_bounds(idx)[1], top)
+        return top
+
+    def buckets(self) -> Iterator[Tuple[int, int, int]]:
+        """``(lowest, highest, count)`` for every non-empty bucket, ascending."""
+        for idx in sorted(self._counts):
+            low, high = _bounds(idx)
+            yield low, high, self._counts[idx]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly form; buckets are ``[lowest value, count]`` pairs."""
+        return {
+            "unit": "us",
+            "sub_bits": SUB_BITS,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "buckets": [[low, n] for low, _, n in self.buckets()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        if data.get("sub_bits", SUB_BITS) != SUB_BITS:
+            raise ValueError(f"histogram precision mismatch: sub_bits={data.get('sub_bits')}")
+        hist = cls()
+        for low, n in data.get("buckets", ()):
+            idx = _index(int(low))
+            hist._counts[idx] = hist._counts.get(idx, 0) + int(n)
+        hist.count = int(data.get("count", 0))
+        hist.total = int(data.get("total", 0))
+        hist.min = data.get("min")
+        hist.max = data.get("max")
+        return hist
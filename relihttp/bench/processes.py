@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 17:50
+# @Author  : fzf
+# @FileName: processes.py
+# @Software: PyCharm
+import asyncio
+import dataclasses
+import multiprocessing
+import queue
+import traceback
+from typing import Any, Callable, List
+
+from .engines import BenchConfig, run_async, run_threaded
+from .result import BenchResult
+
+
+def split(total: int, n: int) -> List[int]:
+    """Split ``total`` into ``n`` near-equal non-negative parts."""
+    return [total // n + (1 if i < total % n else 0) for i in range(n)]
+
+
+def _process_main(
+    engine: str,
+    config: BenchConfig,
+    client_factory: Callable[[], Any],
+    barrier: Any,
+    results: Any,
+) -> None:
+    try:
+        if engine == "async":
+            result = asyncio.run(run_async(config, client_factory, barrier.wait))
+        else:
+            result = run_threaded(config, client_factory, barrier.wait)
+    except BaseException:
+        # don't leave the other processes waiting for us at the barrier
+        barrier.abort()
+        results.put(("error", traceback.format_exc()))
+        return
+    results.put(("ok", result))
+
+
+def run_processes(
+    config: BenchConfig,
+    engine: str,
+    processes: int,
+    client_factory: Callable[[], Any],
+) -> BenchResult:
+    """
+    Run ``engine`` in ``processes`` worker processes and merge their results.
+
+    ``requests``, ``warmup``, ``concurrency`` and ``rate`` in ``config`` are
+    totals, split across the processes; every process warms up, then all of
+    them start measuring together. ``client_factory`` must be picklable
+    (a module-level function or ``functools.partial`` of one).
+    """
+    if config.concurrency < processes:
+        raise ValueError("concurrency must be >= processes")
+
+    ctx = multiprocessing.get_context()
+    barrier = ctx.Barrier(processes)
+    results = ctx.Queue()
+    workers = []
+    for i, (requests, warmup, concurrency) in enumerate(zip(
+        split(config.requests, processes),
+        split(config.warmup, processes),
+        split(config.concurrency, processes),
+    )):
+        part = dataclasses.replace(config, requests=requests, warmup=warmup, concurrency=concurrency)
+        if config.rate:
+            # each process sends rate/N; shifting process i by i/rate interleaves them
+            part.rate = config.rate / processes
+            part.phase_s = config.phase_s + i / config.rate
+        p = ctx.Process(
+            target=_process_main,
+            args=(engine, part, client_factory, barrier, results),
+            daemon=True,
+        )
+        p.start()
+        workers.append(p)
+
+    merged = BenchResult()
+    errors: List[str] = []
+    received = 0
+    while received < processes:
+        try:
+            status, payload = results.get(timeout=0.5)
+        except queue.Empty:
+            if any(p.exitcode not in (None, 0) for p in workers):
+                barrier.abort()
+                errors.append("bench worker process died without a result")
+                break
+            continue
+        received += 1
+        if status == "ok":
+            merged.merge(payload)
+        else:
+            errors.append(payload)
+    for p in workers:
+        p.join(timeout=5)
+    if errors:
+        # the others only saw the barrier break; report the root cause
+        cause = next((e for e in errors if "BrokenBarrierError" not in e), errors[0])
+        raise RuntimeError("bench worker failed:\n" + cause)
+    return merged
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 17:15
+# @Author  : fzf
+# @FileName: result.py
+# @Software: PyCharm
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from ..models import Response
+from .histogram import LatencyHistogram
+
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+MAX_ERROR_SAMPLES = 3
+MAX_ENDPOINT_LINES = 20
+
+
+def error_key(exc: BaseException) -> str:
+    status = getattr(exc, "status_code", None)
+    name = type(exc).__name__
+    return f"{name}(HTTP {status})" if status else name
+
+
+class BenchResult:
+    """
+    Outcome of one bench run (or one worker of it).
+
+    Latency of successful requests goes into ``latency`` (microseconds,
+    measured with a monotonic clock around the whole ``client.request`` call,
+    retries included). In open-loop runs ``latency`` counts from the intended
+    send time and ``service`` holds the uncorrected call time. Scenario runs
+    also record each request into ``endpoints[name]``. Workers each fill
+    their own result and ``merge`` at the end, so recording never takes a
+    lock.
+    """
+
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()
+        self.service = LatencyHistogram()
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.error_samples: List[str] = []
+        self.endpoints: Dict[str, "BenchResult"] = {}
+        self.elapsed_s = 0.0
+
+    def endpoint(self, name: str) -> "BenchResult":
+        child = self.endpoints.get(name)
+        if child is None:
+            child = self.endpoints[name] = BenchResult()
+        return child
+
+    def record_response(
+        self,
+        latency_ns: int,
+        response: Optional[Response],
+        service_ns: Optional[int] = None,
+        endpoint: Optional[str] = None,
+    ) -> None:
+        if endpoint is not None:
+            self.endpoint(endpoint).record_response(latency_ns, response, service_ns)
+        if response is None:
+            self._record_failure("no response", "no response")
+            return
+        status = int(response.status_code)
+        self.statuses[status] += 1
+        if status >= 400:
+            self._record_failure(f"HTTP {status}", f"status={status} url={response.url}")
+            return
+        self.latency.record(latency_ns // 1000)
+        if service_ns is not None:
+            self.service.record(service_ns // 1000)
+
+    def record_error(self, exc: BaseException, endpoint: Optional[str] = None) -> None:
+        if endpoint is not None:
+            self.endpoint(endpoint).record_error(exc)
+        status = getattr(exc, "status_code", None)
+        if status:
+            self.statuses[int(status)] += 1
+        self._record_failure(error_key(exc), str(exc))
+
+    def _record_failure(self, key: str, message: str) -> None:
+        self.errors[key] += 1
+        if len(self.error_samples) < MAX_ERROR_SAMPLES:
+            self.error_samples.append(message)
+
+    @property
+    def success(self) -> int:
+        return self.latency.count
+
+    @property
+    def failed(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def total(self) -> int:
+        return self.success + self.failed
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "success": self.success,
+            "failed": self.failed,
+            "elapsed_s": self.elapsed_s,
+            "throughput": self.throughput,
+            "latency_ms": summarize(self.latency),
+            "service_ms": summarize(self.service) if self.service.count else None,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "errors": dict(self.errors.most_common()),
+            "error_samples": list(self.error_samples),
+            "histograms": {
+                "latency": self.latency.to_dict(),
+                "service": self.service.to_dict(),
+            },
+            "endpoints": {name: child.to_dict() for name, child in self.endpoints.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BenchResult":
+        result = cls()
+        histograms = data.get("histograms") or {}
+        if "latency" in histograms:
+            result.latency = LatencyHistogram.from_dict(histograms["latency"])
+        if "service" in histograms:
+            result.service = LatencyHistogram.from_dict(histograms["service"])
+        result.statuses = Counter({int(k): v for k, v in (data.get("statuses") or {}).items()})
+        result.errors = Counter(data.get("errors") or {})
+        result.error_samples = list(data.get("error_samples") or [])
+        result.elapsed_s = float(data.get("elapsed_s") or 0.0)
+        result.endpoints = {
+            name: cls.from_dict(child) for name, child in (data.get("endpoints") or {}).items()
+        }
+        return result
+
+    def merge(self, other: "BenchResult") -> None:
+        self.latency.merge(other.latency)
+        self.service.merge(other.service)
+        self.statuses.update(other.statuses)
+        self.errors.update(other.errors)
+        room = MAX_ERROR_SAMPLES - len(self.error_samples)
+        self.error_samples.extend(other.error_samples[:max(0, room)])
+        self.elapsed_s = max(self.elapsed_s, other.elapsed_s)
+        for name, child in other.endpoints.items():
+            self.endpoint(name).merge(child)
+
+
+def _ms(value_us: Optional[int]) -> str:
+    return f"{(value_us or 0) / 1000:.3f}"
+
+
+def summarize(hist: LatencyHistogram) -> Dict[str, float]:
+    """min/mean/percentiles/max of ``hist`` in milliseconds."""
+    summary = {"min": (hist.min or 0) / 1000, "mean": hist.mean / 1000}
+    for p in PERCENTILES:
+        summary[f"p{p:g}"] = hist.percentile(p) / 1000
+    summary["max"] = (hist.max or 0) / 1000
+    return summary
+
+
+def _histogram_line(name: str, hist: LatencyHistogram) -> str:
+    pcts = " ".join(f"p{p:g}={_ms(hist.percentile(p))}" for p in PERCENTILES)
+    return f"{name} min={_ms(hist.min)} mean={hist.mean / 1000:.3f} {pcts} max={_ms(hist.max)}"
+
+
+def _endpoint_line(name: str, result: BenchResult) -> str:
+    hist = result.latency
+    pcts = " ".join(f"p{p:g}={_ms(hist.percentile(p))}" for p in (50.0, 90.0, 99.0))
+    line = f"endpoint {name!r} total={result.total} success={result.success} failed={result.failed}"
+    if hist.count:
+        line += f" {pcts} max={_ms(hist.max)}"
+    if result.errors:
+        line += " errors " + " ".join(f"{k}={v}" for k, v in result.errors.most_common())
+    return line
+
+
+def format_report(result: BenchResult, concurrency: int, rate: Optional[float] = None) -> str:
+    head = (
+        f"total={result.total} success={result.success} failed={result.failed} "
+        f"concurrency={concurrency} total_time_ms={int(result.elapsed_s * 1000)} "
+        f"throughput={result.throughput:.1f} req/s"
+    )
+    if rate:
+        head += f" offered_rate={rate:g} req/s"
+    lines = [head]
+    if result.latency.count:
+        if result.service.count:
+            # open loop: corrected latency first, then raw service time
+            lines.append(_histogram_line("latency_ms(corrected)", result.latency))
+            lines.append(_histogram_line("service_ms", result.service))
+        else:
+            lines.append(_histogram_line("latency_ms", result.latency))
+    else:
+        lines.append("no successful responses")
+    if result.statuses:
+        lines.append("status " + " ".join(f"{k}={v}" for k, v in sorted(result.statuses.items())))
+    if result.errors:
+        lines.append("errors " + " ".join(f"{k}={v}" for k, v in result.errors.most_common()))
+        lines.append("sample_errors=" + "; ".join(result.error_samples))
+    if result.endpoints:
+        by_volume = sorted(result.endpoints.items(), key=lambda kv: -kv[1].total)
+        for name, child in by_volume[:MAX_ENDPOINT_LINES]:
+            lines.append(_endpoint_line(name, child))
+        if len(by_volume) > MAX_ENDPOINT_LINES:
+            lines.append(f"... {len(by_volume) - MAX_ENDPOINT_LINES} more endpoints")
+    return "\n".join(lines)
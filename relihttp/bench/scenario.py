@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 18:10
+# @Author  : fzf
+# @FileName: scenario.py
+# @Software: PyCharm
+import itertools
+import json
+import random
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+_METHODS = {"GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS"}
+# request line of a common/combined access log entry: "GET /path HTTP/1.1"
+_ACCESS_LOG_RE = re.compile(r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+"')
+
+
+@dataclass
+class Endpoint:
+    method: str
+    path: str
+    headers: Optional[Dict[str, str]] = None
+    json: Any = None
+    data: Optional[str] = None
+    weight: float = 1.0
+    name: str = ""
+
+    def __post_init__(self) -> None:
+        self.method = self.method.upper()
+        if not self.name:
+            self.name = f"{self.method} {self.path}"
+
+
+@dataclass
+class Scenario:
+    """Weighted mix of endpoints replayed against the bench base url."""
+
+    endpoints: List[Endpoint]
+    _cum_weights: List[float] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.endpoints:
+            raise ValueError("scenario has no endpoints")
+        self._cum_weights = list(itertools.accumulate(e.weight for e in self.endpoints))
+
+    def pick(self, rng: random.Random) -> Endpoint:
+        if len(self.endpoints) == 1:
+            return self.endpoints[0]
+        return rng.choices(self.endpoints, cum_weights=self._cum_weights)[0]
+
+
+def _endpoint_from_json(raw: Dict[str, Any], lineno: int) -> Endpoint:
+    if not isinstance(raw, dict) or not raw.get("path"):
+        raise ValueError(f"scenario line {lineno}: expected an object with a 'path'")
+    method = str(raw.get("method", "GET")).upper()
+    if method not in _METHODS:
+        raise ValueError(f"scenario line {lineno}: unsupported method {method}")
+    weight = float(raw.get("weight", 1))
+    if weight <= 0:
+        raise ValueError(f"scenario line {lineno}: weight must be > 0")
+    headers = raw.get("headers")
+    if headers is not None and not isinstance(headers, dict):
+        raise ValueError(f"scenario line {lineno}: headers must be an object")
+    return Endpoint(
+        method=method,
+        path=str(raw["path"]),
+        headers=headers,
+        json=raw.get("json"),
+        data=raw.get("body"),
+        weight=weight,
+        name=str(raw.get("name") or ""),
+    )
+
+
+def parse_scenario_lines(lines: Sequence[str]) -> Scenario:
+    """
+    Parse a JSONL scenario, one endpoint per line::
+
+        {"method": "POST", "path": "/orders", "json": {"sku": 1}, "weight": 3}
+
+    (``headers``, ``json``, ``body`` and ``name`` are optional), or an access
+    log in common/combined format, where each distinct method + path becomes
+    an endpoint weighted by how often it was requested.
+    """
+    content = [(n, line.strip()) for n, line in enumerate(lines, 1) if line.strip()]
+    if not content:
+        raise ValueError("scenario is empty")
+
+    if content[0][1].startswith("{"):
+        endpoints = []
+        for lineno, line in content:
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"scenario line {lineno}: {exc}") from exc
+            endpoints.append(_endpoint_from_json(raw, lineno))
+        return Scenario(endpoints)
+
+    seen: Counter = Counter()
+    for _, line in content:
+        match = _ACCESS_LOG_RE.search(line)
+        if match and match.group("method") in _METHODS:
+            seen[(match.group("method"), match.group("path"))] += 1
+    if not seen:
+        raise ValueError("scenario: no JSONL endpoints or access log requests found")
+    return Scenario([
+        Endpoint(method=method, path=path, weight=float(count))
+        for (method, path), count in seen.most_common()
+    ])
+
+
+def load_scenario(path: str) -> Scenario:
+    with open(path, encoding="utf-8") as f:
+        return parse_scenario_lines(f.readlines())
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:20
+# @Author  : fzf
+# @FileName: simulate.py
+# @Software: PyCharm
+import heapq
+import math
+import random
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..policies.backoff import BACKOFF_STRATEGIES
+from ..utils import TokenBucket
+
+# a second after the outage counts as recovered below this failure ratio
+RECOVERED_FAILURE_RATIO = 0.01
+
+
+@dataclass
+class SimConfig:
+    """
+    ``clients`` each send ``rate`` requests/s to a server that serves
+    ``capacity`` requests/s (absorbing ``burst`` at once) and fails the rest
+    at once. Between ``outage_start`` and ``outage_end`` the capacity drops
+    to ``degraded`` x capacity. ``arrivals`` is "poisson" (independent
+    clients) or "aligned" (every client fires on the same tick).
+    """
+
+    clients: int = 100
+    rate: float = 1.0
+    capacity: float = 120.0
+    burst: float = 20.0
+    outage_start: float = 10.0
+    outage_end: float = 20.0
+    degraded: float = 0.0
+    duration: float = 60.0
+    arrivals: str = "poisson"
+    max_retries: int = 3  # attempts per request, first included
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    seed: int = 1
+
+    def __post_init__(self) -> None:
+        if self.arrivals not in ("poisson", "aligned"):
+            raise ValueError("arrivals must be 'poisson' or 'aligned'")
+        if not 0 <= self.outage_start <= self.outage_end <= self.duration:
+            raise ValueError("need 0 <= outage_start <= outage_end <= duration")
+        if not 0.0 <= self.degraded <= 1.0:
+            raise ValueError("degraded must be in [0.0, 1.0]")
+
+
+@dataclass
+class SimResult:
+    strategy: str
+    requests: int
+    attempts: int
+    succeeded: int
+    # busiest second, in multiples of the offered load
+    peak_load: float
+    # seconds from the end of the outage until failures stay under 1%; None if never
+    recovery_s: Optional[float]
+
+    @property
+    def amplification(self) -> float:
+        return self.attempts / self.requests if self.requests else 0.0
+
+    @property
+    def failure_rate(self) -> float:
+        return 1.0 - self.succeeded / self.requests if self.requests else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["amplification"] = round(self.amplification, 4)
+        data["failure_rate"] = round(self.failure_rate, 4)
+        return data
+
+
+def _arrivals(config: SimConfig, rng: random.Random) -> List[float]:
+    if config.arrivals == "aligned":
+        period = 1.0 / config.rate
+        ticks = int(config.duration / period)
+        return [i * period for i in range(ticks) for _ in range(config.clients)]
+    # independent clients: one Poisson stream at the combined rate
+    times: List[float] = []
+    t, total = 0.0, config.clients * config.rate
+    while True:
+        t += rng.expovariate(total)
+        if t >= config.duration:
+            return times
+        times.append(t)
+
+
+def _recovery(config: SimConfig, attempts: Counter, failures: Counter) -> Optional[float]:
+    end = int(math.ceil(config.outage_end))
+    last_bad = None
+    for second in range(end, int(config.duration)):
+        if attempts[second] and failures[second] / attempts[second] > RECOVERED_FAILURE_RATIO:
+            last_bad = second
+    if last_bad is None:
+        return max(0.0, end - config.outage_end)
+    if last_bad >= int(config.duration) - 1:
+        return None
+    return last_bad + 1 - config.outage_end
+
+
+def simulate(strategy: str, config: SimConfig) -> SimResult:
+    """Run ``strategy`` (a name from BACKOFF_STRATEGIES) on a virtual clock."""
+    rng = random.Random(config.seed)
+    backoff = BACKOFF_STRATEGIES[strategy](config.base_delay, config.max_delay, rng)
+    now = 0.0
+    server = TokenBucket(rate=config.capacity, capacity=config.burst, time_fn=lambda: now)
+
+    # (time, seq, kind, attempt, previous delay); kind 0 = capacity change
+    events: List[Tuple[float, int, int, int, float]] = []
+    seq = 0
+    for seq, t in enumerate(_arrivals(config, rng)):
+        events.append((t, seq, 1, 1, 0.0))
+    requests = len(events)
+    if config.outage_end > config.outage_start:
+        events.append((config.outage_start, seq + 1, 0, 0, 0.0))
+        events.append((config.outage_end, seq + 2, 0, 1, 0.0))
+    seq += 3
+    heapq.heapify(events)
+
+    attempts: Counter = Counter()
+    failures: Counter = Counter()
+    succeeded = 0
+    while events:
+        now, _, kind, attempt, previous = heapq.heappop(events)
+        if kind == 0:
+            if attempt == 0:
+                server.set_rate(max(config.capacity * config.degraded, 1e-9), tokens=0)
+            else:
+                server.set_rate(config.capacity)
+            continue
+        second = int(now)
+        attempts[second] += 1
+        if server.acquire(1.0) <= 0:
+            succeeded += 1
+            continue
+        failures[second] += 1
+        if attempt < config.max_retries:
+            delay = backoff.next_delay(attempt, previous)
+            heapq.heappush(events, (now + delay, seq, 1, attempt + 1, delay))
+            seq += 1
+
+    offered = config.clients * config.rate
+    return SimResult(
+        strategy=strategy,
+        requests=requests,
+        attempts=sum(attempts.values()),
+        succeeded=succeeded,
+        peak_load=round(max(attempts.values(), default=0) / offered, 4),
+        recovery_s=_recovery(config, attempts, failures),
+    )
+
+
+def format_table(results: Sequence[SimResult]) -> str:
+    lines = [
+        f"{'strategy':<14}{'attempts':>10}{'amplif.':>9}{'peak':>8}{'failed':>9}{'recovery':>10}"
+    ]
+    for r in results:
+        recovery = "never" if r.recovery_s is None else f"{r.recovery_s:.1f}s"
+        lines.append(
+            f"{r.strategy:<14}{r.attempts:>10}{r.amplification:>8.2f}x{r.peak_load:>7.2f}x"
+            f"{r.failure_rate * 100:>8.2f}%{recovery:>10}"
+        )
+    return "\n".join(lines)
@@ -10,16 +10,46 @@ from typing import Any, Dict, Optional
 from relihttp.transport.aiohttp import AiohttpTransport
 
 from .BaseClient import BaseClient
-from ..models import Context, Request, Response
+from ..models import Context, Headers, Request, Response
+from ..policies.pipeline import AsyncHook, Pipeline
+from ..transport.async_base import AsyncTransport
+from ..transport.base import prepare_body
 from ..utils import now_ms
 
 
 class AsyncClient(BaseClient):
+    """
+    asyncio client on ``AiohttpTransport``.
 
+    limit / limit_per_host / keepalive_timeout / ttl_dns_cache / force_close
+    configure the aiohttp connector (see ``AiohttpTransport``) and are ignored
+    when a transport is passed.
+    """
 
-    def __init__(self, *, transport=None, **kwargs):
-        super().__init__(**kwargs)
-        self.transport = transport or AiohttpTransport(...)
+    transport: AsyncTransport
+
+    def __init__(
+        self,
+        *,
+        transport: Optional[AsyncTransport] = None,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: Optional[float] = None,
+        ttl_dns_cache: Optional[int] = 10,
+        force_close: bool = False,
+        **kwargs,
+    ):
+        self._connector_options: Dict[str, Any] = dict(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=ttl_dns_cache,
+            force_close=force_close,
+        )
+        super().__init__(transport=transport, **kwargs)
+
+    def _default_transport(self, **pool_options: Any) -> AiohttpTransport:
+        return AiohttpTransport(**self._connector_options)
 
     async def request(
         self,
@@ -32,6 +62,7 @@ class AsyncClient(BaseClient):
         json: Any = None,
         timeout: Optional[float] = None,
         max_retries: Optional[int] = None,
+        stream: bool = False,
     ) -> Optional[Response]:
         full_url = url
         if self.base_url and url.startswith("/"):
@@ -41,7 +72,9 @@ class AsyncClient(BaseClient):
             method=method.upper(),
             url=full_url,
             params=params,
-            headers=self.headers or headers or {},
+            # copy-on-write layer over the client defaults: policies write
+            # into this request only, and the defaults are never copied
+            headers=Headers(headers, parent=self.headers),
             data=data,
             json=json,
         )
@@ -50,44 +83,95 @@ class AsyncClient(BaseClient):
             timeout=timeout,
             max_retries=self._default_max_retries if max_retries is None else int(max_retries),
             start_ms=now_ms(),
+            stream=bool(stream),
+            json_codec=self.json_codec,
             request_id=str(uuid.uuid4()),
         )
+        # serialize the body once; every attempt sends the same bytes
+        prepare_body(ctx)
 
+        pipeline = self._pipeline
         while True:
             ctx.attempt += 1
             ctx.response = None
             ctx.error = None
 
-            for p in self.policies:
-                await p.async_before_request(ctx)
+            # sync hooks are called directly; only async_* overrides are awaited
+            try:
+                for hook, is_async in pipeline.async_before:
+                    if is_async:
+                        await hook(ctx)
+                    else:
+                        hook(ctx)
+            except BaseException as e:
+                await self._unwind(pipeline, ctx, (hook, is_async), e)
+                raise
 
             try:
                 ctx.response = await self.transport.send(ctx)
             except BaseException as e:
                 ctx.error = e
+            if ctx.response is not None and ctx.response.json_codec is None:
+                ctx.response.json_codec = self.json_codec
 
-            for p in reversed(self.policies):
-                await p.async_after_response(ctx)
+            for hook, is_async in pipeline.async_after:
+                if is_async:
+                    await hook(ctx)
+                else:
+                    hook(ctx)
 
             should_retry = False
             delay = 0.0
-            for p in self.policies:
-                if await p.async_should_retry(ctx):
+            for (wants_retry, retry_async), (get_delay, delay_async) in pipeline.async_retry:
+                wants = await wants_retry(ctx) if retry_async else wants_retry(ctx)
+                if wants:
                     should_retry = True
-                    delay = max(delay, float(await p.async_get_retry_delay_seconds(ctx)))
+                    d = await get_delay(ctx) if delay_async else get_delay(ctx)
+                    delay = max(delay, float(d or 0.0))
             if should_retry:
+                if ctx.response is not None:
+                    await ctx.response.aclose()
                 await asyncio.sleep(delay)
                 continue
 
             if ctx.response is not None:
+                if self.raise_for_status and not ctx.response.ok:
+                    await ctx.response.aclose()
+                    ctx.response.raise_for_status()
+                if ctx.stream:
+                    ctx.response._on_close = lambda resp, err: self._after_stream(ctx, resp, err)
                 return ctx.response
             assert ctx.error is not None
             raise ctx.error
 
+    async def _unwind(
+        self, pipeline: Pipeline, ctx: Context, hook: AsyncHook, error: BaseException
+    ) -> None:
+        ctx.error = error
+        ctx.tags["rejected_by"] = type(getattr(hook[0], "__self__", hook[0])).__name__
+        for after, is_async in pipeline.async_unwind[pipeline.async_before.index(hook)]:
+            if is_async:
+                await after(ctx)
+            else:
+                after(ctx)
+
+    async def _after_stream(self, ctx: Context, resp: Response, err: Optional[BaseException]) -> None:
+        ctx.tags["stream_bytes"] = resp.num_bytes_downloaded
+        ctx.error = err
+        for hook, is_async in self._pipeline.async_after_stream:
+            if is_async:
+                await hook(ctx)
+            else:
+                hook(ctx)
+
     async def close(self) -> None:
         await self.transport.close()
 
+    async def open(self) -> None:
+        await self.transport.open()
+
     async def __aenter__(self) -> "AsyncClient":
+        await self.open()
         return self
 
     async def __aexit__(self, exc_type, exc, tb) -> None:
@@ -1,17 +1,23 @@
 import time
 import uuid
-from typing import Any, Dict, List, Optional, Sequence
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
 
-from ..models import Context, Request, Response
+from ..codecs import JsonCodec, get_json_codec
+from ..models import Context, Headers, Request, Response
 from ..transport.requests import RequestsTransport
+from ..transport.async_base import AsyncTransport
 from ..transport.base import Transport
 from ..policies.base import Policy
+from ..policies.pipeline import Pipeline, PolicyList, compile_pipeline
 from ..policies.timeout import TimeoutPolicy
-from ..policies.retry import RetryPolicy
+from ..policies.retry import RetryBudget, RetryPolicy
 from ..utils import now_ms
 
 
 class BaseClient:
+    # SyncClient narrows it to Transport, AsyncClient to AsyncTransport
+    transport: Union[Transport, AsyncTransport]
+
     def __init__(
         self,
         base_url: str = "",
@@ -19,21 +25,37 @@ class BaseClient:
         timeout: float = 3.0,
         retry: str = "safe",
         max_retries: int = 3,
+        retry_budget: Optional[RetryBudget] = None,
         rate_limit: float = None,
-        transport: Optional[Transport] = None,
+        transport: Union[Transport, AsyncTransport, None] = None,
         policies: Optional[Sequence[Policy]] = None,
         circuit_breaker: bool = False,
         idempotency: bool = False,
         trace: bool = False,
         logger:bool = False,
+        json_codec: Union[str, JsonCodec, None] = None,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        pool_timeout: Optional[float] = None,
+        raise_for_status: bool = False,
     ):
         self.base_url = base_url.rstrip("/")
-        self.headers = headers or {}
-        self.transport = transport or RequestsTransport()
+        # case-insensitive defaults; each request layers its own headers on top
+        self.headers = headers
+        # pool_*: see PooledHTTPAdapter; ignored when a transport is passed
+        self.transport = transport or self._default_transport(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            pool_timeout=pool_timeout,
+        )
+        # "json" (default), "orjson", "msgspec", "auto" or a JsonCodec instance
+        self.json_codec = get_json_codec(json_codec)
 
         default_policies: List[Policy] = [
             TimeoutPolicy(timeout=timeout),
-            RetryPolicy(max_retries=max_retries, retry=retry),
+            RetryPolicy(max_retries=max_retries, retry=retry, budget=retry_budget),
         ]
         if logger:
             from ..policies.logger import LoggingPolicy
@@ -57,6 +79,34 @@ class BaseClient:
         self.policies = list(policies) if policies is not None else default_policies
 
         self._default_max_retries = int(max_retries)
+        # 4xx/5xx come back as responses; True raises TransportError once the
+        # policies (retries included) are done with them
+        self.raise_for_status = raise_for_status
+
+    @property
+    def headers(self) -> Headers:
+        return self._headers
+
+    @headers.setter
+    def headers(self, value: Optional[Mapping[str, str]]) -> None:
+        self._headers = value if isinstance(value, Headers) else Headers(value)
+
+    @property
+    def policies(self) -> List[Policy]:
+        return self._policies
+
+    @policies.setter
+    def policies(self, value: Sequence[Policy]) -> None:
+        # hooks are resolved here, not per attempt; in-place changes to the
+        # list recompile through PolicyList
+        self._policies = PolicyList(value, self._compile)
+        self._compile(self._policies)
+
+    def _compile(self, policies: List[Policy]) -> None:
+        self._pipeline: Pipeline = compile_pipeline(policies)
+
+    def _default_transport(self, **pool_options: Any) -> Union[Transport, AsyncTransport]:
+        return RequestsTransport(**pool_options)
 
     def request(
         self,
@@ -69,9 +119,15 @@ class BaseClient:
         json: Any = None,
         timeout: Optional[float] = None,
         max_retries: Optional[int] = None,
+        stream: bool = False,
     ) -> Optional[Response]:
         pass
 
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """Connection pool statistics from the transport ({} if it has none)."""
+        pool_stats = getattr(self.transport, "pool_stats", None)
+        return pool_stats() if pool_stats is not None else {}
+
     # sugar
     def get(self, url: str, **kwargs) -> Optional[Response]:
         return self.request("GET", url, **kwargs)
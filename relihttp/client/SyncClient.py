@@ -5,16 +5,19 @@
 # @Software: PyCharm
 import time
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
 
-from relihttp.models import Context, Request, Response
+from relihttp.models import Context, Headers, Request, Response
+from relihttp.policies.pipeline import Pipeline
+from relihttp.transport.base import Transport, prepare_body
 from relihttp.utils import now_ms
 
 from .BaseClient import BaseClient
 
 
 class SyncClient(BaseClient):
-    
+    transport: Transport
+
     def request(
         self,
         method: str,
@@ -26,6 +29,7 @@ class SyncClient(BaseClient):
         json: Any = None,
         timeout: Optional[float] = None,
         max_retries: Optional[int] = None,
+        stream: bool = False,
     ) -> Optional[Response]:
         full_url = url
         if self.base_url and url.startswith("/"):
@@ -35,7 +39,9 @@ class SyncClient(BaseClient):
             method=method.upper(),
             url=full_url,
             params=params,
-            headers=self.headers or headers or {},
+            # copy-on-write layer over the client defaults: policies write
+            # into this request only, and the defaults are never copied
+            headers=Headers(headers, parent=self.headers),
             data=data,
             json=json,
         )
@@ -44,42 +50,76 @@ class SyncClient(BaseClient):
             timeout=timeout,
             max_retries=self._default_max_retries if max_retries is None else int(max_retries),
             start_ms=now_ms(),
+            stream=bool(stream),
+            json_codec=self.json_codec,
             request_id=str(uuid.uuid4()),
         )
+        # serialize the body once; every attempt sends the same bytes
+        prepare_body(ctx)
 
+        pipeline = self._pipeline
         # attempts: 1..max_retries+1
         while True:
             ctx.attempt += 1
             ctx.response = None
             ctx.error = None
 
-            # before hooks
-            for p in self.policies:
-                p.before_request(ctx)
+            # before hooks; a policy may reject the request by raising
+            try:
+                for hook in pipeline.before:
+                    hook(ctx)
+            except BaseException as e:
+                self._unwind(pipeline, ctx, hook, e)
+                raise
 
             # send
             try:
                 ctx.response = self.transport.send(ctx)
             except BaseException as e:
                 ctx.error = e
+            if ctx.response is not None and ctx.response.json_codec is None:
+                ctx.response.json_codec = self.json_codec
 
-            # after hooks
-            for p in reversed(self.policies):
-                p.after_response(ctx)
+            # after hooks (already reversed)
+            for hook in pipeline.after:
+                hook(ctx)
 
             # retry decision (any policy can decide; we OR them)
             should_retry = False
             delay = 0.0
-            for p in self.policies:
-                if p.should_retry(ctx):
+            for wants_retry, get_delay in pipeline.retry:
+                if wants_retry(ctx):
                     should_retry = True
-                    delay = max(delay, float(p.get_retry_delay_seconds(ctx)))
+                    delay = max(delay, float(get_delay(ctx) or 0.0))
             if should_retry:
+                if ctx.response is not None:
+                    # discarded streamed body: give the connection back
+                    ctx.response.close()
                 time.sleep(delay)
                 continue
 
             # final
             if ctx.response is not None:
+                if self.raise_for_status and not ctx.response.ok:
+                    ctx.response.close()
+                    ctx.response.raise_for_status()
+                if ctx.stream:
+                    ctx.response._on_close = lambda resp, err: self._after_stream(ctx, resp, err)
                 return ctx.response
             assert ctx.error is not None
             raise ctx.error
+
+    def _unwind(
+        self, pipeline: Pipeline, ctx: Context, hook: Callable[..., Any], error: BaseException
+    ) -> None:
+        # policies that already let the request through see the rejection
+        ctx.error = error
+        ctx.tags["rejected_by"] = type(getattr(hook, "__self__", hook)).__name__
+        for after in pipeline.unwind[pipeline.before.index(hook)]:
+            after(ctx)
+
+    def _after_stream(self, ctx: Context, resp: Response, err: Optional[BaseException]) -> None:
+        ctx.tags["stream_bytes"] = resp.num_bytes_downloaded
+        ctx.error = err
+        for hook in self._pipeline.after_stream:
+            hook(ctx)
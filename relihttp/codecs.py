@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 11:40
+# @Author  : fzf
+# @FileName: codecs.py
+# @Software: PyCharm
+import json as _json
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Type, Union
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    msgspec = None
+
+
+class JsonCodec(ABC):
+    """Encode request bodies to bytes and decode response bodies."""
+
+    name = "base"
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        ...
+
+    @abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        ...
+
+
+class StdlibJsonCodec(JsonCodec):
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return _json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return _json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self, option: Optional[int] = None):
+        if orjson is None:
+            raise ImportError("orjson is required. Install with `pip install relihttp[orjson]`.")
+        # non-str dict keys are accepted by the stdlib encoder, keep that working
+        self.option = orjson.OPT_NON_STR_KEYS if option is None else option
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, option=self.option)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        if msgspec is None:
+            raise ImportError("msgspec is required. Install with `pip install relihttp[msgspec]`.")
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj: Any) -> bytes:
+        data: bytes = self._encoder.encode(obj)
+        return data
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._decoder.decode(data)
+
+
+CODECS: Dict[str, Type[JsonCodec]] = {
+    StdlibJsonCodec.name: StdlibJsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+}
+
+DEFAULT_JSON_CODEC: JsonCodec = StdlibJsonCodec()
+
+
+def available_codecs() -> Dict[str, Type[JsonCodec]]:
+    """Codecs whose backend is importable in this interpreter."""
+    available: Dict[str, Type[JsonCodec]] = {StdlibJsonCodec.name: StdlibJsonCodec}
+    if orjson is not None:
+        available[OrjsonCodec.name] = OrjsonCodec
+    if msgspec is not None:
+        available[MsgspecCodec.name] = MsgspecCodec
+    return available
+
+
+def get_json_codec(codec: Union[str, JsonCodec, None] = None) -> JsonCodec:
+    """
+    Resolve a codec name or instance.
+
+    - None / "json": stdlib ``json``
+    - "orjson" / "msgspec": that backend (ImportError if not installed)
+    - "auto": fastest installed backend (orjson > msgspec > json)
+    """
+    if codec is None:
+        return DEFAULT_JSON_CODEC
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec == "auto":
+        if orjson is not None:
+            return OrjsonCodec()
+        if msgspec is not None:
+            return MsgspecCodec()
+        return DEFAULT_JSON_CODEC
+    if codec == StdlibJsonCodec.name:
+        return DEFAULT_JSON_CODEC
+    try:
+        return CODECS[codec]()
+    except KeyError:
+        raise ValueError(
+            f"unknown json codec: {codec!r}, expected one of {sorted(CODECS)} or 'auto'"
+        ) from None
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Mapping, Optional
 
 
 class TransportError(Exception):
@@ -12,11 +12,14 @@ class TransportError(Exception):
         url: Optional[str] = None,
         status_code: Optional[int] = None,
         elapsed_ms: Optional[int] = None,
+        headers: Optional[Mapping[str, str]] = None,
     ):
         self.method = method
         self.url = url
         self.status_code = status_code
         self.elapsed_ms = elapsed_ms
+        # response headers of an HTTP error (Retry-After, RateLimit-*)
+        self.headers = headers
 
         parts = [message]
         if method:
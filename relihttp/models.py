@@ -3,30 +3,446 @@
 # @Author  : fzf
 # @FileName: models.py
 # @Software: PyCharm
-
+import asyncio
+import inspect
 from dataclasses import dataclass, field
-from typing import Any, Dict, Mapping, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .codecs import DEFAULT_JSON_CODEC, JsonCodec
+from .exceotions import TransportError
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+HeaderItems = Union[Mapping[str, str], Iterable[Tuple[str, str]]]
+
+
+class Headers(MutableMapping[str, str]):
+    """
+    Case-insensitive, copy-on-write request headers.
+
+    ``Headers(per_call, parent=client_headers)`` stores only its own entries;
+    reads fall through to the parent, while writes and deletes stay in the
+    child. The client's default headers are shared by every request without
+    being copied, and a policy writing a header never touches them.
+    """
+
+    __slots__ = ("_store", "_parent")
+
+    def __init__(self, data: Optional[HeaderItems] = None, *, parent: Optional["Headers"] = None):
+        self._parent = parent
+        # lower-cased name -> (name as written, value); value None marks a delete
+        self._store: Dict[str, Tuple[str, Optional[str]]] = {}
+        if data:
+            items = data.items() if isinstance(data, Mapping) else data
+            for key, value in items:
+                self._store[key.lower()] = (key, value)
+
+    def _lookup(self, lower: str) -> Optional[str]:
+        node: Optional[Headers] = self
+        while node is not None:
+            item = node._store.get(lower)
+            if item is not None:
+                return item[1]
+            node = node._parent
+        return None
+
+    def _merged(self) -> Dict[str, Tuple[str, Optional[str]]]:
+        if self._parent is None:
+            return self._store
+        merged = dict(self._parent._merged())
+        merged.update(self._store)
+        return merged
+
+    def __getitem__(self, key: str) -> str:
+        value = self._lookup(key.lower())
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._lookup(key.lower()) is not None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._lookup(key.lower())
+        return default if value is None else value
+
+    def __setitem__(self, key: str, value: str) -> None:
+        self._store[key.lower()] = (key, value)
+
+    def __delitem__(self, key: str) -> None:
+        lower = key.lower()
+        if self._lookup(lower) is None:
+            raise KeyError(key)
+        if self._parent is not None and self._parent._lookup(lower) is not None:
+            self._store[lower] = (key, None)
+        else:
+            del self._store[lower]
+
+    def __iter__(self) -> Iterator[str]:
+        for key, value in self._merged().values():
+            if value is not None:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _, value in self._merged().values() if value is not None)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        mine = {k.lower(): v for k, v in self.items()}
+        return mine == {k.lower(): v for k, v in other.items()}
+
+    def __repr__(self) -> str:
+        return f"Headers({dict(self.items())!r})"
+
+    def copy(self) -> "Headers":
+        """Flattened, independent copy."""
+        return Headers(self.items())
+
 
 @dataclass(frozen=True)
 class Request:
     method: str
     url: str
     params: Optional[Mapping[str, Any]] = None
-    headers: Dict[str, str] = field(default_factory=dict)
+    headers: MutableMapping[str, str] = field(default_factory=Headers)
     data: Any = None
     json: Any = None
 
-@dataclass
+
+class HeadersView(Mapping[str, str]):
+    """
+    Read-only, case-insensitive view over a transport's header object.
+
+    ``requests`` and ``aiohttp`` already hand us case-insensitive mappings, so
+    lookups go straight through; a lower-cased index is only built for plain
+    dicts (custom transports) and only when an exact-case lookup misses.
+    """
+
+    __slots__ = ("_raw", "_lower")
+
+    def __init__(self, raw: Optional[Mapping[str, str]] = None):
+        self._raw: Mapping[str, str] = raw if raw is not None else {}
+        self._lower: Optional[Dict[str, str]] = None
+
+    def __getitem__(self, key: str) -> str:
+        try:
+            return self._raw[key]
+        except KeyError:
+            if self._lower is None:
+                self._lower = {k.lower(): v for k, v in self._raw.items()}
+            return self._lower[key.lower()]
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        # multidicts repeat a name per value: yield each header once
+        seen = set()
+        for key in self._raw:
+            lower = key.lower()
+            if lower not in seen:
+                seen.add(lower)
+                yield key
+
+    def __len__(self) -> int:
+        return len({key.lower() for key in self._raw})
+
+    def raw_items(self) -> Iterable[Tuple[str, str]]:
+        """Every header as sent, repeated names (``Set-Cookie``) included."""
+        return self._raw.items()
+
+    def __repr__(self) -> str:
+        return f"HeadersView({dict(self._raw.items())!r})"
+
+
+def _charset_from_headers(headers: Mapping[str, str]) -> Optional[str]:
+    content_type = headers.get("Content-Type")
+    if not content_type:
+        return None
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset" and value:
+            return value.strip().strip("\"'")
+    if "json" in content_type:
+        return "utf-8"
+    return None
+
+
+_UNSET: Any = object()
+
+
 class Response:
-    status_code: int
-    headers: Mapping[str, str]
-    text: str
-    url: str
-    elapsed_ms: int
+    """
+    HTTP response backed by the raw body bytes.
+
+    ``text`` is decoded on first access and ``json()`` is parsed straight from
+    the bytes once (with ``json_codec``, set by the client) and memoized.
+    ``headers`` wraps the transport's own header object instead of copying it.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: Optional[Mapping[str, str]] = None,
+        text: Optional[str] = None,
+        url: str = "",
+        elapsed_ms: int = 0,
+        *,
+        content: Optional[bytes] = None,
+        stream: Any = None,
+        encoding: Optional[str] = None,
+        json_codec: Optional[JsonCodec] = None,
+    ):
+        self.status_code = status_code
+        self.headers: Mapping[str, str] = (
+            headers if isinstance(headers, HeadersView) else HeadersView(headers)
+        )
+        self.url = url
+        self.elapsed_ms = elapsed_ms
+        # Body stream supplied by the transport for ``stream=True`` requests;
+        # the body is only loaded when ``content``/``text``/``read()`` is used.
+        self.stream = stream
+        self._content = content
+        self._text = text
+        self._encoding = encoding
+        self._json: Any = _UNSET
+        self.json_codec = json_codec
+
+        self._closed = False
+        self._consumed = False
+        self._num_bytes = 0
+        self._stream_error: Optional[BaseException] = None
+        # Set by the client to run the policy pipeline on stream completion.
+        self._on_close: Optional[Callable[["Response", Optional[BaseException]], Any]] = None
+
+    def _loaded_content(self) -> Optional[bytes]:
+        # the body if it's available without reading a stream
+        if self._content is None and self._text is None and self.stream is not None:
+            return None
+        return self.content
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Response):
+            return NotImplemented
+        if self is other:
+            return True
+        content = self._loaded_content()
+        return (
+            content is not None
+            and (self.status_code, self.url, content)
+            == (other.status_code, other.url, other._loaded_content())
+            and self.headers == other.headers
+        )
+
+    # mutable, like the dataclass it replaced
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        content = self._loaded_content()
+        body = "<stream>" if content is None else repr(content)
+        return (
+            f"Response(status_code={self.status_code!r}, url={self.url!r}, "
+            f"headers={self.headers!r}, content={body})"
+        )
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def raise_for_status(self) -> "Response":
+        """Raise TransportError("http error") for a 4xx/5xx status; the body is not read."""
+        if self.status_code >= 400:
+            raise TransportError(
+                "http error",
+                url=self.url,
+                status_code=self.status_code,
+                elapsed_ms=self.elapsed_ms,
+                headers=self.headers,
+            )
+        return self
+
+    @property
+    def encoding(self) -> Optional[str]:
+        if self._encoding is None:
+            self._encoding = _charset_from_headers(self.headers)
+        return self._encoding
+
+    @encoding.setter
+    def encoding(self, value: Optional[str]) -> None:
+        self._encoding = value
+        self._text = None if self._content is not None else self._text
+
+    @property
+    def content(self) -> bytes:
+        if self._content is None:
+            if self._text is not None:
+                self._content = self._text.encode(self.encoding or "utf-8")
+            elif self.stream is None:
+                self._content = b""
+            elif self._consumed:
+                raise RuntimeError("response stream has already been consumed")
+            elif not hasattr(self.stream, "iter_bytes"):
+                raise RuntimeError("streamed body not loaded; call `await resp.aread()` first")
+            else:
+                self._content = b"".join(self.iter_bytes())
+        return self._content
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = self.content.decode(self.encoding or "utf-8", errors="replace")
+        return self._text
+
+    @property
+    def is_stream_consumed(self) -> bool:
+        return self._consumed
+
+    @property
+    def num_bytes_downloaded(self) -> int:
+        return self._num_bytes
 
     def json(self) -> Any:
-        import json as re_json
-        return re_json.loads(self.text)
+        if self._json is _UNSET:
+            codec = self.json_codec or DEFAULT_JSON_CODEC
+            if self._content is None and self._text is not None:
+                self._json = codec.loads(self._text)
+            else:
+                self._json = codec.loads(self.content)
+        return self._json
+
+    # --- sync streaming ---
+    def iter_bytes(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield the body in chunks, releasing the connection when done."""
+        if self.stream is None or self._content is not None:
+            body = self.content
+            for i in range(0, len(body), chunk_size):
+                yield body[i:i + chunk_size]
+            return
+        if self._consumed:
+            raise RuntimeError("response stream has already been consumed")
+        self._consumed = True
+        try:
+            for chunk in self.stream.iter_bytes(chunk_size):
+                self._num_bytes += len(chunk)
+                yield chunk
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                self._stream_error = e
+            raise
+        finally:
+            self.close()
+
+    def iter_lines(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+        pending = b""
+        for chunk in self.iter_bytes(chunk_size):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                yield self._decode_line(line)
+        if pending:
+            yield self._decode_line(pending)
+
+    def read(self) -> bytes:
+        """Load a streamed body into ``content`` and close the stream."""
+        return self.content
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self.stream is not None:
+            self.stream.close()
+        if self._on_close is not None:
+            result = self._on_close(self, self._stream_error)
+            if asyncio.iscoroutine(result):
+                # async client response closed from sync code: best effort
+                try:
+                    asyncio.get_running_loop().create_task(result)
+                except RuntimeError:
+                    result.close()
+
+    def __enter__(self) -> "Response":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    # --- async streaming ---
+    async def aiter_bytes(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        if self.stream is None or self._content is not None:
+            for chunk in self.iter_bytes(chunk_size):
+                yield chunk
+            return
+        if self._consumed:
+            raise RuntimeError("response stream has already been consumed")
+        self._consumed = True
+        try:
+            async for chunk in self.stream.aiter_bytes(chunk_size):
+                self._num_bytes += len(chunk)
+                yield chunk
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                self._stream_error = e
+            raise
+        finally:
+            await self.aclose()
+
+    async def aiter_lines(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[str]:
+        pending = b""
+        async for chunk in self.aiter_bytes(chunk_size):
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                yield self._decode_line(line)
+        if pending:
+            yield self._decode_line(pending)
+
+    async def aread(self) -> bytes:
+        if self._content is None and self.stream is not None and not self._consumed:
+            self._content = b"".join([chunk async for chunk in self.aiter_bytes()])
+        return self.content
+
+    async def aclose(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self.stream is not None:
+            await self.stream.aclose()
+        if self._on_close is not None:
+            result = self._on_close(self, self._stream_error)
+            if inspect.isawaitable(result):
+                await result
+
+    async def __aenter__(self) -> "Response":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    def _decode_line(self, line: bytes) -> str:
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        return line.decode(self.encoding or "utf-8", errors="replace")
 
 
 @dataclass
@@ -36,9 +452,21 @@ class Context:
     attempt: int = 0
     max_retries: int = 0
     start_ms: int = 0
+    stream: bool = False
+    json_codec: Optional[JsonCodec] = None
+    # request body encoded once per logical request, reused by every attempt
+    body: Optional[bytes] = None
+    body_headers: Dict[str, str] = field(default_factory=dict)
 
     response: Optional[Response] = None
     error: Optional[BaseException] = None
 
     request_id: Optional[str] = None
-    tags: Dict[str, Any] = field(default_factory=dict)
\ No newline at end of file
+    tags: Dict[str, Any] = field(default_factory=dict)
+
+    def response_headers(self) -> Optional[Mapping[str, str]]:
+        """Headers of this attempt's response, or of the HTTP error the transport raised."""
+        if self.response is not None:
+            return self.response.headers
+        headers = getattr(self.error, "headers", None)
+        return HeadersView(headers) if headers is not None else None
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:10
+# @Author  : fzf
+# @FileName: backoff.py
+# @Software: PyCharm
+import random
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Optional
+
+from ..utils import exponential_backoff
+
+
+class Backoff(ABC):
+    """
+    Retry schedule: ``next_delay(attempt, previous)`` returns the wait in
+    seconds before the next attempt. ``attempt`` is the attempt that just
+    failed (1, 2, ...) and ``previous`` the delay used before it (0.0 after
+    the first attempt). ``rng`` makes the jitter reproducible.
+    """
+
+    def __init__(self, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random()
+
+    @abstractmethod
+    def next_delay(self, attempt: int, previous: float) -> float: ...
+
+    def _jittered(self, delay: float, jitter: float) -> float:
+        # +/- jitter, like utils.add_jitter but on our own rng
+        if delay <= 0 or jitter <= 0:
+            return max(0.0, delay)
+        return max(0.0, delay * (1 + self.rng.uniform(-jitter, jitter)))
+
+
+class ExponentialBackoff(Backoff):
+    """``base * 2 ** (attempt - 1)`` capped at ``cap``, +/- ``jitter`` (the default schedule)."""
+
+    def __init__(
+        self,
+        base: float = 0.2,
+        cap: float = 5.0,
+        jitter: float = 0.2,
+        rng: Optional[random.Random] = None,
+    ):
+        super().__init__(rng)
+        self.base = float(base)
+        self.cap = float(cap)
+        self.jitter = float(jitter)
+
+    def next_delay(self, attempt: int, previous: float) -> float:
+        delay = exponential_backoff(attempt, base=self.base, cap=self.cap)
+        return self._jittered(delay, self.jitter)
+
+
+class FullJitterBackoff(ExponentialBackoff):
+    """Uniform in ``[0, exponential delay]``: spreads retries the most."""
+
+    def __init__(self, base: float = 0.2, cap: float = 5.0, rng: Optional[random.Random] = None):
+        super().__init__(base, cap, 0.0, rng)
+
+    def next_delay(self, attempt: int, previous: float) -> float:
+        return self.rng.uniform(0.0, exponential_backoff(attempt, base=self.base, cap=self.cap))
+
+
+class EqualJitterBackoff(ExponentialBackoff):
+    """Half the exponential delay, plus a uniform share of the other half."""
+
+    def __init__(self, base: float = 0.2, cap: float = 5.0, rng: Optional[random.Random] = None):
+        super().__init__(base, cap, 0.0, rng)
+
+    def next_delay(self, attempt: int, previous: float) -> float:
+        half = exponential_backoff(attempt, base=self.base, cap=self.cap) / 2
+        return half + self.rng.uniform(0.0, half)
+
+
+class DecorrelatedJitterBackoff(Backoff):
+    """``min(cap, uniform(base, previous * 3))``: each delay grows from the last one."""
+
+    def __init__(self, base: float = 0.2, cap: float = 5.0, rng: Optional[random.Random] = None):
+        super().__init__(rng)
+        self.base = float(base)
+        self.cap = float(cap)
+
+    def next_delay(self, attempt: int, previous: float) -> float:
+        upper = max(self.base, previous * 3)
+        return min(self.cap, self.rng.uniform(self.base, upper))
+
+
+class LinearBackoff(Backoff):
+    """``base + step * (attempt - 1)`` capped at ``cap``; ``step=0`` is a fixed delay."""
+
+    def __init__(
+        self,
+        base: float = 0.2,
+        step: float = 0.2,
+        cap: float = 5.0,
+        jitter: float = 0.0,
+        rng: Optional[random.Random] = None,
+    ):
+        super().__init__(rng)
+        self.base = float(base)
+        self.step = float(step)
+        self.cap = float(cap)
+        self.jitter = float(jitter)
+
+    def next_delay(self, attempt: int, previous: float) -> float:
+        delay = min(self.cap, self.base + self.step * (attempt - 1))
+        return self._jittered(delay, self.jitter)
+
+
+class FixedBackoff(LinearBackoff):
+    """The same ``delay`` before every retry."""
+
+    def __init__(
+        self, delay: float = 0.2, jitter: float = 0.0, rng: Optional[random.Random] = None
+    ):
+        super().__init__(delay, 0.0, delay, jitter, rng)
+
+
+# name -> factory(base, cap, rng), for the simulator and the CLI
+BACKOFF_STRATEGIES: Dict[str, Callable[[float, float, random.Random], Backoff]] = {
+    "exponential": lambda base, cap, rng: ExponentialBackoff(base, cap, rng=rng),
+    "full": lambda base, cap, rng: FullJitterBackoff(base, cap, rng),
+    "equal": lambda base, cap, rng: EqualJitterBackoff(base, cap, rng),
+    "decorrelated": lambda base, cap, rng: DecorrelatedJitterBackoff(base, cap, rng),
+    "linear": lambda base, cap, rng: LinearBackoff(base, base, cap, rng=rng),
+    "fixed": lambda base, cap, rng: FixedBackoff(base, rng=rng),
+}
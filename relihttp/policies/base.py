@@ -3,10 +3,15 @@
 # @Author  : fzf
 # @FileName: base.py
 # @Software: PyCharm
+from typing import FrozenSet
+
 from ..models import Context
 
 
 class Policy:
+    # overridden hooks this instance doesn't need (e.g. a feature switched
+    # off); the pipeline leaves them out like the empty defaults
+    inactive_hooks: FrozenSet[str] = frozenset()
 
     def before_request(self, ctx: Context) -> None:
         pass
@@ -23,6 +28,10 @@ class Policy:
     def ob_retry(self, ctx: Context) -> None:
         pass
 
+    # stream=True: called once the body is fully read or closed (ctx.error = stream error)
+    def after_stream(self, ctx: Context) -> None:
+        pass
+
     async def async_before_request(self, ctx: Context) -> None:
         self.before_request(ctx)
 
@@ -35,3 +44,6 @@ class Policy:
     async def async_get_retry_delay_seconds(self, ctx: Context) -> float:
         delay = self.get_retry_delay_seconds(ctx)
         return float(delay) if delay is not None else 0.0
+
+    async def async_after_stream(self, ctx: Context) -> None:
+        self.after_stream(ctx)
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 21:25
+# @Author  : fzf
+# @FileName: bulkhead.py
+# @Software: PyCharm
+import threading
+from typing import Callable, Dict, Hashable, Mapping, Optional
+from urllib.parse import urlsplit
+
+from .base import Policy
+from .slots import AsyncSlotQueue
+from ..models import Context
+from ..utils import monotonic
+
+
+class BulkheadFullError(RuntimeError):
+    pass
+
+
+def host_key(ctx: Context) -> str:
+    """Default bulkhead key: ``host[:port]`` of the request URL."""
+    return urlsplit(ctx.request.url).netloc
+
+
+class _Compartment:
+    def __init__(self, max_concurrent: int) -> None:
+        self.max_concurrent = max_concurrent
+        self.in_flight = 0
+        self.sync_waiting = 0
+        self.peak = 0
+        self.rejected = 0
+        self.cond = threading.Condition()
+        self.queue = AsyncSlotQueue(self.cond)
+
+    @property
+    def waiting(self) -> int:
+        return self.sync_waiting + len(self.queue)
+
+    def try_acquire(self) -> bool:
+        # caller holds cond
+        if self.in_flight >= self.max_concurrent:
+            return False
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "utilisation": self.in_flight / self.max_concurrent,
+            "peak": self.peak,
+            "rejected": self.rejected,
+        }
+
+
+class BulkheadPolicy(Policy):
+    """
+    Cap in-flight requests per destination, so one slow dependency cannot
+    take every worker.
+
+    Requests are grouped by ``key_fn(ctx)`` (default: host and port). Each
+    group allows ``max_concurrent`` requests in flight (``limits`` overrides
+    it per key); up to ``max_queue`` more wait at most ``queue_timeout``
+    seconds for a slot. Anything beyond that raises BulkheadFullError.
+    ``stats()`` reports utilisation per key.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = 10,
+        max_queue: int = 0,
+        queue_timeout: float = 1.0,
+        key_fn: Callable[[Context], Hashable] = host_key,
+        limits: Optional[Mapping[Hashable, int]] = None,
+        time_fn: Callable[[], float] = monotonic,
+    ):
+        if max_concurrent <= 0:
+            raise ValueError("max_concurrent must be > 0")
+        if max_queue < 0:
+            raise ValueError("max_queue must be >= 0")
+        if queue_timeout < 0:
+            raise ValueError("queue_timeout must be >= 0")
+        if limits and min(limits.values()) <= 0:
+            raise ValueError("limits must be > 0")
+
+        self.max_concurrent = int(max_concurrent)
+        self.max_queue = int(max_queue)
+        self.queue_timeout = float(queue_timeout)
+        self.key_fn = key_fn
+        self.limits = dict(limits or {})
+        self.time_fn = time_fn
+
+        self._compartments: Dict[Hashable, _Compartment] = {}
+        self._lock = threading.Lock()
+
+    def _compartment(self, key: Hashable) -> _Compartment:
+        compartment = self._compartments.get(key)
+        if compartment is None:
+            with self._lock:
+                compartment = self._compartments.get(key)
+                if compartment is None:
+                    limit = self.limits.get(key, self.max_concurrent)
+                    compartment = self._compartments[key] = _Compartment(limit)
+        return compartment
+
+    def stats(self) -> Dict[Hashable, Dict[str, float]]:
+        with self._lock:
+            compartments = dict(self._compartments)
+        return {key: c.stats() for key, c in compartments.items()}
+
+    def _reject(self, key: Hashable, compartment: _Compartment) -> BulkheadFullError:
+        # caller holds compartment.cond
+        compartment.rejected += 1
+        return BulkheadFullError(
+            f"bulkhead full for {key}: {compartment.in_flight} in flight, "
+            f"{compartment.waiting} waiting"
+        )
+
+    def before_request(self, ctx: Context) -> None:
+        key = self.key_fn(ctx)
+        compartment = self._compartment(key)
+        with compartment.cond:
+            if not compartment.try_acquire():
+                if compartment.waiting >= self.max_queue:
+                    raise self._reject(key, compartment)
+                compartment.sync_waiting += 1
+                try:
+                    deadline = float(self.time_fn()) + self.queue_timeout
+                    while not compartment.try_acquire():
+                        remaining = deadline - float(self.time_fn())
+                        if remaining <= 0:
+                            raise self._reject(key, compartment)
+                        compartment.cond.wait(remaining)
+                finally:
+                    compartment.sync_waiting -= 1
+        ctx.tags["bulkhead_key"] = key
+
+    def after_response(self, ctx: Context) -> None:
+        if "bulkhead_key" not in ctx.tags:
+            return
+        compartment = self._compartment(ctx.tags.pop("bulkhead_key"))
+        with compartment.cond:
+            compartment.in_flight -= 1
+            self._wake(compartment)
+
+    def _wake(self, compartment: _Compartment) -> None:
+        # caller holds compartment.cond
+        compartment.cond.notify()
+
+
+class AsyncBulkheadPolicy(BulkheadPolicy):
+    """
+    ``BulkheadPolicy`` for ``AsyncClient``: queued requests await a slot on
+    the event loop, and a freed slot goes to the longest-waiting request.
+    """
+
+    async def async_before_request(self, ctx: Context) -> None:
+        key = self.key_fn(ctx)
+        compartment = self._compartment(key)
+        with compartment.cond:
+            if not compartment.queue.waiters and compartment.try_acquire():
+                ctx.tags["bulkhead_key"] = key
+                return
+            if compartment.waiting >= self.max_queue:
+                raise self._reject(key, compartment)
+            waiter = compartment.queue.enqueue()
+
+        def release() -> None:
+            compartment.in_flight -= 1
+            self._wake(compartment)
+
+        await compartment.queue.wait(
+            waiter, self.queue_timeout, lambda: self._reject(key, compartment), release
+        )
+        ctx.tags["bulkhead_key"] = key
+
+    def _wake(self, compartment: _Compartment) -> None:
+        compartment.queue.hand_off(compartment.try_acquire)
+        # sync callers sharing this policy
+        compartment.cond.notify()
@@ -3,6 +3,7 @@
 # @Author  : fzf
 # @FileName: circuit.py
 # @Software: PyCharm
+import threading
 from collections import deque
 from dataclasses import dataclass
 from typing import Callable, Deque, Iterable, Optional, Set
@@ -24,6 +25,7 @@ class _CircuitState:
     opened_at: float = 0.0
     half_open_in_flight: bool = False
     window: Deque[bool] = None
+    window_failures: int = 0
 
 
 class CircuitBreakerPolicy(Policy):
@@ -33,6 +35,9 @@ class CircuitBreakerPolicy(Policy):
     - closed: requests pass through, failures are counted
     - open: requests are rejected until recovery timeout
     - half_open: allow limited probe; success closes, failure re-opens
+
+    Safe to share across threads: state changes happen under a lock, and the
+    common closed-state path of ``before_request`` does not take it.
     """
 
     def __init__(
@@ -71,48 +76,81 @@ class CircuitBreakerPolicy(Policy):
 
         window = deque(maxlen=self.window_size) if self.window_size else None
         self._state = _CircuitState(window=window)
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state.state
 
     def before_request(self, ctx: Context) -> None:
-        if self._state.state == "open":
-            now = float(self.time_fn())
-            if now - self._state.opened_at < self.recovery_timeout:
-                raise CircuitOpenError("circuit open")
+        if self._state.state == "closed":
+            return
 
-            # move to half-open and allow a probe
-            self._state.state = "half_open"
-            self._state.success_count = 0
-            self._state.half_open_in_flight = False
+        with self._lock:
+            if self._state.state == "open":
+                now = float(self.time_fn())
+                if now - self._state.opened_at < self.recovery_timeout:
+                    raise CircuitOpenError("circuit open")
 
-        if self._state.state == "half_open":
-            if self._state.half_open_in_flight:
-                raise CircuitOpenError("circuit half-open: probe in flight")
-            self._state.half_open_in_flight = True
+                # move to half-open and allow a probe
+                self._state.state = "half_open"
+                self._state.success_count = 0
+                self._state.half_open_in_flight = False
 
-    def after_response(self, ctx: Context) -> None:
-        success = self._is_success(ctx)
+            if self._state.state == "half_open":
+                if self._state.half_open_in_flight:
+                    raise CircuitOpenError("circuit half-open: probe in flight")
+                self._state.half_open_in_flight = True
+                ctx.tags["circuit_probe"] = True
 
-        if self._state.state == "half_open":
-            self._state.half_open_in_flight = False
-            if success:
-                self._state.success_count += 1
-                if self._state.success_count >= self.half_open_successes:
-                    self._close()
-            else:
-                self._open()
+    def after_response(self, ctx: Context) -> None:
+        probe = ctx.tags.pop("circuit_probe", False)
+        if "rejected_by" in ctx.tags:
+            # an inner policy refused to send: the backend was never tried
+            if probe:
+                with self._lock:
+                    self._state.half_open_in_flight = False
             return
+        success = self._is_success(ctx)
 
-        if self._state.state == "closed":
-            if success:
-                self._state.failure_count = 0
-            else:
-                self._state.failure_count += 1
-                if self._state.failure_count >= self.failure_threshold:
+        with self._lock:
+            if self._state.state == "half_open":
+                # only the probe decides; late results from before the trip are ignored
+                if not probe:
+                    return
+                self._state.half_open_in_flight = False
+                if success:
+                    self._state.success_count += 1
+                    if self._state.success_count >= self.half_open_successes:
+                        self._close()
+                else:
                     self._open()
+                return
 
-            if self._state.window is not None:
-                self._record_window(success)
-                if self._should_open_by_ratio():
-                    self._open()
+            if self._state.state == "closed":
+                self._record_closed(success)
+
+    def after_stream(self, ctx: Context) -> None:
+        # headers were already counted as a success; a body that breaks
+        # mid-stream is a failure of the same backend
+        if ctx.error is None:
+            return
+        with self._lock:
+            if self._state.state == "closed":
+                self._record_closed(False)
+
+    def _record_closed(self, success: bool) -> None:
+        if success:
+            self._state.failure_count = 0
+        else:
+            self._state.failure_count += 1
+            if self._state.failure_count >= self.failure_threshold:
+                self._open()
+
+        if self._state.window is not None:
+            self._record_window(success)
+            if self._should_open_by_ratio():
+                self._open()
 
     def _is_success(self, ctx: Context) -> bool:
         if ctx.error is not None:
@@ -122,9 +160,15 @@ class CircuitBreakerPolicy(Policy):
         return ctx.response.status_code not in self.failure_statuses
 
     def _record_window(self, success: bool) -> None:
-        if self._state.window is None:
+        window = self._state.window
+        if window is None:
             return
-        self._state.window.append(success)
+        # keep a running failure count so the ratio check is O(1)
+        if len(window) == window.maxlen and not window[0]:
+            self._state.window_failures -= 1
+        window.append(success)
+        if not success:
+            self._state.window_failures += 1
 
     def _should_open_by_ratio(self) -> bool:
         if self._state.window is None or self.failure_ratio is None:
@@ -132,8 +176,7 @@ class CircuitBreakerPolicy(Policy):
         total = len(self._state.window)
         if total < self.min_requests:
             return False
-        failures = sum(1 for ok in self._state.window if not ok)
-        return (failures / float(total)) >= self.failure_ratio
+        return (self._state.window_failures / float(total)) >= self.failure_ratio
 
     def _open(self) -> None:
         self._state.state = "open"
@@ -143,6 +186,7 @@ class CircuitBreakerPolicy(Policy):
         self._state.half_open_in_flight = False
         if self._state.window is not None:
             self._state.window.clear()
+            self._state.window_failures = 0
 
     def _close(self) -> None:
         self._state.state = "closed"
@@ -152,3 +196,4 @@ class CircuitBreakerPolicy(Policy):
         self._state.half_open_in_flight = False
         if self._state.window is not None:
             self._state.window.clear()
+            self._state.window_failures = 0
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 20:50
+# @Author  : fzf
+# @FileName: concurrency.py
+# @Software: PyCharm
+import asyncio
+import math
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple, Union
+
+from requests import Timeout
+
+from .base import Policy
+from .slots import AsyncSlotQueue
+from ..exceotions import TransportError
+from ..models import Context
+from ..utils import monotonic
+
+# what transports chain onto a TransportError when the backend did not answer
+# in time (asyncio.TimeoutError covers aiohttp's, it is also listed explicitly)
+TIMEOUT_ERRORS: Tuple[type, ...] = (Timeout, asyncio.TimeoutError, TimeoutError)
+try:
+    from aiohttp import ServerTimeoutError
+
+    TIMEOUT_ERRORS += (ServerTimeoutError,)
+except ImportError:  # pragma: no cover - aiohttp is optional
+    pass
+
+
+class ConcurrencyLimitExceeded(RuntimeError):
+    pass
+
+
+class AIMDLimit:
+    """
+    Additive increase, multiplicative decrease.
+
+    +1 per sample while at least half the limit is in use and latency stays
+    under ``tolerance`` x the minimum RTT; x ``backoff_ratio`` on a drop
+    (timeout, 429/503) or on latency inflation.
+    """
+
+    def __init__(self, backoff_ratio: float = 0.9, tolerance: float = 2.0):
+        if not 0.0 < backoff_ratio < 1.0:
+            raise ValueError("backoff_ratio must be in (0.0, 1.0)")
+        self.backoff_ratio = float(backoff_ratio)
+        self.tolerance = float(tolerance)
+
+    def update(
+        self, limit: float, rtt: float, min_rtt: float, in_flight: int, dropped: bool
+    ) -> float:
+        if dropped or rtt > min_rtt * self.tolerance:
+            return limit * self.backoff_ratio
+        if in_flight * 2 >= limit:
+            return limit + 1.0
+        return limit
+
+
+class GradientLimit:
+    """
+    Vegas-style gradient: scale the limit by ``tolerance * min_rtt / rtt``
+    (clamped to [0.5, 1]) and add a ``sqrt(limit)`` queue allowance, smoothed
+    by ``smoothing``. A drop halves the gradient.
+    """
+
+    def __init__(self, smoothing: float = 0.2, tolerance: float = 1.5):
+        if not 0.0 < smoothing <= 1.0:
+            raise ValueError("smoothing must be in (0.0, 1.0]")
+        self.smoothing = float(smoothing)
+        self.tolerance = float(tolerance)
+
+    def update(
+        self, limit: float, rtt: float, min_rtt: float, in_flight: int, dropped: bool
+    ) -> float:
+        gradient = 0.5 if dropped else max(0.5, min(1.0, self.tolerance * min_rtt / rtt))
+        # an app-limited client (few requests in flight) learns nothing about capacity
+        if gradient >= 1.0 and in_flight * 2 < limit:
+            return limit
+        target = limit * gradient + math.sqrt(limit)
+        return limit * (1.0 - self.smoothing) + target * self.smoothing
+
+
+class AdaptiveConcurrencyPolicy(Policy):
+    """
+    Cap in-flight requests with a limit that follows observed latency.
+
+    The limit grows while latency stays near the minimum RTT (tracked over
+    the last one or two ``rtt_window`` seconds, so it follows the backend
+    through the day) and shrinks on latency inflation, timeouts and
+    ``drop_statuses``. ``algorithm`` is ``AIMDLimit()`` (default) or
+    ``GradientLimit()``.
+
+    mode:
+      - "queue": wait up to ``queue_timeout`` seconds for a free slot
+      - "reject": raise ConcurrencyLimitExceeded at once
+
+    Every attempt takes a slot. For stream=True the slot is released when the
+    headers arrive. Share one instance across clients to share the limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        algorithm: Union[AIMDLimit, GradientLimit, None] = None,
+        mode: str = "queue",
+        queue_timeout: float = 1.0,
+        drop_statuses: Optional[Iterable[int]] = None,
+        rtt_window: float = 30.0,
+        time_fn: Callable[[], float] = monotonic,
+    ):
+        if not 0 < min_limit <= initial_limit <= max_limit:
+            raise ValueError("need 0 < min_limit <= initial_limit <= max_limit")
+        if mode not in ("queue", "reject"):
+            raise ValueError("mode must be 'queue' or 'reject'")
+        if queue_timeout < 0:
+            raise ValueError("queue_timeout must be >= 0")
+
+        self.min_limit = int(min_limit)
+        self.max_limit = int(max_limit)
+        self.algorithm = algorithm or AIMDLimit()
+        self.mode = mode
+        self.queue_timeout = float(queue_timeout)
+        self.drop_statuses = set(drop_statuses or {429, 503})
+        self.rtt_window = float(rtt_window)
+        self.time_fn = time_fn
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._min_rtt = math.inf
+        self._prev_min_rtt = math.inf
+        self._window_start = float(time_fn())
+        self._rejected = 0
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            min_rtt = min(self._min_rtt, self._prev_min_rtt)
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "min_rtt_ms": round(min_rtt * 1000, 3) if min_rtt < math.inf else None,
+                "rejected": self._rejected,
+                "dropped": self._dropped,
+            }
+
+    def _take_slot(self) -> bool:
+        # caller holds the lock
+        if self._in_flight >= int(self._limit):
+            return False
+        self._in_flight += 1
+        return True
+
+    def _try_acquire(self, ctx: Context) -> bool:
+        # caller holds the lock
+        if not self._take_slot():
+            return False
+        ctx.tags["concurrency_start"] = float(self.time_fn())
+        return True
+
+    def _reject(self) -> ConcurrencyLimitExceeded:
+        # caller holds the lock
+        self._rejected += 1
+        return ConcurrencyLimitExceeded(
+            f"concurrency limit reached: {self._in_flight}/{int(self._limit)} in flight"
+        )
+
+    def before_request(self, ctx: Context) -> None:
+        with self._cond:
+            if self._try_acquire(ctx):
+                return
+            if self.mode == "reject":
+                raise self._reject()
+            deadline = float(self.time_fn()) + self.queue_timeout
+            while True:
+                remaining = deadline - float(self.time_fn())
+                if remaining <= 0:
+                    raise self._reject()
+                self._cond.wait(remaining)
+                if self._try_acquire(ctx):
+                    return
+
+    def after_response(self, ctx: Context) -> None:
+        start = ctx.tags.pop("concurrency_start", None)
+        if start is None:
+            return
+        with self._cond:
+            self._in_flight -= 1
+            dropped = self._is_drop(ctx)
+            # rejected by an inner policy or failed fast (connection refused,
+            # ...): the latency says nothing about the backend's capacity
+            if "rejected_by" not in ctx.tags and (dropped or ctx.error is None):
+                self._on_sample(float(self.time_fn()) - start, dropped)
+            self._wake()
+
+    def _is_drop(self, ctx: Context) -> bool:
+        if ctx.response is not None:
+            return ctx.response.status_code in self.drop_statuses
+        error = ctx.error
+        if isinstance(error, TransportError):
+            if error.status_code is not None:
+                return error.status_code in self.drop_statuses
+            return isinstance(error.__cause__, TIMEOUT_ERRORS)
+        return False
+
+    def _on_sample(self, rtt: float, dropped: bool) -> None:
+        # caller holds the lock
+        now = float(self.time_fn())
+        if now - self._window_start >= self.rtt_window:
+            self._prev_min_rtt, self._min_rtt = self._min_rtt, math.inf
+            self._window_start = now
+        if dropped:
+            self._dropped += 1
+        else:
+            self._min_rtt = min(self._min_rtt, rtt)
+        min_rtt = min(self._min_rtt, self._prev_min_rtt)
+        if min_rtt == math.inf or rtt <= 0:
+            return
+        limit = self.algorithm.update(self._limit, rtt, min_rtt, self._in_flight + 1, dropped)
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), limit))
+
+    def _wake(self) -> None:
+        # caller holds the lock
+        self._cond.notify_all()
+
+
+class AsyncAdaptiveConcurrencyPolicy(AdaptiveConcurrencyPolicy):
+    """
+    ``AdaptiveConcurrencyPolicy`` for ``AsyncClient``: queued requests await
+    a slot on the event loop instead of blocking it. A freed slot is handed
+    to the longest-waiting request.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._queue = AsyncSlotQueue(self._lock)
+
+    async def async_before_request(self, ctx: Context) -> None:
+        with self._lock:
+            if not self._queue.waiters and self._try_acquire(ctx):
+                return
+            if self.mode == "reject":
+                raise self._reject()
+            waiter = self._queue.enqueue()
+
+        def release() -> None:
+            self._in_flight -= 1
+            self._wake()
+
+        await self._queue.wait(waiter, self.queue_timeout, self._reject, release)
+        ctx.tags["concurrency_start"] = float(self.time_fn())
+
+    def _wake(self) -> None:
+        self._queue.hand_off(self._take_slot)
+        # sync callers sharing this policy
+        self._cond.notify_all()
@@ -47,4 +47,30 @@ class LoggingPolicy(Policy):
                     "error_type": type(ctx.error).__name__,
                     "error": str(ctx.error),
                 },
-            )
\ No newline at end of file
+            )
+
+    def after_stream(self, ctx: Context) -> None:
+        if ctx.error is None:
+            logger.info(
+                "http.stream",
+                extra={
+                    "request_id": ctx.request_id,
+                    "method": ctx.request.method,
+                    "url": ctx.request.url,
+                    "bytes": ctx.tags.get("stream_bytes"),
+                    "attempt": ctx.attempt,
+                },
+            )
+        else:
+            logger.warning(
+                "http.stream_error",
+                extra={
+                    "request_id": ctx.request_id,
+                    "method": ctx.request.method,
+                    "url": ctx.request.url,
+                    "bytes": ctx.tags.get("stream_bytes"),
+                    "attempt": ctx.attempt,
+                    "error_type": type(ctx.error).__name__,
+                    "error": str(ctx.error),
+                },
+            )
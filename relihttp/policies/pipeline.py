@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 16:40
+# @Author  : fzf
+# @FileName: pipeline.py
+# @Software: PyCharm
+from dataclasses import dataclass
+from typing import Any, Callable, List, Sequence, Tuple
+
+from .base import Policy
+
+Hook = Callable[..., Any]
+# (hook, is_coroutine_function)
+AsyncHook = Tuple[Hook, bool]
+
+
+def _overrides(policy: Policy, name: str) -> bool:
+    if name.replace("async_", "", 1) in policy.inactive_hooks:
+        return False
+    return getattr(type(policy), name, None) is not getattr(Policy, name)
+
+
+def _async_hook(policy: Policy, name: str) -> Tuple[Hook, bool]:
+    # an overridden async_* hook wins; otherwise call the sync hook directly
+    # instead of going through the base class's coroutine wrapper
+    if _overrides(policy, "async_" + name):
+        return getattr(policy, "async_" + name), True
+    return getattr(policy, name), False
+
+
+@dataclass(frozen=True)
+class Pipeline:
+    """
+    Policy hooks resolved once per client.
+
+    Each tuple only holds policies that override the hook, in call order
+    (``after_*`` hooks are already reversed), so the request loop never calls
+    the empty ``Policy`` defaults.
+
+    ``unwind[i]`` holds the ``after_response`` hooks of the policies listed
+    before the owner of ``before[i]``, innermost first: they run when that
+    ``before_request`` rejects the request, so slots they took are released.
+    """
+
+    before: Tuple[Hook, ...]
+    after: Tuple[Hook, ...]
+    retry: Tuple[Tuple[Hook, Hook], ...]
+    after_stream: Tuple[Hook, ...]
+    unwind: Tuple[Tuple[Hook, ...], ...]
+
+    async_before: Tuple[AsyncHook, ...]
+    async_after: Tuple[AsyncHook, ...]
+    async_retry: Tuple[Tuple[AsyncHook, AsyncHook], ...]
+    async_after_stream: Tuple[AsyncHook, ...]
+    async_unwind: Tuple[Tuple[AsyncHook, ...], ...]
+
+
+def compile_pipeline(policies: Sequence[Policy]) -> Pipeline:
+    def sync_hooks(name: str, ordered: Sequence[Policy]) -> Tuple[Hook, ...]:
+        return tuple(getattr(p, name) for p in ordered if _overrides(p, name))
+
+    def async_hooks(name: str, ordered: Sequence[Policy]) -> Tuple[AsyncHook, ...]:
+        return tuple(
+            _async_hook(p, name)
+            for p in ordered
+            if _overrides(p, name) or _overrides(p, "async_" + name)
+        )
+
+    rev = list(reversed(policies))
+    # for each policy with a before hook: the policies wrapped around it
+    sync_outer = [
+        list(reversed(policies[:i]))
+        for i, p in enumerate(policies)
+        if _overrides(p, "before_request")
+    ]
+    async_outer = [
+        list(reversed(policies[:i]))
+        for i, p in enumerate(policies)
+        if _overrides(p, "before_request") or _overrides(p, "async_before_request")
+    ]
+    retrying = [
+        p for p in policies if _overrides(p, "should_retry") or _overrides(p, "async_should_retry")
+    ]
+    return Pipeline(
+        before=sync_hooks("before_request", policies),
+        after=sync_hooks("after_response", rev),
+        retry=tuple(
+            (p.should_retry, p.get_retry_delay_seconds)
+            for p in policies
+            if _overrides(p, "should_retry")
+        ),
+        after_stream=sync_hooks("after_stream", rev),
+        unwind=tuple(sync_hooks("after_response", ps) for ps in sync_outer),
+        async_before=async_hooks("before_request", policies),
+        async_after=async_hooks("after_response", rev),
+        async_retry=tuple(
+            (_async_hook(p, "should_retry"), _async_hook(p, "get_retry_delay_seconds"))
+            for p in retrying
+        ),
+        async_after_stream=async_hooks("after_stream", rev),
+        async_unwind=tuple(async_hooks("after_response", ps) for ps in async_outer),
+    )
+
+
+def _mutator(name: str) -> Callable[..., Any]:
+    method = getattr(list, name)
+
+    def wrapper(self: "PolicyList", *args: Any, **kwargs: Any) -> Any:
+        result = method(self, *args, **kwargs)
+        self._on_change(self)
+        return result
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+class PolicyList(List[Policy]):
+    """
+    A list of policies that calls ``on_change(self)`` after every in-place
+    change, so a client can recompile its pipeline.
+    """
+
+    def __init__(self, policies: Sequence[Policy], on_change: Callable[[List[Policy]], None]):
+        super().__init__(policies)
+        self._on_change = on_change
+
+
+# every list method that changes the list in place goes through _mutator
+for _name in (
+    "__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+    "insert", "pop", "remove", "clear", "sort", "reverse",
+):
+    setattr(PolicyList, _name, _mutator(_name))
+del _name
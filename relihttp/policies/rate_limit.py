@@ -3,18 +3,57 @@
 # @Author  : fzf
 # @FileName: rate_limit.py
 # @Software: PyCharm
-from typing import Awaitable, Callable, Optional
+import math
+import time
+from typing import Awaitable, Callable, Dict, Mapping, NamedTuple, Optional
 
 from .base import Policy
 from ..models import Context
-from ..utils import TokenBucket
+from ..utils import TokenBucket, parse_retry_after
 from ..utils import sleep as _sleep
 
+# X-RateLimit-Reset above this is a Unix timestamp, not delta-seconds
+_EPOCH_THRESHOLD = 1e9
+
 
 class RateLimitedError(RuntimeError):
     pass
 
 
+class Quota(NamedTuple):
+    limit: Optional[float]
+    remaining: float
+    reset: float  # seconds until the window resets
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    # "100" or "100, 100;w=60" (IETF draft, with a quota policy) -> 100.0
+    if not value:
+        return None
+    try:
+        number = float(value.split(",")[0].split(";")[0].strip())
+    except ValueError:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def parse_rate_limit(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[Quota]:
+    """
+    Server quota from ``RateLimit-Limit/Remaining/Reset`` or their
+    ``X-RateLimit-*`` forms; None unless both remaining and reset are present
+    and finite. A reset larger than 1e9 is read as a Unix timestamp.
+    """
+    for prefix in ("RateLimit-", "X-RateLimit-"):
+        remaining = _number(headers.get(prefix + "Remaining"))
+        reset = _number(headers.get(prefix + "Reset"))
+        if remaining is None or reset is None:
+            continue
+        if reset > _EPOCH_THRESHOLD:
+            reset -= time.time() if now is None else now
+        return Quota(_number(headers.get(prefix + "Limit")), max(0.0, remaining), max(0.0, reset))
+    return None
+
+
 class RateLimitPolicy(Policy):
     """
     Token-bucket rate limiter policy.
@@ -24,6 +63,11 @@ class RateLimitPolicy(Policy):
     mode:
       - "sleep": block and wait until allowed
       - "raise": raise RateLimitedError when would block
+    adaptive: retune the bucket from the server's rate-limit headers, spreading
+      the remaining quota over the time left until it resets (a 429 with only
+      Retry-After pauses the bucket for that long). ``max_rate`` caps it,
+      ``min_rate`` (default 0.1% of rate_limit) keeps it from stalling, and
+      a reset further away than ``max_reset`` seconds counts as ``max_reset``.
     """
 
     def __init__(
@@ -34,6 +78,10 @@ class RateLimitPolicy(Policy):
         mode: str = "sleep",
         bucket: Optional[TokenBucket] = None,
         sleep_fn: Callable[[float], None] = _sleep,
+        adaptive: bool = False,
+        max_rate: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        max_reset: float = 60.0,
     ):
         self.rate_limit = float(rate_limit)
         self.burst = float(burst) if burst is not None else float(rate_limit)
@@ -41,9 +89,18 @@ class RateLimitPolicy(Policy):
         self.sleep_fn = sleep_fn
 
         self.bucket = bucket or TokenBucket(rate=self.rate_limit, capacity=self.burst)
+        self.adaptive = adaptive
+        # only the adaptive limiter reads responses
+        self.inactive_hooks = frozenset() if adaptive else frozenset({"after_response"})
+        self.max_rate = max_rate
+        self.min_rate = float(min_rate) if min_rate is not None else self.rate_limit / 1000
+        self.max_reset = float(max_reset)
+        self.quota: Optional[Quota] = None
 
         if self.mode not in ("sleep", "raise"):
             raise ValueError("mode must be 'sleep' or 'raise'")
+        if self.min_rate <= 0 or self.max_reset <= 0:
+            raise ValueError("min_rate and max_reset must be > 0")
 
     def before_request(self, ctx: Context) -> None:
         # Acquire one token per request (simple + predictable).
@@ -61,6 +118,42 @@ class RateLimitPolicy(Policy):
             self.sleep_fn(remaining)
             remaining = self.bucket.acquire(1.0)
 
+    def after_response(self, ctx: Context) -> None:
+        if not self.adaptive:
+            return
+        headers = ctx.response_headers()
+        if not headers:
+            return
+        quota = parse_rate_limit(headers)
+        if quota is None:
+            status = ctx.response.status_code if ctx.response is not None else None
+            if status is None:
+                status = getattr(ctx.error, "status_code", None)
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            if status != 429 or retry_after is None:
+                return
+            quota = Quota(None, 0.0, retry_after)
+        if quota.reset <= 0:
+            return
+        self.quota = quota
+        # nothing left: one token when the window resets, then the next
+        # response retunes the rate; a far-off reset (Retry-After: 86400)
+        # must not stall sleep-mode callers for that long
+        rate = max(quota.remaining, 1.0) / min(quota.reset, self.max_reset)
+        rate = max(rate, self.min_rate)
+        if self.max_rate is not None:
+            rate = min(rate, self.max_rate)
+        self.bucket.set_rate(rate, tokens=quota.remaining)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        quota = self.quota
+        return {
+            "rate": self.bucket.rate,
+            "limit": quota.limit if quota else None,
+            "remaining": quota.remaining if quota else None,
+            "reset": quota.reset if quota else None,
+        }
+
 
 class AsyncRateLimitPolicy(RateLimitPolicy):
     """
@@ -75,6 +168,10 @@ class AsyncRateLimitPolicy(RateLimitPolicy):
         mode: str = "sleep",
         bucket: Optional[TokenBucket] = None,
         sleep_fn: Optional[Callable[[float], Awaitable[None]]] = None,
+        adaptive: bool = False,
+        max_rate: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        max_reset: float = 60.0,
     ):
         super().__init__(
             rate_limit=rate_limit,
@@ -82,6 +179,10 @@ class AsyncRateLimitPolicy(RateLimitPolicy):
             mode=mode,
             bucket=bucket,
             sleep_fn=_sleep,
+            adaptive=adaptive,
+            max_rate=max_rate,
+            min_rate=min_rate,
+            max_reset=max_reset,
         )
         self.async_sleep_fn = sleep_fn
 
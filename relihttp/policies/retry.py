@@ -3,17 +3,147 @@
 # @Author  : fzf
 # @FileName: retry.py
 # @Software: PyCharm
-from typing import Iterable, Optional, Set
+import logging
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set
+from urllib.parse import urlsplit
+
 import requests
 
+from .backoff import Backoff, ExponentialBackoff
 from .base import Policy
 from ..exceotions import TransportError
 from ..models import Context
-from ..utils import exponential_backoff, add_jitter
+from ..utils import monotonic, parse_retry_after
 
 
 SAFE_METHODS: Set[str] = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
 
+logger = logging.getLogger("relihttp")
+
+
+class _BudgetWindow:
+    """Request and retry counts over a sliding window of ``buckets`` slots."""
+
+    def __init__(self, slot_seconds: float, buckets: int) -> None:
+        self.slot_seconds = slot_seconds
+        self.buckets = buckets
+        # [slot index, requests, retries], oldest first
+        self.slots: Deque[List[int]] = deque()
+        self.requests = 0
+        self.retries = 0
+        self.exhausted = 0
+
+    def advance(self, now: float) -> List[int]:
+        index = int(now // self.slot_seconds)
+        while self.slots and self.slots[0][0] <= index - self.buckets:
+            _, requests_, retries = self.slots.popleft()
+            self.requests -= requests_
+            self.retries -= retries
+        if not self.slots or self.slots[-1][0] != index:
+            self.slots.append([index, 0, 0])
+        return self.slots[-1]
+
+
+class RetryBudget:
+    """
+    Client-wide cap on retries, so a brownout is not multiplied by every
+    client's ``max_retries``.
+
+    A retry is allowed while retries over the last ``window`` seconds stay
+    below ``ratio`` x first attempts in that window, plus a floor of
+    ``min_per_second`` retries/s so quiet clients can still retry. Share one
+    instance across clients for a process-wide budget; ``per_host=True``
+    keeps a separate budget per host. ``on_exhausted(ctx, key)`` is called
+    for every retry the budget denies, outside its lock.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        min_per_second: float = 10.0,
+        window: float = 10.0,
+        *,
+        per_host: bool = False,
+        buckets: int = 10,
+        time_fn: Callable[[], float] = monotonic,
+        on_exhausted: Optional[Callable[[Context, str], None]] = None,
+    ):
+        if ratio < 0:
+            raise ValueError("ratio must be >= 0")
+        if min_per_second < 0:
+            raise ValueError("min_per_second must be >= 0")
+        if window <= 0 or buckets <= 0:
+            raise ValueError("window and buckets must be > 0")
+        self.ratio = float(ratio)
+        self.min_per_second = float(min_per_second)
+        self.window = float(window)
+        self.per_host = per_host
+        self.buckets = int(buckets)
+        self.time_fn = time_fn
+        self.on_exhausted = on_exhausted
+        self._windows: Dict[str, _BudgetWindow] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, ctx: Context) -> str:
+        return urlsplit(ctx.request.url).netloc if self.per_host else "*"
+
+    def _window(self, ctx: Context) -> _BudgetWindow:
+        # caller holds the lock
+        key = self._key(ctx)
+        window = self._windows.get(key)
+        if window is None:
+            window = self._windows[key] = _BudgetWindow(self.window / self.buckets, self.buckets)
+        return window
+
+    def record_request(self, ctx: Context) -> None:
+        with self._lock:
+            window = self._window(ctx)
+            window.advance(float(self.time_fn()))[1] += 1
+            window.requests += 1
+
+    def try_retry(self, ctx: Context) -> bool:
+        with self._lock:
+            window = self._window(ctx)
+            slot = window.advance(float(self.time_fn()))
+            allowed = window.requests * self.ratio + self.min_per_second * self.window
+            exhausted = window.retries + 1 > allowed
+            if exhausted:
+                window.exhausted += 1
+            else:
+                slot[2] += 1
+                window.retries += 1
+        if exhausted:
+            key = self._key(ctx)
+            logger.warning(
+                "http.retry_budget_exhausted",
+                extra={
+                    "request_id": ctx.request_id,
+                    "method": ctx.request.method,
+                    "url": ctx.request.url,
+                    "attempt": ctx.attempt,
+                    "budget_key": key,
+                },
+            )
+            if self.on_exhausted is not None:
+                self.on_exhausted(ctx, key)
+        return not exhausted
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per key (host, or "*" for a client-wide budget): counts in the current window."""
+        with self._lock:
+            now = float(self.time_fn())
+            result = {}
+            for key, window in self._windows.items():
+                window.advance(now)
+                result[key] = {
+                    "requests": window.requests,
+                    "retries": window.retries,
+                    "exhausted": window.exhausted,
+                }
+            return result
+
 
 class RetryPolicy(Policy):
     def __init__(
@@ -24,6 +154,10 @@ class RetryPolicy(Policy):
         base_delay: float = 0.2,
         max_delay: float = 5.0,
         jitter: float = 0.2,
+        budget: Optional[RetryBudget] = None,
+        respect_retry_after: bool = True,
+        max_retry_after: float = 60.0,
+        backoff: Optional[Backoff] = None,
     ):
         self.max_retries = int(max_retries)
         self.retry_mode = retry
@@ -31,8 +165,26 @@ class RetryPolicy(Policy):
         self.base_delay = float(base_delay)
         self.max_delay = float(max_delay)
         self.jitter = float(jitter)
+        self.budget = budget
+        # a server-sent Retry-After replaces the backoff, up to max_retry_after
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = float(max_retry_after)
+        # base_delay/max_delay/jitter configure the default schedule only
+        self.backoff = backoff or ExponentialBackoff(self.base_delay, self.max_delay, self.jitter)
 
     def should_retry(self, ctx: Context) -> bool:
+        if self.budget is None:
+            return self._wants_retry(ctx)
+        if ctx.attempt == 1:
+            self.budget.record_request(ctx)
+        if not self._wants_retry(ctx):
+            return False
+        if not self.budget.try_retry(ctx):
+            ctx.tags["retry_budget_exhausted"] = True
+            return False
+        return True
+
+    def _wants_retry(self, ctx: Context) -> bool:
         if ctx.attempt >= ctx.max_retries:
             return False
 
@@ -69,5 +221,12 @@ class RetryPolicy(Policy):
         return False
 
     def get_retry_delay_seconds(self, ctx: Context) -> float:
-        delay = exponential_backoff(ctx.attempt, base=self.base_delay, cap=self.max_delay)
-        return add_jitter(delay, jitter=self.jitter)
+        if self.respect_retry_after:
+            headers = ctx.response_headers()
+            retry_after = parse_retry_after(headers.get("Retry-After")) if headers else None
+            if retry_after is not None:
+                ctx.tags["retry_after"] = retry_after
+                return min(retry_after, self.max_retry_after)
+        delay = self.backoff.next_delay(ctx.attempt, ctx.tags.get("retry_delay", 0.0))
+        ctx.tags["retry_delay"] = delay
+        return delay
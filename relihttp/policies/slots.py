@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 21:40
+# @Author  : fzf
+# @FileName: slots.py
+# @Software: PyCharm
+import asyncio
+from collections import deque
+from typing import Any, Callable, ContextManager, Deque
+
+
+class AsyncSlotQueue:
+    """
+    FIFO of coroutines waiting for a slot of a limited resource (bulkhead
+    compartment, concurrency limit, ...).
+
+    The owner keeps the slot count and guards this queue with its own
+    ``lock``: it calls ``enqueue`` and ``hand_off`` while holding it, and
+    awaits ``wait`` without it. ``hand_off`` gives freed slots straight to
+    the longest waiter, so new arrivals can't jump the queue.
+    """
+
+    def __init__(self, lock: ContextManager[Any]) -> None:
+        self.lock = lock
+        self.waiters: Deque["asyncio.Future[None]"] = deque()
+
+    def __len__(self) -> int:
+        return len(self.waiters)
+
+    def enqueue(self) -> "asyncio.Future[None]":
+        # caller holds the lock
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        return waiter
+
+    async def wait(
+        self,
+        waiter: "asyncio.Future[None]",
+        timeout: float,
+        reject: Callable[[], BaseException],
+        release: Callable[[], None],
+    ) -> None:
+        """
+        Wait up to ``timeout`` seconds for ``hand_off`` to grant ``waiter``
+        a slot. On timeout ``reject()`` is raised; a caller cancelled after
+        the grant gives the slot back with ``release()`` (lock held).
+        """
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except BaseException as e:
+            with self.lock:
+                # the slot may have been handed over just as the wait ended
+                granted = waiter.done() and not waiter.cancelled()
+                if not granted:
+                    if waiter in self.waiters:
+                        self.waiters.remove(waiter)
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise reject() from None
+                    raise
+                if not isinstance(e, asyncio.TimeoutError):
+                    # cancelled while holding a slot: give it back
+                    release()
+                    raise
+
+    def hand_off(self, try_acquire: Callable[[], bool]) -> None:
+        # caller holds the lock; try_acquire takes one slot if one is free
+        while self.waiters:
+            if self.waiters[0].done():
+                self.waiters.popleft()
+            elif try_acquire():
+                self.waiters.popleft().set_result(None)
+            else:
+                return
@@ -4,8 +4,9 @@
 # @FileName: aiohttp.py
 # @Software: PyCharm
 import asyncio
+import time
 from ..exceotions import TransportError
-from typing import Optional
+from typing import Any, Dict, Mapping, Optional
 from aiohttp import ClientError
 
 try:
@@ -14,52 +15,205 @@ except Exception:  # pragma: no cover - handled at runtime
     aiohttp = None
 
 from .async_base import AsyncTransport
+from .base import prepare_body
 from ..models import Context, Response
 from ..utils import now_ms
 
 
+class _AiohttpByteStream:
+    """Body stream over an ``aiohttp`` response that is still attached to its connection."""
+
+    def __init__(self, resp: "aiohttp.ClientResponse", ctx: Context):
+        self._resp = resp
+        self._ctx = ctx
+
+    async def aiter_bytes(self, chunk_size: int):
+        req = self._ctx.request
+        try:
+            async for chunk in self._resp.content.iter_chunked(chunk_size):
+                yield chunk
+        except (ClientError, asyncio.TimeoutError) as e:
+            raise TransportError(
+                "stream error",
+                method=req.method,
+                url=req.url,
+                status_code=self._resp.status,
+            ) from e
+
+    def close(self) -> None:
+        # 读完的连接归还连接池，未读完的连接会被 aiohttp 关闭
+        self._resp.release()
+
+    async def aclose(self) -> None:
+        self.close()
+
+
+def _private_count(connector: Any, name: str) -> int:
+    # aiohttp 没有公开这些计数：属性不存在或结构变化时返回 0，而不是报错
+    value = getattr(connector, name, None)
+    try:
+        if isinstance(value, Mapping):
+            return sum(len(v) for v in value.values())
+        return len(value) if value is not None else 0
+    except TypeError:
+        return 0
+
+
+class _ConnectorStats:
+    """Connector counters fed by an aiohttp ``TraceConfig``."""
+
+    def __init__(self) -> None:
+        self.created = 0
+        self.reused = 0
+        self.queued = 0
+        self.waiting = 0
+        self.queue_wait_ms_total = 0.0
+        self.queue_wait_ms_max = 0.0
+        self.trace_config = aiohttp.TraceConfig()
+        self.trace_config.on_connection_create_end.append(self._on_create)
+        self.trace_config.on_connection_reuseconn.append(self._on_reuse)
+        self.trace_config.on_connection_queued_start.append(self._on_queued_start)
+        self.trace_config.on_connection_queued_end.append(self._on_queued_end)
+        # no queued_end is sent when a queued request is cancelled or times out
+        self.trace_config.on_request_exception.append(self._on_request_exception)
+
+    async def _on_create(self, session, trace_ctx, params) -> None:
+        self.created += 1
+
+    async def _on_reuse(self, session, trace_ctx, params) -> None:
+        self.reused += 1
+
+    async def _on_queued_start(self, session, trace_ctx, params) -> None:
+        self.queued += 1
+        self.waiting += 1
+        trace_ctx.queued_at = time.perf_counter()
+
+    async def _on_queued_end(self, session, trace_ctx, params) -> None:
+        self.waiting -= 1
+        waited_ms = (time.perf_counter() - trace_ctx.queued_at) * 1000.0
+        trace_ctx.queued_at = None
+        self.queue_wait_ms_total += waited_ms
+        self.queue_wait_ms_max = max(self.queue_wait_ms_max, waited_ms)
+
+    async def _on_request_exception(self, session, trace_ctx, params) -> None:
+        if getattr(trace_ctx, "queued_at", None) is not None:
+            trace_ctx.queued_at = None
+            self.waiting -= 1
+
+
 class AiohttpTransport(AsyncTransport):
-    def __init__(self, session: Optional[aiohttp.ClientSession] = None):
+    """
+    Transport built on ``aiohttp.ClientSession``.
+
+    Without a session, one is created on ``open()`` (or the first request)
+    with a ``TCPConnector`` built from the options below; a session you pass
+    in is used as-is and never closed by the transport.
+
+    limit: max connections in total (0 = unlimited)
+    limit_per_host: max connections per host (0 = unlimited)
+    keepalive_timeout: idle keep-alive seconds (None = aiohttp default)
+    ttl_dns_cache: DNS cache TTL in seconds (None = cache forever)
+    force_close: close the connection after each request
+    """
+
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: Optional[float] = None,
+        ttl_dns_cache: Optional[int] = 10,
+        force_close: bool = False,
+    ):
         if aiohttp is None:
             raise ImportError("aiohttp is required. Install with `pip install relihttp[async]`.")
         if session is ...:  # 防呆：有人传了 Ellipsis
             session = None
+        if force_close and keepalive_timeout is not None:
+            raise ValueError("keepalive_timeout cannot be set together with force_close")
         self._external_session = session is not None
         self.session = session
+        self.connector_options: Dict[str, Any] = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "ttl_dns_cache": ttl_dns_cache,
+            "force_close": force_close,
+        }
+        if keepalive_timeout is not None:
+            self.connector_options["keepalive_timeout"] = keepalive_timeout
+        self._stats = _ConnectorStats()
+
+    async def open(self) -> None:
+        """Create the session now (inside the running loop) instead of on first request."""
+        await self._ensure_session()
 
     async def _ensure_session(self) -> aiohttp.ClientSession:
-        if self.session is ...:
-            self.session = None
-        if self.session is None:
-            self.session = aiohttp.ClientSession()
+        if self.session is None or (not self._external_session and self.session.closed):
+            connector = aiohttp.TCPConnector(**self.connector_options)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                trace_configs=[self._stats.trace_config],
+            )
         return self.session
 
+    def pool_stats(self) -> Dict[str, Any]:
+        """
+        Connector usage: ``acquired`` connections in use, ``waiting`` requests
+        queued for a free slot, ``idle`` keep-alive connections, plus totals
+        of connections created/reused and time spent queued on the connector.
+        Only ``acquired`` and ``idle`` read connector internals; they are 0
+        if aiohttp changes them.
+        """
+        stats: Dict[str, Any] = {
+            "limit": self.connector_options["limit"],
+            "limit_per_host": self.connector_options["limit_per_host"],
+            "acquired": 0,
+            "waiting": self._stats.waiting,
+            "idle": 0,
+            "created": self._stats.created,
+            "reused": self._stats.reused,
+            "queued": self._stats.queued,
+            "queue_wait_ms_total": round(self._stats.queue_wait_ms_total, 3),
+            "queue_wait_ms_max": round(self._stats.queue_wait_ms_max, 3),
+        }
+        connector = self.session.connector if self.session is not None else None
+        if connector is None:
+            return stats
+        stats["limit"] = connector.limit
+        stats["limit_per_host"] = connector.limit_per_host
+        stats["acquired"] = _private_count(connector, "_acquired")
+        stats["idle"] = _private_count(connector, "_conns")
+        return stats
+
     async def send(self, ctx: Context) -> Response:
         req = ctx.request
         start = now_ms()
         session = await self._ensure_session()
 
         try:
+            if ctx.stream:
+                return await self._send_stream(session, ctx, start)
+
+            headers, data = prepare_body(ctx)
             async with session.request(
                 method=req.method,
                 url=req.url,
                 params=req.params,
-                headers=req.headers,
-                data=req.data,
-                json=req.json,
+                headers=headers,
+                data=data,
                 timeout=ctx.timeout,
             ) as r:
-                # 如果你希望 4xx/5xx 也走异常分支，打开这行
-                r.raise_for_status()
-
-                text = await r.text()
+                # 4xx/5xx 作为 Response 返回，由策略判断；需要异常时用 raise_for_status
+                content = await r.read()
                 end = now_ms()
                 return Response(
                     status_code=r.status,
-                    headers=dict(r.headers),
-                    text=text,
+                    headers=r.headers,
                     url=str(r.url),
                     elapsed_ms=end - start,
+                    content=content,
+                    encoding=r.charset,
                 )
 
         # --- 超时：aiohttp 和 asyncio 两个都可能出现 ---
@@ -82,7 +236,7 @@ class AiohttpTransport(AsyncTransport):
                 elapsed_ms=elapsed_ms,
             ) from e
 
-        # --- HTTP 非 2xx，只有当你调用 r.raise_for_status() 才会进来 ---
+        # --- 响应层面的错误（重定向过多等）---
         except aiohttp.ClientResponseError as e:
             # e.status / e.message / e.headers 都在
             elapsed_ms = now_ms() - start
@@ -92,6 +246,7 @@ class AiohttpTransport(AsyncTransport):
                 url=req.url,
                 status_code=e.status,
                 elapsed_ms=elapsed_ms,
+                headers=e.headers,
             ) from e
 
         # --- 兜底：aiohttp 所有 client 异常（TooManyRedirects、InvalidURL、PayloadError 等）---
@@ -104,8 +259,28 @@ class AiohttpTransport(AsyncTransport):
                 elapsed_ms=elapsed_ms,
             ) from e
 
+    async def _send_stream(self, session: "aiohttp.ClientSession", ctx: Context, start: int) -> Response:
+        req = ctx.request
+        headers, data = prepare_body(ctx)
+        r = await session.request(
+            method=req.method,
+            url=req.url,
+            params=req.params,
+            headers=headers,
+            data=data,
+            timeout=ctx.timeout,
+        )
+        return Response(
+            status_code=r.status,
+            headers=r.headers,
+            url=str(r.url),
+            elapsed_ms=now_ms() - start,
+            stream=_AiohttpByteStream(r, ctx),
+            encoding=r.charset,
+        )
 
     async def close(self) -> None:
         if self._external_session or self.session is None:
             return
-        await self.session.close()
+        session, self.session = self.session, None
+        await session.close()
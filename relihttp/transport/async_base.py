@@ -14,5 +14,15 @@ class AsyncTransport(ABC):
     async def send(self, ctx: Context) -> Response:
         ...
 
+    async def open(self) -> None:
+        return None
+
     async def close(self) -> None:
         return None
+
+    async def __aenter__(self) -> "AsyncTransport":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
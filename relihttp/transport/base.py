@@ -4,7 +4,84 @@
 # @FileName: base.py
 # @Software: PyCharm
 from abc import ABC, abstractmethod
-from ..models import Context, Response
+from typing import Any, List, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+from ..codecs import DEFAULT_JSON_CODEC
+from ..models import Context, Headers, Response
+
+
+def _has_header(headers: Mapping[str, str], name: str) -> bool:
+    if isinstance(headers, Headers):
+        return name in headers
+    name = name.lower()
+    return any(k.lower() == name for k in headers)
+
+
+def _is_form(data: Any) -> bool:
+    if isinstance(data, dict):
+        return bool(data)
+    if isinstance(data, (list, tuple)):
+        return bool(data) and all(isinstance(item, tuple) and len(item) == 2 for item in data)
+    return False
+
+
+def _form_pairs(data: Any) -> List[Tuple[Any, Any]]:
+    # like requests: None values, also inside lists, are left out
+    items = data.items() if isinstance(data, dict) else data
+    pairs: List[Tuple[Any, Any]] = []
+    for key, values in items:
+        if isinstance(values, (str, bytes)) or not hasattr(values, "__iter__"):
+            values = [values]
+        pairs.extend((key, value) for value in values if value is not None)
+    return pairs
+
+
+def _encode_body(ctx: Context) -> None:
+    req = ctx.request
+    content_type: Optional[str] = None
+    if req.json is not None:
+        codec = ctx.json_codec or DEFAULT_JSON_CODEC
+        body = codec.dumps(req.json)
+        content_type = "application/json"
+    elif isinstance(req.data, (bytes, bytearray, memoryview)):
+        body = bytes(req.data)
+    elif isinstance(req.data, str):
+        body = req.data.encode("utf-8")
+    elif _is_form(req.data):
+        body = urlencode(_form_pairs(req.data)).encode("ascii")
+        content_type = "application/x-www-form-urlencoded"
+    else:
+        # no body, or a file/iterator that can only be sent as-is
+        return
+
+    body_headers = {"Content-Length": str(len(body))}
+    if content_type is not None and not _has_header(req.headers, "Content-Type"):
+        body_headers["Content-Type"] = content_type
+    ctx.body = body
+    ctx.body_headers = body_headers
+
+
+def prepare_body(ctx: Context) -> Tuple[Mapping[str, str], Any]:
+    """
+    Return ``(headers, data)`` to send.
+
+    ``json=``/bytes/str/form bodies are encoded once and cached on ``ctx``, so
+    retries only pay for the network. The client calls this before the first
+    attempt; transports call it again to pick up the cached bytes.
+    """
+    if ctx.body is None:
+        _encode_body(ctx)
+    headers = ctx.request.headers
+    if ctx.body is None:
+        return headers, ctx.request.data
+    if isinstance(headers, Headers):
+        return Headers(ctx.body_headers, parent=headers), ctx.body
+    # plain dict: our Content-Length replaces the caller's, whatever its case
+    ours = {name.lower() for name in ctx.body_headers}
+    merged = {k: v for k, v in headers.items() if k.lower() not in ours}
+    merged.update(ctx.body_headers)
+    return merged, ctx.body
 
 
 class Transport(ABC):
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 19:40
+# @Author  : fzf
+# @FileName: faults.py
+# @Software: PyCharm
+import asyncio
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Collection, Dict, List, Optional, Sequence, Tuple, Union
+
+from ..exceotions import TransportError
+from ..models import Context, Response
+from .async_base import AsyncTransport
+from .base import Transport
+
+# seconds of added latency, drawn from the injector's random generator
+LatencyDist = Callable[[random.Random], float]
+
+
+def fixed_latency(seconds: float) -> LatencyDist:
+    return lambda rng: seconds
+
+
+def uniform_latency(low: float, high: float) -> LatencyDist:
+    return lambda rng: rng.uniform(low, high)
+
+
+def exponential_latency(mean: float) -> LatencyDist:
+    return lambda rng: rng.expovariate(1.0 / mean)
+
+
+def lognormal_latency(median: float, sigma: float = 0.5) -> LatencyDist:
+    """Long-tailed latency: half the draws below ``median``."""
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+@dataclass
+class Fault:
+    """
+    One injection rule.
+
+    ``match`` (regex searched in the URL) and ``methods`` pick the requests;
+    ``after``/``until`` limit the rule to a window in seconds since the
+    transport was created. A matching request gets ``latency`` added, then
+    fails with probability ``timeout_rate`` (waits ``timeout_after``, default
+    the request timeout, then raises "timeout"), ``reset_rate`` ("connection
+    error") or ``status_rate`` (a response with one of ``status_codes``).
+    """
+
+    match: Optional[str] = None
+    methods: Optional[Collection[str]] = None
+    after: float = 0.0
+    until: Optional[float] = None
+    latency: Union[None, float, LatencyDist] = None
+    timeout_rate: float = 0.0
+    timeout_after: Optional[float] = None
+    reset_rate: float = 0.0
+    status_rate: float = 0.0
+    status_codes: Sequence[int] = (503,)
+    _pattern: Optional["re.Pattern[str]"] = field(init=False, repr=False, default=None)
+
+    def __post_init__(self) -> None:
+        if self.timeout_rate + self.reset_rate + self.status_rate > 1.0:
+            raise ValueError("timeout_rate + reset_rate + status_rate must be <= 1")
+        if self.match is not None:
+            self._pattern = re.compile(self.match)
+        if self.methods is not None:
+            self.methods = {m.upper() for m in self.methods}
+
+    def applies(self, ctx: Context, elapsed_s: float) -> bool:
+        if elapsed_s < self.after or (self.until is not None and elapsed_s >= self.until):
+            return False
+        if self.methods is not None and ctx.request.method not in self.methods:
+            return False
+        return self._pattern is None or self._pattern.search(ctx.request.url) is not None
+
+    def draw_latency(self, rng: random.Random) -> float:
+        if self.latency is None:
+            return 0.0
+        if callable(self.latency):
+            return max(0.0, float(self.latency(rng)))
+        return float(self.latency)
+
+
+_LATENCY_DISTS: Dict[str, Callable[..., LatencyDist]] = {
+    "fixed": fixed_latency,
+    "uniform": uniform_latency,
+    "exponential": exponential_latency,
+    "lognormal": lognormal_latency,
+}
+
+
+def parse_faults(raw: Sequence[Dict[str, Any]]) -> List[Fault]:
+    """
+    Build faults from JSON-like dicts (field names as in ``Fault``); latency
+    is seconds or ``{"dist": "lognormal", "median": 0.05, "sigma": 0.8}``.
+    """
+    faults = []
+    for item in raw:
+        item = dict(item)
+        latency = item.get("latency")
+        if isinstance(latency, dict):
+            spec = dict(latency)
+            dist = spec.pop("dist", "fixed")
+            if dist not in _LATENCY_DISTS:
+                raise ValueError(f"unknown latency dist: {dist}")
+            item["latency"] = _LATENCY_DISTS[dist](**spec)
+        faults.append(Fault(**item))
+    return faults
+
+
+class _FaultInjector:
+    def __init__(
+        self,
+        faults: Sequence[Fault],
+        seed: Optional[int],
+        time_fn: Callable[[], float],
+    ):
+        self.faults = list(faults)
+        self.time_fn = time_fn
+        self.started = time_fn()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats: Counter = Counter()
+
+    def plan(self, ctx: Context) -> Tuple[float, Optional[str], int, Optional[float]]:
+        """
+        ``(delay_s, failure kind, status code, timeout wait)`` for this
+        attempt; the status code is 0 unless the kind is "status".
+        """
+        elapsed = self.time_fn() - self.started
+        delay, kind, status, wait = 0.0, None, 0, None
+        with self._lock:
+            self._stats["requests"] += 1
+            for fault in self.faults:
+                if not fault.applies(ctx, elapsed):
+                    continue
+                delay += fault.draw_latency(self._rng)
+                if kind is not None:
+                    continue
+                r = self._rng.random()
+                if r < fault.timeout_rate:
+                    kind = "timeout"
+                    wait = fault.timeout_after if fault.timeout_after is not None else ctx.timeout
+                elif r < fault.timeout_rate + fault.reset_rate:
+                    kind = "reset"
+                elif r < fault.timeout_rate + fault.reset_rate + fault.status_rate:
+                    kind = "status"
+                    status = self._rng.choice(list(fault.status_codes))
+            if delay > 0:
+                self._stats["delayed"] += 1
+            if kind is not None:
+                self._stats[kind] += 1
+        return delay, kind, status, wait
+
+    def error(self, ctx: Context, kind: str) -> TransportError:
+        # same messages and fields as the real transports
+        message = "timeout" if kind == "timeout" else "connection error"
+        error = TransportError(
+            f"{message} (injected)", method=ctx.request.method, url=ctx.request.url
+        )
+        if kind == "timeout":
+            # policies tell timeouts apart by the chained cause
+            error.__cause__ = TimeoutError("injected timeout")
+        return error
+
+    def response(self, ctx: Context, status: int) -> Response:
+        # error statuses come back as responses, like the real transports
+        return Response(status_code=status, headers={}, url=ctx.request.url, content=b"")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            keys = ("requests", "delayed", "timeout", "reset", "status")
+            return {k: self._stats[k] for k in keys}
+
+
+class FaultInjectionTransport(Transport):
+    """
+    Wrap ``transport`` and inject latency and failures described by ``faults``.
+
+    ``seed`` makes the injected faults reproducible; ``time_fn``/``sleep_fn``
+    allow a fake clock. ``stats()`` counts what was injected.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        faults: Sequence[Fault],
+        *,
+        seed: Optional[int] = None,
+        time_fn: Callable[[], float] = time.monotonic,
+        sleep_fn: Callable[[float], None] = time.sleep,
+    ):
+        self.transport = transport
+        self._injector = _FaultInjector(faults, seed, time_fn)
+        self.sleep_fn = sleep_fn
+
+    def stats(self) -> Dict[str, int]:
+        return self._injector.stats()
+
+    def send(self, ctx: Context) -> Response:
+        delay, kind, status, wait = self._injector.plan(ctx)
+        if delay > 0:
+            self.sleep_fn(delay)
+        if kind is None:
+            return self.transport.send(ctx)
+        if kind == "status":
+            return self._injector.response(ctx, status)
+        if kind == "timeout" and wait:
+            self.sleep_fn(wait)
+        raise self._injector.error(ctx, kind)
+
+
+class AsyncFaultInjectionTransport(AsyncTransport):
+    """Async ``FaultInjectionTransport``; delays are awaited."""
+
+    def __init__(
+        self,
+        transport: AsyncTransport,
+        faults: Sequence[Fault],
+        *,
+        seed: Optional[int] = None,
+        time_fn: Callable[[], float] = time.monotonic,
+        sleep_fn: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.transport = transport
+        self._injector = _FaultInjector(faults, seed, time_fn)
+        self.sleep_fn = sleep_fn
+
+    def stats(self) -> Dict[str, int]:
+        return self._injector.stats()
+
+    async def open(self) -> None:
+        await self.transport.open()
+
+    async def close(self) -> None:
+        await self.transport.close()
+
+    async def send(self, ctx: Context) -> Response:
+        delay, kind, status, wait = self._injector.plan(ctx)
+        if delay > 0:
+            await self.sleep_fn(delay)
+        if kind is None:
+            return await self.transport.send(ctx)
+        if kind == "status":
+            return self._injector.response(ctx, status)
+        if kind == "timeout" and wait:
+            await self.sleep_fn(wait)
+        raise self._injector.error(ctx, kind)
@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 20:10
+# @Author  : fzf
+# @FileName: hedging.py
+# @Software: PyCharm
+import asyncio
+import copy
+import math
+import os
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import Deque, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from ..models import Context, Response
+from .async_base import AsyncTransport
+from .base import Transport, prepare_body
+
+# safe methods only: a hedge sends the request twice
+HEDGE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# HedgingTransport's default max_workers, as ThreadPoolExecutor sizes itself
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+class _LatencyWindow:
+    """Recent latencies of one endpoint; the percentile is re-sorted every ``refresh`` samples."""
+
+    def __init__(self, size: int, refresh: int) -> None:
+        self.samples: Deque[float] = deque(maxlen=size)
+        self.refresh = refresh
+        self._since_refresh = 0
+        self._cached: Dict[float, float] = {}
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+        self._since_refresh += 1
+        if self._since_refresh >= self.refresh:
+            self._since_refresh = 0
+            self._cached.clear()
+
+    def percentile(self, q: float) -> float:
+        value = self._cached.get(q)
+        if value is None:
+            ordered = sorted(self.samples)
+            rank = max(0, math.ceil(q / 100.0 * len(ordered)) - 1)
+            value = self._cached[q] = ordered[rank]
+        return value
+
+
+class _Hedger:
+    """Hedge delay, budget and counters shared by the sync and async wrappers."""
+
+    def __init__(
+        self,
+        delay: float,
+        percentile: Optional[float],
+        min_samples: int,
+        budget: float,
+        burst: float,
+        methods: Iterable[str],
+        window: int,
+    ) -> None:
+        if delay < 0:
+            raise ValueError("delay must be >= 0")
+        if percentile is not None and not 0 < percentile <= 100:
+            raise ValueError("percentile must be in (0, 100]")
+        self.delay = float(delay)
+        self.percentile = percentile
+        self.min_samples = int(min_samples)
+        self.budget = float(budget)
+        self.burst = float(burst)
+        self.methods = frozenset(m.upper() for m in methods)
+        self.window = int(window)
+        self._tokens = self.burst
+        self._windows: Dict[Tuple[str, str], _LatencyWindow] = {}
+        self._lock = threading.Lock()
+        self._stats: Counter = Counter()
+
+    @staticmethod
+    def endpoint(ctx: Context) -> Tuple[str, str]:
+        parts = urlsplit(ctx.request.url)
+        return ctx.request.method, f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+    def delay_for(self, ctx: Context) -> Optional[float]:
+        """Seconds to wait before hedging ``ctx``, or None if it is never hedged."""
+        if ctx.request.method not in self.methods:
+            return None
+        with self._lock:
+            self._stats["requests"] += 1
+            # every hedgeable request earns ``budget`` of a hedge
+            self._tokens = min(self.burst, self._tokens + self.budget)
+            if self.percentile is not None:
+                window = self._windows.get(self.endpoint(ctx))
+                if window is not None and len(window.samples) >= self.min_samples:
+                    return window.percentile(self.percentile)
+        return self.delay
+
+    def try_hedge(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                self._stats["budget_exhausted"] += 1
+                return False
+            self._tokens -= 1.0
+            self._stats["hedged"] += 1
+            return True
+
+    def record(self, ctx: Context, seconds: float) -> None:
+        if self.percentile is None:
+            return
+        key = self.endpoint(ctx)
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = _LatencyWindow(self.window, max(1, self.window // 10))
+            window.add(seconds)
+
+    def hedge_won(self, ctx: Context) -> None:
+        ctx.tags["hedge_won"] = True
+        with self._lock:
+            self._stats["hedge_wins"] += 1
+
+    def capacity_exhausted(self) -> None:
+        with self._lock:
+            self._stats["capacity_exhausted"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            keys = ("requests", "hedged", "hedge_wins", "budget_exhausted", "capacity_exhausted")
+            return {k: self._stats[k] for k in keys}
+
+
+def _fork(ctx: Context) -> Context:
+    # each copy writes its own tags; the encoded body is shared read-only
+    forked = copy.copy(ctx)
+    forked.tags = dict(ctx.tags)
+    return forked
+
+
+def _adopt(ctx: Context, winner: Context) -> None:
+    ctx.tags.update(winner.tags)
+
+
+def _succeeded(future: "Union[Future[Response], asyncio.Future[Response]]") -> bool:
+    # a 5xx from one copy must not beat a good answer from the other
+    return future.exception() is None and future.result().status_code < 500
+
+
+def _close_quietly(future: "Future[Response]") -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class HedgingTransport(Transport):
+    """
+    Send a second copy of a slow safe request and return whichever finishes first.
+
+    A request still running after ``delay`` seconds (or, with ``percentile``,
+    that endpoint's observed latency percentile once ``min_samples`` are
+    known) is hedged. Each copy gets a shallow copy of the ``Context`` (same
+    request id), and only the winner's tags are merged back. ``budget`` caps
+    hedges to that fraction of requests, with up to ``burst`` saved up.
+    Blocking calls can't be interrupted: the losing copy runs to completion
+    on the pool and its response is closed. Nothing queues for the
+    ``max_workers`` pool: without a free worker a request is sent unhedged
+    on the caller's thread, or a hedge is skipped (``capacity_exhausted``).
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        delay: float = 0.05,
+        *,
+        percentile: Optional[float] = None,
+        min_samples: int = 20,
+        budget: float = 0.1,
+        burst: float = 10.0,
+        methods: Iterable[str] = HEDGE_METHODS,
+        window: int = 500,
+        max_workers: Optional[int] = None,
+    ):
+        self.transport = transport
+        self._hedger = _Hedger(delay, percentile, min_samples, budget, burst, methods, window)
+        max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="relihttp-hedge")
+        # one permit per worker, taken before submitting: work never queues
+        self._workers = threading.BoundedSemaphore(max_workers)
+
+    def stats(self) -> Dict[str, int]:
+        return self._hedger.stats()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _send_timed(self, ctx: Context, started: "Optional[Future[float]]" = None) -> Response:
+        try:
+            start = time.perf_counter()
+            if started is not None:
+                started.set_result(start)
+            resp = self.transport.send(ctx)
+            self._hedger.record(ctx, time.perf_counter() - start)
+            return resp
+        finally:
+            self._workers.release()
+
+    def send(self, ctx: Context) -> Response:
+        delay = self._hedger.delay_for(ctx)
+        if delay is None:
+            return self.transport.send(ctx)
+        if not self._workers.acquire(blocking=False):
+            # every worker busy: send it unhedged here rather than queue it
+            self._hedger.capacity_exhausted()
+            return self.transport.send(ctx)
+        # encode once: both copies reuse the cached body
+        prepare_body(ctx)
+        primary_ctx = _fork(ctx)
+        started: "Future[float]" = Future()
+        primary = self._executor.submit(self._send_timed, primary_ctx, started)
+        # the hedge delay runs from when the primary starts sending; a worker
+        # was free, so this only waits for the thread to pick the task up
+        try:
+            elapsed = time.perf_counter() - started.result(timeout=ctx.timeout)
+        except FuturesTimeout:
+            elapsed = 0.0
+        done, _ = wait([primary], timeout=max(0.0, delay - elapsed))
+        if done:
+            return self._result(ctx, primary_ctx, primary)
+        if not self._workers.acquire(blocking=False):
+            self._hedger.capacity_exhausted()
+            return self._result(ctx, primary_ctx, primary)
+        if not self._hedger.try_hedge():
+            self._workers.release()
+            return self._result(ctx, primary_ctx, primary)
+
+        ctx.tags["hedged"] = True
+        hedge_ctx = _fork(ctx)
+        hedge = self._executor.submit(self._send_timed, hedge_ctx)
+        copies = {primary: primary_ctx, hedge: hedge_ctx}
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in (primary, hedge):
+                if future in done and _succeeded(future):
+                    for other in pending | (done - {future}):
+                        other.add_done_callback(_close_quietly)
+                    if future is hedge:
+                        self._hedger.hedge_won(ctx)
+                    return self._result(ctx, copies[future], future)
+        # both copies failed: a response (a 5xx) beats an exception, and the
+        # original request's outcome beats the hedge's
+        result, other = primary, hedge
+        if primary.exception() is not None and hedge.exception() is None:
+            result, other = hedge, primary
+        other.add_done_callback(_close_quietly)
+        return self._result(ctx, copies[result], result)
+
+    @staticmethod
+    def _result(ctx: Context, copy_ctx: Context, future: "Future[Response]") -> Response:
+        _adopt(ctx, copy_ctx)
+        return future.result()
+
+
+class AsyncHedgingTransport(AsyncTransport):
+    """Async ``HedgingTransport``; the losing copy is cancelled."""
+
+    def __init__(
+        self,
+        transport: AsyncTransport,
+        delay: float = 0.05,
+        *,
+        percentile: Optional[float] = None,
+        min_samples: int = 20,
+        budget: float = 0.1,
+        burst: float = 10.0,
+        methods: Iterable[str] = HEDGE_METHODS,
+        window: int = 500,
+    ):
+        self.transport = transport
+        self._hedger = _Hedger(delay, percentile, min_samples, budget, burst, methods, window)
+
+    def stats(self) -> Dict[str, int]:
+        return self._hedger.stats()
+
+    async def open(self) -> None:
+        await self.transport.open()
+
+    async def close(self) -> None:
+        await self.transport.close()
+
+    async def _send_timed(self, ctx: Context) -> Response:
+        start = time.perf_counter()
+        resp = await self.transport.send(ctx)
+        self._hedger.record(ctx, time.perf_counter() - start)
+        return resp
+
+    async def send(self, ctx: Context) -> Response:
+        delay = self._hedger.delay_for(ctx)
+        if delay is None:
+            return await self.transport.send(ctx)
+        prepare_body(ctx)
+        primary_ctx = _fork(ctx)
+        primary = asyncio.ensure_future(self._send_timed(primary_ctx))
+        tasks: List["asyncio.Future[Response]"] = [primary]
+        copies: Dict["asyncio.Future[Response]", Context] = {primary: primary_ctx}
+        winner: Optional["asyncio.Future[Response]"] = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done or not self._hedger.try_hedge():
+                winner = primary
+                try:
+                    return await primary
+                finally:
+                    _adopt(ctx, primary_ctx)
+
+            ctx.tags["hedged"] = True
+            hedge_ctx = _fork(ctx)
+            hedge = asyncio.ensure_future(self._send_timed(hedge_ctx))
+            tasks.append(hedge)
+            copies[hedge] = hedge_ctx
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((t for t in tasks if t in done and _succeeded(t)), None)
+            if winner is None:
+                # both copies failed: a response (a 5xx) beats an exception,
+                # and the original request's outcome beats the hedge's
+                winner = next((t for t in tasks if t.exception() is None), primary)
+            elif winner is not primary:
+                self._hedger.hedge_won(ctx)
+            _adopt(ctx, copies[winner])
+            return winner.result()
+        finally:
+            # cancel the loser (or both, if the caller was cancelled); both
+            # copies may also have finished in the same loop iteration
+            for task in tasks:
+                task.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for task, result in zip(tasks, results):
+                if task is not winner and isinstance(result, Response):
+                    await result.aclose()
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 13:20
+# @Author  : fzf
+# @FileName: pool.py
+# @Software: PyCharm
+import logging
+import queue
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import urllib3
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+from urllib3.poolmanager import PoolManager
+
+logger = logging.getLogger("relihttp")
+
+# urllib3 internals the instrumented pools override; none of them is public API
+_POOL_HOOKS = ("_new_conn", "_get_conn", "_put_conn", "QueueCls")
+
+
+def _missing_pool_hooks() -> List[str]:
+    """Names in ``_POOL_HOOKS`` the installed urllib3 no longer has."""
+    return [name for name in _POOL_HOOKS if not hasattr(HTTPConnectionPool, name)]
+
+
+class _CountingLifoQueue(queue.LifoQueue):
+    """urllib3's connection queue, counting connections dropped because it was full."""
+
+    def __init__(self, maxsize: int = 0):
+        super().__init__(maxsize)
+        self.discarded = 0
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        try:
+            super().put(item, block, timeout)
+        except queue.Full:
+            self.discarded += 1
+            raise
+
+    def idle(self) -> int:
+        with self.mutex:
+            return sum(1 for conn in self.queue if conn is not None)
+
+
+if TYPE_CHECKING:
+    # lets mypy see the pool methods the mixin wraps
+    _PoolBase = HTTPConnectionPool
+else:
+    _PoolBase = object
+
+
+class _InstrumentedPoolMixin(_PoolBase):
+    QueueCls = _CountingLifoQueue
+    # seconds to wait for a free connection when the pool blocks (None = forever)
+    acquire_timeout: Optional[float] = None
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._created = 0
+        self._acquired = 0
+        self._released = 0
+        self._acquire_timeouts = 0
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        with self._stats_lock:
+            self._created += 1
+        return conn
+
+    def _get_conn(self, timeout: Optional[float] = None):
+        if timeout is None:
+            timeout = self.acquire_timeout
+        try:
+            conn = super()._get_conn(timeout=timeout)
+        except EmptyPoolError:
+            with self._stats_lock:
+                self._acquire_timeouts += 1
+            raise
+        with self._stats_lock:
+            self._acquired += 1
+        return conn
+
+    def _put_conn(self, conn) -> None:
+        with self._stats_lock:
+            self._released += 1
+        super()._put_conn(conn)
+
+    def stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            created, acquired, released = self._created, self._acquired, self._released
+            acquire_timeouts = self._acquire_timeouts
+        pool = self.pool if isinstance(self.pool, _CountingLifoQueue) else None
+        return {
+            "maxsize": pool.maxsize if pool is not None else 0,
+            "in_use": max(0, acquired - released),
+            "idle": pool.idle() if pool is not None else 0,
+            "created": created,
+            "reused": max(0, acquired - created),
+            "discarded": pool.discarded if pool is not None else 0,
+            "acquire_timeouts": acquire_timeouts,
+        }
+
+
+class _HTTPPool(_InstrumentedPoolMixin, HTTPConnectionPool):
+    pass
+
+
+class _HTTPSPool(_InstrumentedPoolMixin, HTTPSConnectionPool):
+    pass
+
+
+class _InstrumentedPoolManager(PoolManager):
+    def __init__(self, *args: Any, pool_timeout: Optional[float] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.pool_timeout = pool_timeout
+        missing = _missing_pool_hooks()
+        if missing:
+            # keep urllib3's own pools rather than override methods that moved
+            logger.warning(
+                "urllib3 %s has no %s: pool stats and pool_timeout are disabled",
+                urllib3.__version__,
+                ", ".join(missing),
+            )
+        else:
+            self.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context=request_context)
+        if isinstance(pool, _InstrumentedPoolMixin):
+            pool.acquire_timeout = self.pool_timeout
+        return pool
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        stats: Dict[str, Dict[str, int]] = {}
+        for key in self.pools.keys():
+            pool = self.pools.get(key)
+            if isinstance(pool, _InstrumentedPoolMixin):
+                stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = pool.stats()
+        return stats
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """
+    ``HTTPAdapter`` with a pool-acquire timeout and per-host pool statistics.
+
+    pool_connections: number of per-host pools kept (max hosts)
+    pool_maxsize: connections kept per host
+    pool_block: wait for a free connection instead of opening a throwaway one
+    pool_timeout: with pool_block, seconds to wait before ``EmptyPoolError``
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["pool_timeout"]
+    poolmanager: _InstrumentedPoolManager
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOLSIZE,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+        pool_block: bool = DEFAULT_POOLBLOCK,
+        pool_timeout: Optional[float] = None,
+        **kwargs: Any,
+    ):
+        self.pool_timeout = pool_timeout
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            **kwargs,
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=DEFAULT_POOLBLOCK, **pool_kwargs):
+        self._pool_connections = connections
+        self._pool_maxsize = maxsize
+        self._pool_block = block
+
+        self.poolmanager = _InstrumentedPoolManager(
+            num_pools=connections,
+            maxsize=maxsize,
+            block=block,
+            pool_timeout=getattr(self, "pool_timeout", None),
+            **pool_kwargs,
+        )
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        return self.poolmanager.pool_stats()
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 19:10
+# @Author  : fzf
+# @FileName: replay.py
+# @Software: PyCharm
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import threading
+import time
+from typing import IO, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+try:
+    from multidict import CIMultiDict
+except Exception:  # pragma: no cover - optional dependency (ships with aiohttp)
+    CIMultiDict = None  # type: ignore[assignment,misc]
+
+from ..exceotions import TransportError
+from ..models import Context, HeadersView, Response
+from .async_base import AsyncTransport
+from .base import Transport, prepare_body
+
+# (method, url with query, sha256 of the encoded body)
+ExchangeKey = Tuple[str, str, str]
+
+_EMPTY_SHA256 = hashlib.sha256(b"").hexdigest()
+
+
+class CassetteMissError(LookupError):
+    """No recorded exchange matches the request."""
+
+
+def request_key(ctx: Context) -> ExchangeKey:
+    """Lookup key for ``ctx``: method, url with encoded params, body hash."""
+    url = ctx.request.url
+    if ctx.request.params:
+        url += ("&" if "?" in url else "?") + urlencode(ctx.request.params, doseq=True)
+    body = ctx.body
+    digest = hashlib.sha256(body).hexdigest() if body else _EMPTY_SHA256
+    return ctx.request.method, url, digest
+
+
+class Cassette:
+    """
+    Recorded exchanges, indexed by ``request_key``.
+
+    On disk a cassette is JSONL, one exchange per line. Requests recorded
+    more than once are replayed in recorded order, cycling.
+    """
+
+    def __init__(self, exchanges: Iterable[Dict[str, Any]] = ()):
+        self.exchanges: List[Dict[str, Any]] = []
+        self._index: Dict[ExchangeKey, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[ExchangeKey, Iterator[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        for exchange in exchanges:
+            self.add(exchange)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.loads(line) for line in f if line.strip())
+
+    def add(self, exchange: Dict[str, Any]) -> None:
+        key = (exchange["method"], exchange["url"], exchange["body_sha256"])
+        with self._lock:
+            self.exchanges.append(exchange)
+            self._index.setdefault(key, []).append(exchange)
+            self._cursors.pop(key, None)
+
+    def lookup(self, key: ExchangeKey) -> Dict[str, Any]:
+        with self._lock:
+            cursor = self._cursors.get(key)
+            if cursor is None:
+                recorded = self._index.get(key)
+                if not recorded:
+                    method, url, digest = key
+                    raise CassetteMissError(
+                        f"no recorded exchange for {method} {url} (body sha256 {digest[:12]})"
+                    )
+                cursor = self._cursors[key] = itertools.cycle(recorded)
+            return next(cursor)
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
+
+
+def _header_pairs(headers: Mapping[str, str]) -> List[List[str]]:
+    # a list of pairs, so repeated headers (Set-Cookie, Link) all survive
+    items = headers.raw_items() if isinstance(headers, HeadersView) else headers.items()
+    return [[name, value] for name, value in items]
+
+
+def _headers(recorded: Any) -> Mapping[str, str]:
+    if not recorded:
+        return {}
+    if isinstance(recorded, dict):
+        # cassettes recorded before headers were stored as pairs
+        return recorded
+    if CIMultiDict is not None:
+        return CIMultiDict((name, value) for name, value in recorded)
+    # without multidict, fold repeats into one comma-separated value as
+    # requests does
+    folded: Dict[str, str] = {}
+    lower: Dict[str, str] = {}
+    for name, value in recorded:
+        key = lower.setdefault(name.lower(), name)
+        folded[key] = f"{folded[key]}, {value}" if key in folded else value
+    return folded
+
+
+def _exchange(
+    ctx: Context,
+    response: Optional[Response],
+    error: Optional[TransportError],
+    elapsed_ms: int,
+) -> Dict[str, Any]:
+    method, url, digest = request_key(ctx)
+    exchange: Dict[str, Any] = {
+        "method": method,
+        "url": url,
+        "body_sha256": digest,
+        "elapsed_ms": elapsed_ms,
+    }
+    if error is not None:
+        exchange["error"] = str(error)
+        exchange["status_code"] = error.status_code
+        if error.headers:
+            exchange["headers"] = _header_pairs(error.headers)
+    elif response is not None:
+        exchange["status_code"] = response.status_code
+        exchange["headers"] = _header_pairs(response.headers)
+        exchange["body_b64"] = base64.b64encode(response.content).decode("ascii")
+    return exchange
+
+
+def _replay(exchange: Dict[str, Any], ctx: Context) -> Response:
+    if "error" in exchange:
+        error = TransportError(exchange["error"])
+        error.method, error.url = ctx.request.method, ctx.request.url
+        error.status_code = exchange.get("status_code")
+        error.elapsed_ms = exchange.get("elapsed_ms")
+        error.headers = _headers(exchange.get("headers")) or None
+        raise error
+    return Response(
+        status_code=exchange["status_code"],
+        headers=_headers(exchange.get("headers")),
+        url=ctx.request.url,
+        elapsed_ms=exchange.get("elapsed_ms", 0),
+        content=base64.b64decode(exchange.get("body_b64", "")),
+    )
+
+
+class _CassetteWriter:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.cassette = Cassette()
+        self._lock = threading.Lock()
+        self._file: IO[str] = open(path, "a", encoding="utf-8")
+
+    def write(self, exchange: Dict[str, Any]) -> None:
+        self.cassette.add(exchange)
+        line = json.dumps(exchange, ensure_ascii=False)
+        with self._lock:
+            # flushed per exchange: the cassette is readable while recording
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class RecordingTransport(Transport):
+    """
+    Pass requests through to ``transport`` and append every exchange
+    (including HTTP errors raised as ``TransportError``) to the JSONL
+    cassette at ``path``. Streamed bodies are read in full.
+    """
+
+    def __init__(self, transport: Transport, path: str):
+        self.transport = transport
+        self._writer = _CassetteWriter(path)
+
+    @property
+    def cassette(self) -> Cassette:
+        return self._writer.cassette
+
+    def close(self) -> None:
+        self._writer.close()
+        close = getattr(self.transport, "close", None)
+        if close is not None:
+            close()
+
+    def send(self, ctx: Context) -> Response:
+        prepare_body(ctx)
+        start = time.perf_counter()
+        try:
+            resp = self.transport.send(ctx)
+            try:
+                resp.read()
+            finally:
+                resp.close()
+        except TransportError as e:
+            self._writer.write(_exchange(ctx, None, e, int((time.perf_counter() - start) * 1000)))
+            raise
+        exchange = _exchange(ctx, resp, None, int((time.perf_counter() - start) * 1000))
+        self._writer.write(exchange)
+        return _replay(exchange, ctx)
+
+
+class ReplayTransport(Transport):
+    """
+    Answer requests from a cassette, without any network.
+
+    ``latency_scale`` sleeps for that fraction of each exchange's recorded
+    time (0 = answer immediately, 1 = as recorded). Unknown requests raise
+    ``CassetteMissError``.
+    """
+
+    def __init__(self, cassette: Union[str, Cassette], *, latency_scale: float = 0.0):
+        self.cassette = Cassette.load(cassette) if isinstance(cassette, str) else cassette
+        self.latency_scale = float(latency_scale)
+
+    def send(self, ctx: Context) -> Response:
+        prepare_body(ctx)
+        exchange = self.cassette.lookup(request_key(ctx))
+        if self.latency_scale > 0:
+            time.sleep(exchange.get("elapsed_ms", 0) * self.latency_scale / 1000.0)
+        return _replay(exchange, ctx)
+
+
+class AsyncRecordingTransport(AsyncTransport):
+    """Async ``RecordingTransport`` around an ``AsyncTransport``."""
+
+    def __init__(self, transport: AsyncTransport, path: str):
+        self.transport = transport
+        self._writer = _CassetteWriter(path)
+
+    @property
+    def cassette(self) -> Cassette:
+        return self._writer.cassette
+
+    async def open(self) -> None:
+        await self.transport.open()
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self.transport.close()
+
+    async def send(self, ctx: Context) -> Response:
+        prepare_body(ctx)
+        start = time.perf_counter()
+        try:
+            resp = await self.transport.send(ctx)
+            try:
+                await resp.aread()
+            finally:
+                await resp.aclose()
+        except TransportError as e:
+            self._writer.write(_exchange(ctx, None, e, int((time.perf_counter() - start) * 1000)))
+            raise
+        exchange = _exchange(ctx, resp, None, int((time.perf_counter() - start) * 1000))
+        self._writer.write(exchange)
+        return _replay(exchange, ctx)
+
+
+class AsyncReplayTransport(AsyncTransport):
+    """Async ``ReplayTransport``; recorded latency is awaited, not slept."""
+
+    def __init__(self, cassette: Union[str, Cassette], *, latency_scale: float = 0.0):
+        self.cassette = Cassette.load(cassette) if isinstance(cassette, str) else cassette
+        self.latency_scale = float(latency_scale)
+
+    async def send(self, ctx: Context) -> Response:
+        prepare_body(ctx)
+        exchange = self.cassette.lookup(request_key(ctx))
+        if self.latency_scale > 0:
+            await asyncio.sleep(exchange.get("elapsed_ms", 0) * self.latency_scale / 1000.0)
+        return _replay(exchange, ctx)
@@ -5,67 +5,122 @@
 # @Software: PyCharm
 import requests
 from requests import exceptions
-from typing import Optional
+from typing import Dict, Optional
+from urllib3.exceptions import EmptyPoolError
 
-from .base import Transport
+from .base import Transport, prepare_body
+from .pool import PooledHTTPAdapter
 from ..exceotions import TransportError
 from ..models import Context, Response
 from ..utils import now_ms
 
 
+class _RequestsByteStream:
+    """Body stream over a ``requests`` response opened with ``stream=True``."""
+
+    def __init__(self, resp: requests.Response, ctx: Context):
+        self._resp = resp
+        self._ctx = ctx
+
+    def iter_bytes(self, chunk_size: int):
+        req = self._ctx.request
+        try:
+            for chunk in self._resp.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
+        except exceptions.RequestException as e:
+            raise TransportError(
+                "stream error",
+                method=req.method,
+                url=req.url,
+                status_code=self._resp.status_code,
+            ) from e
+
+    def close(self) -> None:
+        # 读完的连接已自动归还连接池；未读完的连接在这里被丢弃
+        self._resp.close()
+
+
 class RequestsTransport(Transport):
-    def __init__(self, session: Optional[requests.Session] = None):
-        self.session = session or requests.Session()
+    """
+    Transport built on ``requests.Session``.
+
+    When no session is passed, one is created with a ``PooledHTTPAdapter``
+    configured from the pool options (see ``PooledHTTPAdapter``); a session
+    you pass in is used as-is.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        *,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        pool_timeout: Optional[float] = None,
+    ):
+        if session is None:
+            session = requests.Session()
+            adapter = PooledHTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                pool_block=pool_block,
+                pool_timeout=pool_timeout,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-host connection counts: in_use, idle, created, reused, discarded, acquire_timeouts."""
+        stats: Dict[str, Dict[str, int]] = {}
+        seen = set()
+        for adapter in self.session.adapters.values():
+            if id(adapter) in seen or not isinstance(adapter, PooledHTTPAdapter):
+                continue
+            seen.add(id(adapter))
+            stats.update(adapter.pool_stats())
+        return stats
 
     def send(self, ctx: Context) -> Response:
         req = ctx.request
         start = now_ms()
+        headers, data = prepare_body(ctx)
         try:
             r = self.session.request(
                 method=req.method,
                 url=req.url,
                 params=req.params,
-                headers=req.headers,
-                data=req.data,
-                json=req.json,
+                headers=headers,
+                data=data,
                 timeout=ctx.timeout,
+                stream=ctx.stream,
             )
+            # 4xx/5xx 作为 Response 返回，由策略判断；需要异常时用 raise_for_status
 
-            # 如果你希望 4xx/5xx 也走异常逻辑，就加这行
-            r.raise_for_status()
-
-        except exceptions.Timeout as e:
+        # pool_block=True 且等待空闲连接超时
+        except EmptyPoolError as e:
             elapsed_ms = now_ms() - start
             raise TransportError(
-                "timeout",
+                "pool timeout",
                 method=req.method,
                 url=req.url,
                 elapsed_ms=elapsed_ms,
             ) from e
 
-        except exceptions.ConnectionError as e:
+        except exceptions.Timeout as e:
             elapsed_ms = now_ms() - start
             raise TransportError(
-                "connection error",
+                "timeout",
                 method=req.method,
                 url=req.url,
                 elapsed_ms=elapsed_ms,
             ) from e
 
-        except exceptions.HTTPError as e:
-            resp = getattr(e, "response", None)
-            if resp is not None:
-                elapsed_ms = now_ms() - start
-                raise TransportError(
-                    f"http error | {resp.text[:300]}",
-                    method=req.method,
-                    url=req.url,
-                    status_code=resp.status_code,
-                    elapsed_ms=elapsed_ms,
-                ) from e
+        except exceptions.ConnectionError as e:
             elapsed_ms = now_ms() - start
             raise TransportError(
-                "http error",
+                "connection error",
                 method=req.method,
                 url=req.url,
                 elapsed_ms=elapsed_ms,
@@ -80,10 +135,20 @@ class RequestsTransport(Transport):
                 elapsed_ms=elapsed_ms,
             ) from e
         end = now_ms()
+        if ctx.stream:
+            return Response(
+                status_code=r.status_code,
+                headers=r.headers,
+                url=r.url,
+                elapsed_ms=end - start,
+                stream=_RequestsByteStream(r, ctx),
+                encoding=r.encoding,
+            )
         return Response(
             status_code=r.status_code,
-            headers=dict(r.headers),
-            text=r.text,
-            url=str(r.url),
+            headers=r.headers,
+            url=r.url,
             elapsed_ms=end - start,
+            content=r.content,
+            encoding=r.encoding,
         )
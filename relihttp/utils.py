@@ -3,11 +3,13 @@
 # @Author  : fzf
 # @FileName: utils.py
 # @Software: PyCharm
+import math
 import random
 import threading
 import time
 from dataclasses import dataclass
-from typing import Callable
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
 
 
 def now_ms() -> int:
@@ -28,6 +30,31 @@ def add_jitter(delay: float, jitter: float = 0.2) -> float:
     r = 1 + random.uniform(-jitter, jitter)
     return max(0.0, delay * r)
 
+def parse_retry_after(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds to wait from a ``Retry-After`` value: delta-seconds or an
+    HTTP-date (compared with ``now``, default wall-clock time). None if
+    missing, malformed or not finite.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        # "inf"/"nan" parse as floats but are not delta-seconds
+        return max(0.0, seconds) if math.isfinite(seconds) else None
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None or when.tzinfo is None:
+        return None
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+
 def monotonic() -> float:
     """Monotonic seconds for rate limiting/backoff."""
     return time.monotonic()
@@ -88,4 +115,17 @@ class TokenBucket:
             # Need deficit tokens, at rate tokens/sec => deficit/rate seconds.
             wait = deficit / self.rate
             # Do not change tokens here; caller will wait and call acquire again.
-            return max(0.0, wait)
\ No newline at end of file
+            return max(0.0, wait)
+
+    def set_rate(self, rate: float, *, tokens: Optional[float] = None) -> None:
+        """
+        Change the refill rate from now on; tokens earned so far are kept.
+        ``tokens`` caps the tokens currently available (e.g. at 0 to pause).
+        """
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        with self._lock:
+            self._refill(float(self.time_fn()))
+            self.rate = float(rate)
+            if tokens is not None:
+                self._tokens = min(self._tokens, max(0.0, float(tokens)))
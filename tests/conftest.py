@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 14:20
+# @Author  : fzf
+# @FileName: conftest.py
+# @Software: PyCharm
+import http.server
+import threading
+import time
+
+import pytest
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    """Keep-alive handler: ``/slow`` sleeps 0.3s, everything else answers at once."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        if self.path.startswith("/slow"):
+            time.sleep(0.3)
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture()
+def base_url():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
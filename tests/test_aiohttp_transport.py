@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 14:25
+# @Author  : fzf
+# @FileName: test_aiohttp_transport.py
+# @Software: PyCharm
+import asyncio
+
+import pytest
+
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.transport.aiohttp import AiohttpTransport
+
+
+def test_connector_options_and_stats(base_url: str) -> None:
+    async def run() -> None:
+        async with AsyncClient(policies=[], limit=1, keepalive_timeout=30.0) as client:
+            assert client.transport.session is not None
+            tasks = [asyncio.ensure_future(client.get(base_url + "/slow")) for _ in range(3)]
+            await asyncio.sleep(0.15)
+
+            busy = client.pool_stats()
+            assert busy["limit"] == 1
+            assert busy["acquired"] == 1
+            assert busy["waiting"] == 2
+
+            await asyncio.gather(*tasks)
+            done = client.pool_stats()
+            assert done["acquired"] == 0
+            assert done["waiting"] == 0
+            assert done["idle"] == 1
+            assert done["created"] == 1
+            assert done["reused"] == 2
+            assert done["queued"] == 2
+            assert done["queue_wait_ms_max"] > 0
+
+        assert client.transport.session is None
+
+    asyncio.run(run())
+
+
+def test_force_close_rejects_keepalive_timeout() -> None:
+    with pytest.raises(ValueError):
+        AiohttpTransport(force_close=True, keepalive_timeout=5.0)
+
+
+def test_external_session_is_not_closed(base_url: str) -> None:
+    import aiohttp
+
+    async def run() -> None:
+        session = aiohttp.ClientSession()
+        transport = AiohttpTransport(session)
+        async with AsyncClient(transport=transport, policies=[]) as client:
+            resp = await client.get(base_url + "/")
+            assert resp.status_code == 200
+        assert not session.closed
+        await session.close()
+
+    asyncio.run(run())
+
+
+def test_stats_survive_missing_connector_internals(base_url: str) -> None:
+    async def run() -> None:
+        async with AsyncClient(policies=[], limit=1) as client:
+            connector = client.transport.session.connector
+            await client.get(base_url + "/")
+            acquired, conns = connector._acquired, connector._conns
+            del connector._acquired
+            connector._conns = None
+            try:
+                stats = client.pool_stats()
+            finally:
+                connector._acquired, connector._conns = acquired, conns
+            assert (stats["acquired"], stats["idle"], stats["waiting"]) == (0, 0, 0)
+            assert stats["created"] == 1
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiters_stop_counting(base_url: str) -> None:
+    async def run() -> None:
+        async with AsyncClient(policies=[], limit=1) as client:
+            slow = asyncio.ensure_future(client.get(base_url + "/slow"))
+            queued = [asyncio.ensure_future(client.get(base_url + "/")) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            assert client.pool_stats()["waiting"] == 2
+
+            for task in queued:
+                task.cancel()
+            await asyncio.gather(*queued, return_exceptions=True)
+            assert client.pool_stats()["waiting"] == 0
+            await slow
+
+    asyncio.run(run())
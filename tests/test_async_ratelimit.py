@@ -5,7 +5,7 @@
 # @Software: PyCharm
 import asyncio
 
-from relihttp.models import Context, Request
+from relihttp.models import Context, Request, Response
 from relihttp.policies.rate_limit import AsyncRateLimitPolicy
 from relihttp.utils import TokenBucket
 
@@ -38,3 +38,31 @@ def test_async_ratelimit_policy_sleep_mode_blocks() -> None:
         assert clock.t >= 1.0
 
     asyncio.run(run())
+
+
+def test_async_ratelimit_policy_follows_server_quota() -> None:
+    async def run() -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate=50.0, capacity=50.0, time_fn=clock.now)
+        policy = AsyncRateLimitPolicy(
+            rate_limit=50.0, bucket=bucket, sleep_fn=clock.sleep, adaptive=True, max_rate=20.0
+        )
+        ctx = make_ctx()
+        ctx.response = Response(
+            status_code=200,
+            headers={"RateLimit-Remaining": "1000", "RateLimit-Reset": "10"},
+            url="",
+            elapsed_ms=0,
+            content=b"",
+        )
+        policy.after_response(ctx)
+        assert bucket.rate == 20.0  # capped by max_rate
+
+        ctx.response = Response(
+            status_code=429, headers={"Retry-After": "3"}, url="", elapsed_ms=0, content=b""
+        )
+        policy.after_response(ctx)
+        await policy.async_before_request(make_ctx())
+        assert clock.t == 3.0
+
+    asyncio.run(run())
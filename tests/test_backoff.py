@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 23:40
+# @Author  : fzf
+# @FileName: test_backoff.py
+# @Software: PyCharm
+import json
+import random
+
+import pytest
+
+from relihttp.__main__ import main
+from relihttp.bench.simulate import SimConfig, simulate
+from relihttp.client.SyncClient import SyncClient
+from relihttp.models import Context, Request, Response
+from relihttp.policies.backoff import (
+    Backoff,
+    DecorrelatedJitterBackoff,
+    EqualJitterBackoff,
+    ExponentialBackoff,
+    FixedBackoff,
+    FullJitterBackoff,
+    LinearBackoff,
+)
+from relihttp.policies.retry import RetryPolicy
+from relihttp.transport.base import Transport
+
+
+def test_strategy_bounds() -> None:
+    rng = random.Random(5)
+    for attempt, ceiling in ((1, 1.0), (2, 2.0), (3, 4.0), (6, 8.0)):
+        for _ in range(50):
+            assert 0.0 <= FullJitterBackoff(1.0, 8.0, rng).next_delay(attempt, 0.0) <= ceiling
+            equal = EqualJitterBackoff(1.0, 8.0, rng).next_delay(attempt, 0.0)
+            assert ceiling / 2 <= equal <= ceiling
+            decorrelated = DecorrelatedJitterBackoff(1.0, 8.0, rng).next_delay(attempt, ceiling)
+            assert 1.0 <= decorrelated <= min(8.0, ceiling * 3)
+
+    assert ExponentialBackoff(0.5, 3.0, jitter=0.0).next_delay(4, 0.0) == 3.0
+    assert [LinearBackoff(1.0, 0.5, 2.0).next_delay(n, 0.0) for n in (1, 2, 3, 4)] == [
+        1.0, 1.5, 2.0, 2.0
+    ]
+    assert FixedBackoff(0.3).next_delay(7, 1.0) == 0.3
+    # seeded strategies are reproducible
+    first = [FullJitterBackoff(rng=random.Random(1)).next_delay(3, 0.0) for _ in range(3)]
+    assert first == [FullJitterBackoff(rng=random.Random(1)).next_delay(3, 0.0) for _ in range(3)]
+    # a strategy must define next_delay
+    with pytest.raises(TypeError):
+        Backoff()  # type: ignore[abstract]
+
+
+def test_retry_policy_feeds_previous_delay_to_strategy() -> None:
+    seen = []
+
+    class Recording(DecorrelatedJitterBackoff):
+        def next_delay(self, attempt: int, previous: float) -> float:
+            seen.append((attempt, previous))
+            return 0.0 if attempt == 1 else previous + 0.001
+
+    class Flaky(Transport):
+        def send(self, ctx: Context) -> Response:
+            return Response(status_code=503, headers={}, url="", elapsed_ms=0, content=b"")
+
+    policy = RetryPolicy(backoff=Recording())
+    client = SyncClient(transport=Flaky(), max_retries=4, policies=[policy])
+    assert client.get("https://example.com/").status_code == 503
+    assert seen == [(1, 0.0), (2, 0.0), (3, 0.001)]
+
+    # the default schedule is unchanged
+    ctx = Context(request=Request(method="GET", url="https://example.com/"), attempt=3)
+    assert RetryPolicy(base_delay=0.1, jitter=0.0).get_retry_delay_seconds(ctx) == 0.4
+
+
+def test_simulator_reports_amplification_and_recovery() -> None:
+    config = SimConfig(clients=50, capacity=80.0, burst=20.0, duration=30.0, seed=3)
+    result = simulate("full", config)
+    assert result == simulate("full", config)  # virtual clock + seed: deterministic
+    assert result.requests > 0
+    assert 1.0 < result.amplification <= config.max_retries
+    assert 0.0 < result.failure_rate < 1.0
+    assert result.peak_load > 1.0
+    assert result.recovery_s is not None
+
+    calm = simulate(
+        "fixed", SimConfig(capacity=500.0, outage_start=0.0, outage_end=0.0, duration=20.0)
+    )
+    assert (calm.amplification, calm.recovery_s) == (1.0, 0.0)
+    with pytest.raises(ValueError):
+        SimConfig(outage_start=30.0, outage_end=10.0)
+
+
+def test_simulate_command(capsys) -> None:
+    assert main(["simulate", "--strategy", "full", "--strategy", "fixed", "--duration", "20"]) == 0
+    out = capsys.readouterr().out
+    assert "full" in out and "fixed" in out and "amplif." in out
+
+    assert main(["simulate", "--strategy", "equal", "--output", "json", "--duration", "20"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert [r["strategy"] for r in report["results"]] == ["equal"]
+    assert report["config"]["clients"] == 100
+
+    assert main(["simulate", "--outage", "30:40", "--duration", "20"]) == 2
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 17:30
+# @Author  : fzf
+# @FileName: test_bench.py
+# @Software: PyCharm
+import asyncio
+import json
+import random
+import threading
+import time
+from typing import List
+
+import pytest
+
+from relihttp.__main__ import main
+from relihttp.bench.compare import Thresholds, compare
+from relihttp.bench.engines import BenchConfig, run_async, run_threaded
+from relihttp.bench.histogram import LatencyHistogram
+from relihttp.bench.processes import run_processes, split
+from relihttp.bench.result import BenchResult
+from relihttp.bench.scenario import parse_scenario_lines
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+from relihttp.exceotions import TransportError
+from relihttp.models import Context, Response
+from relihttp.transport.async_base import AsyncTransport
+from relihttp.transport.base import Transport
+
+
+class CountingTransport(Transport):
+    """Every 4th request fails with 503; counts what it was sent."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def send(self, ctx: Context) -> Response:
+        with self.lock:
+            self.calls += 1
+            n = self.calls
+        if n % 4 == 0:
+            raise TransportError("http error", status_code=503)
+        return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b"")
+
+
+class SlowAsyncTransport(AsyncTransport):
+    """Yields to the loop for a moment and tracks peak concurrency."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def send(self, ctx: Context) -> Response:
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+        finally:
+            self.in_flight -= 1
+        return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b"")
+
+
+class StallOnceTransport(Transport):
+    """The first request stalls for 100ms, the rest answer at once."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def send(self, ctx: Context) -> Response:
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(0.1)
+        return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b"")
+
+
+class EchoMethodTransport(Transport):
+    """``/fail`` raises an HTTP 500 error; records method, url and body."""
+
+    def __init__(self) -> None:
+        self.seen: List[tuple] = []
+        self.lock = threading.Lock()
+
+    def send(self, ctx: Context) -> Response:
+        with self.lock:
+            self.seen.append((ctx.request.method, ctx.request.url, ctx.body))
+        if ctx.request.url.endswith("/fail"):
+            raise TransportError("http error", status_code=500)
+        return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b"")
+
+
+def _ok_client() -> SyncClient:
+    return SyncClient(transport=CountingTransport(), max_retries=0)
+
+
+def _broken_client() -> SyncClient:
+    raise RuntimeError("cannot build client")
+
+
+def test_histogram_percentiles_within_bucket_precision() -> None:
+    values = list(range(1, 100_001))
+    random.shuffle(values)
+    hist = LatencyHistogram()
+    for v in values:
+        hist.record(v)
+
+    assert hist.count == 100_000
+    assert hist.min == 1 and hist.max == 100_000
+    for p, exact in ((50, 50_000), (90, 90_000), (99, 99_000), (99.9, 99_900)):
+        assert abs(hist.percentile(p) - exact) / exact < 0.01
+    # small values are exact
+    small = LatencyHistogram()
+    for v in (3, 7, 200):
+        small.record(v)
+    assert [small.percentile(p) for p in (1, 50, 100)] == [3, 7, 200]
+
+
+def test_histogram_merge_equals_single_histogram() -> None:
+    a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    for v in range(0, 5000, 3):
+        a.record(v)
+        both.record(v)
+    for v in range(10_000, 90_000, 7):
+        b.record(v)
+        both.record(v)
+    a.merge(b)
+
+    assert (a.count, a.total, a.min, a.max) == (both.count, both.total, both.min, both.max)
+    assert list(a.buckets()) == list(both.buckets())
+
+
+def test_threaded_engine_reuses_clients_and_skips_warmup() -> None:
+    transport = CountingTransport()
+    clients: List[SyncClient] = []
+
+    def factory() -> SyncClient:
+        client = SyncClient(transport=transport, max_retries=0)
+        clients.append(client)
+        return client
+
+    config = BenchConfig(url="https://example.com", requests=200, concurrency=4, warmup=20)
+    result = run_threaded(config, factory)
+
+    assert len(clients) == 4
+    assert transport.calls == 220
+    assert result.total == 200
+    assert result.success + result.failed == 200
+    assert result.errors["TransportError(HTTP 503)"] == result.failed
+    assert result.statuses[503] == result.failed
+    assert result.throughput > 0
+
+
+def test_async_engine_bounds_in_flight_requests() -> None:
+    transport = SlowAsyncTransport()
+    config = BenchConfig(url="https://example.com", requests=500, concurrency=50, warmup=10)
+
+    result = asyncio.run(run_async(config, lambda: AsyncClient(transport=transport)))
+
+    assert transport.calls == 510
+    assert result.success == 500
+    assert transport.peak == 50
+    assert result.latency.min >= 1000
+
+
+def test_open_loop_counts_queueing_behind_a_stall() -> None:
+    transport = StallOnceTransport()
+    config = BenchConfig(url="https://example.com", requests=40, concurrency=1, rate=200)
+
+    result = run_threaded(config, lambda: SyncClient(transport=transport, max_retries=0))
+
+    assert result.success == 40
+    # the 20 requests due during the stall were sent late: their latency
+    # counts from the schedule, while the raw service time stays small
+    assert result.latency.percentile(75) >= 20_000
+    assert result.service.percentile(75) < 10_000
+    assert result.latency.max >= 100_000
+    assert result.elapsed_s >= 0.19
+
+
+def test_bench_command_reports_percentiles(base_url, capsys) -> None:
+    code = main(["bench", base_url + "/", "--requests", "20", "--concurrency", "2", "--warmup", "2"])
+    out = capsys.readouterr().out
+
+    assert code == 0
+    assert "total=20 success=20 failed=0" in out
+    assert "p99.9=" in out
+    assert "status 200=20" in out
+
+
+def test_bench_command_rejects_negative_warmup(capsys) -> None:
+    with pytest.raises(SystemExit):
+        main(["bench", "https://example.com", "--warmup", "-1"])
+    assert "value must be >= 0" in capsys.readouterr().err
+
+
+def test_bench_command_async_engine(base_url, capsys) -> None:
+    code = main(["bench", base_url + "/", "--requests", "20", "--concurrency", "5", "--engine", "async"])
+
+    assert code == 0
+    assert "total=20 success=20 failed=0 concurrency=5" in capsys.readouterr().out
+
+
+def test_split_spreads_remainder() -> None:
+    assert split(10, 4) == [3, 3, 2, 2]
+    assert split(2, 4) == [1, 1, 0, 0]
+
+
+def test_processes_merge_histograms_and_errors() -> None:
+    config = BenchConfig(url="https://example.com", requests=101, concurrency=4, warmup=8)
+
+    result = run_processes(config, "thread", 2, _ok_client)
+
+    assert result.total == 101
+    assert result.latency.count == result.success
+    # every 4th request of each client fails; errors are summed across processes
+    assert result.errors["TransportError(HTTP 503)"] == result.failed > 0
+
+
+def test_processes_report_worker_failure() -> None:
+    config = BenchConfig(url="https://example.com", requests=10, concurrency=2)
+
+    with pytest.raises(RuntimeError, match="cannot build client"):
+        run_processes(config, "thread", 2, _broken_client)
+
+
+def test_scenario_from_jsonl_and_access_log() -> None:
+    scenario = parse_scenario_lines([
+        '{"method": "post", "path": "/orders", "json": {"sku": 1}, "weight": 3}',
+        "",
+        '{"path": "/items", "name": "list"}',
+    ])
+    orders, items = scenario.endpoints
+    assert (orders.method, orders.name, orders.json, orders.weight) == ("POST", "POST /orders", {"sku": 1}, 3.0)
+    assert (items.method, items.name) == ("GET", "list")
+
+    log = parse_scenario_lines([
+        '1.2.3.4 - - [17/Oct/2026:10:00:00 +0000] "GET /a?x=1 HTTP/1.1" 200 2 "-" "curl"',
+        '1.2.3.4 - - [17/Oct/2026:10:00:01 +0000] "POST /b HTTP/1.1" 201 2 "-" "curl"',
+        '1.2.3.4 - - [17/Oct/2026:10:00:02 +0000] "GET /a?x=1 HTTP/1.1" 200 2 "-" "curl"',
+    ])
+    assert [(e.name, e.weight) for e in log.endpoints] == [("GET /a?x=1", 2.0), ("POST /b", 1.0)]
+
+    with pytest.raises(ValueError, match="line 1"):
+        parse_scenario_lines(['{"method": "GET"}'])
+
+
+def test_scenario_run_breaks_results_down_per_endpoint() -> None:
+    transport = EchoMethodTransport()
+    scenario = parse_scenario_lines([
+        '{"method": "POST", "path": "/orders", "json": {"sku": 1}, "weight": 3}',
+        '{"method": "GET", "path": "/fail", "weight": 1}',
+    ])
+    config = BenchConfig(url="https://example.com/", requests=400, concurrency=4, scenario=scenario)
+
+    result = run_threaded(config, lambda: SyncClient(transport=transport, max_retries=0))
+
+    orders, fail = result.endpoints["POST /orders"], result.endpoints["GET /fail"]
+    assert orders.total + fail.total == 400
+    assert orders.failed == 0 and fail.success == 0
+    assert fail.errors["TransportError(HTTP 500)"] == fail.total == result.failed
+    # weights 3:1
+    assert 200 < orders.total < 400
+    assert ("POST", "https://example.com/orders", b'{"sku":1}') in transport.seen
+
+
+def _result(latencies_us: List[int], errors: int = 0, elapsed_s: float = 1.0) -> BenchResult:
+    result = BenchResult()
+    for v in latencies_us:
+        result.latency.record(v)
+        result.statuses[200] += 1
+    for _ in range(errors):
+        result.record_error(TransportError("boom", status_code=503))
+    result.elapsed_s = elapsed_s
+    return result
+
+
+def test_result_round_trips_through_json() -> None:
+    result = _result(list(range(100, 50_000, 37)), errors=3)
+    result.endpoint("GET /a").latency.record(1234)
+
+    restored = BenchResult.from_dict(json.loads(json.dumps(result.to_dict())))
+
+    assert list(restored.latency.buckets()) == list(result.latency.buckets())
+    assert (restored.total, restored.failed, restored.throughput) == (result.total, 3, result.throughput)
+    assert restored.statuses == result.statuses
+    assert restored.endpoints["GET /a"].latency.max == 1234
+
+
+def test_compare_flags_regressions_past_thresholds() -> None:
+    old = _result([1000] * 1000)
+    slower = _result([1200] * 1000, elapsed_s=1.05)
+
+    _, regressions = compare(old, slower, Thresholds())
+    assert regressions == ["p50_ms", "p90_ms", "p99_ms", "p99.9_ms"]
+
+    _, regressions = compare(old, slower, Thresholds(latency_pct=25))
+    assert regressions == []
+
+    _, regressions = compare(old, _result([1000] * 900, errors=100), Thresholds())
+    assert regressions == ["error_rate_%"]
+
+
+def test_bench_json_output_and_compare_command(base_url, capsys, tmp_path) -> None:
+    assert main(["bench", base_url + "/", "--requests", "20", "--output", "json"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert report["schema"] == 1
+    assert report["meta"]["requests"] == 20
+    assert report["result"]["statuses"] == {"200": 20}
+    assert report["result"]["histograms"]["latency"]["count"] == 20
+
+    old = tmp_path / "old.json"
+    old.write_text(json.dumps(report))
+    assert main(["bench-compare", str(old), str(old)]) == 0
+
+    # same run, 5x slower throughput
+    report["result"]["elapsed_s"] *= 5
+    new = tmp_path / "new.json"
+    new.write_text(json.dumps(report))
+    assert main(["bench-compare", str(old), str(new)]) == 1
+    assert "throughput" in capsys.readouterr().out.splitlines()[-1]
+    assert main(["bench-compare", str(old), str(tmp_path / "missing.json")]) == 2
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 12:40
+# @Author  : fzf
+# @FileName: test_body.py
+# @Software: PyCharm
+import asyncio
+import io
+from typing import Any, List
+
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+from relihttp.codecs import StdlibJsonCodec
+from relihttp.exceotions import TransportError
+from relihttp.models import Context, Request, Response
+from relihttp.policies.retry import RetryPolicy
+from relihttp.transport.async_base import AsyncTransport
+from relihttp.transport.base import Transport, prepare_body
+
+
+class CountingCodec(StdlibJsonCodec):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def dumps(self, obj: Any) -> bytes:
+        self.calls += 1
+        return super().dumps(obj)
+
+
+class FlakyTransport(Transport):
+    """Fails the first ``failures`` attempts, recording what each attempt sent."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.sent: List[Any] = []
+
+    def send(self, ctx: Context) -> Response:
+        headers, data = prepare_body(ctx)
+        self.sent.append((dict(headers), data))
+        if len(self.sent) <= self.failures:
+            raise TransportError("connection error", method=ctx.request.method, url=ctx.request.url)
+        return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=1, content=b"")
+
+
+class AsyncFlakyTransport(AsyncTransport):
+    def __init__(self, failures: int):
+        self.inner = FlakyTransport(failures)
+
+    async def send(self, ctx: Context) -> Response:
+        return self.inner.send(ctx)
+
+
+def retry_policies() -> list:
+    return [RetryPolicy(max_retries=3, retry="all", base_delay=0.0)]
+
+
+def test_json_body_encoded_once_across_retries() -> None:
+    codec = CountingCodec()
+    transport = FlakyTransport(failures=2)
+    client = SyncClient(transport=transport, policies=retry_policies(), json_codec=codec)
+
+    client.post("https://example.com", json={"rows": list(range(100))})
+
+    assert codec.calls == 1
+    assert len(transport.sent) == 3
+    bodies = {id(data) for _, data in transport.sent}
+    assert len(bodies) == 1
+    headers, data = transport.sent[0]
+    assert headers["Content-Type"] == "application/json"
+    assert headers["Content-Length"] == str(len(data))
+
+
+def test_async_json_body_encoded_once_across_retries() -> None:
+    async def run() -> None:
+        codec = CountingCodec()
+        transport = AsyncFlakyTransport(failures=1)
+        client = AsyncClient(transport=transport, policies=retry_policies(), json_codec=codec)
+        await client.post("https://example.com", json={"a": 1})
+        assert codec.calls == 1
+        assert len(transport.inner.sent) == 2
+
+    asyncio.run(run())
+
+
+def test_form_and_text_bodies_are_materialized() -> None:
+    ctx = Context(request=Request(method="POST", url="u", data={"a": "1", "b": ["x", "y"]}))
+    headers, data = prepare_body(ctx)
+    assert data == b"a=1&b=x&b=y"
+    assert headers["Content-Type"] == "application/x-www-form-urlencoded"
+
+    ctx = Context(request=Request(method="POST", url="u", data="héllo"))
+    headers, data = prepare_body(ctx)
+    assert data == "héllo".encode("utf-8")
+    assert headers["Content-Length"] == str(len(data))
+    assert "Content-Type" not in headers
+
+
+def test_file_like_and_empty_bodies_pass_through() -> None:
+    fh = io.BytesIO(b"stream")
+    ctx = Context(request=Request(method="POST", url="u", data=fh))
+    headers, data = prepare_body(ctx)
+    assert data is fh
+    assert ctx.body is None
+
+    ctx = Context(request=Request(method="GET", url="u", headers={"A": "b"}))
+    headers, data = prepare_body(ctx)
+    assert data is None
+    assert headers is ctx.request.headers
+
+
+def test_form_none_values_and_user_content_length() -> None:
+    # same bytes as requests: None values are dropped, not sent as "None"
+    data = {"a": "1", "skip": None, "b": ["x", None], "n": 2}
+    ctx = Context(request=Request(method="POST", url="u", data=data))
+    assert prepare_body(ctx)[1] == b"a=1&b=x&n=2"
+
+    # a plain dict with a lower-case content-length: only ours is sent
+    ctx = Context(
+        request=Request(method="POST", url="u", headers={"content-length": "99"}, data=b"abc")
+    )
+    headers, _ = prepare_body(ctx)
+    assert [(k, v) for k, v in headers.items() if k.lower() == "content-length"] == [
+        ("Content-Length", "3")
+    ]
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 21:40
+# @Author  : fzf
+# @FileName: test_bulkhead.py
+# @Software: PyCharm
+import asyncio
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+from relihttp.models import Context, Request, Response
+from relihttp.policies.bulkhead import AsyncBulkheadPolicy, BulkheadFullError, BulkheadPolicy
+from relihttp.transport.async_base import AsyncTransport
+from relihttp.transport.base import Transport
+
+
+def _ok(ctx: Context) -> Response:
+    return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b"")
+
+
+class HostTransport(Transport):
+    """``slow.example`` takes ``delay`` seconds; records peak in flight per host."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.active: Counter = Counter()
+        self.peak: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def send(self, ctx: Context) -> Response:
+        host = ctx.request.url.split("/")[2]
+        with self._lock:
+            self.active[host] += 1
+            self.peak[host] = max(self.peak[host], self.active[host])
+        if host == "slow.example":
+            time.sleep(self.delay)
+        with self._lock:
+            self.active[host] -= 1
+        return _ok(ctx)
+
+
+class AsyncHostTransport(AsyncTransport):
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.active: Counter = Counter()
+        self.peak: Counter = Counter()
+
+    async def send(self, ctx: Context) -> Response:
+        host = ctx.request.url.split("/")[2]
+        self.active[host] += 1
+        self.peak[host] = max(self.peak[host], self.active[host])
+        await asyncio.sleep(self.delay)
+        self.active[host] -= 1
+        return _ok(ctx)
+
+
+def _ctx(url: str) -> Context:
+    return Context(request=Request(method="GET", url=url))
+
+
+def test_full_compartment_does_not_block_other_hosts() -> None:
+    bulkhead = BulkheadPolicy(max_concurrent=2)
+    first = _ctx("https://slow.example/a")
+    bulkhead.before_request(first)
+    bulkhead.before_request(_ctx("https://slow.example/b"))
+    with pytest.raises(BulkheadFullError):
+        bulkhead.before_request(_ctx("https://slow.example/c"))
+    bulkhead.before_request(_ctx("https://slow.example:8443/b"))  # another port, another key
+    bulkhead.before_request(_ctx("https://fast.example/"))
+
+    stats = bulkhead.stats()
+    assert stats["slow.example"] == {
+        "in_flight": 2,
+        "waiting": 0,
+        "max_concurrent": 2,
+        "utilisation": 1.0,
+        "peak": 2,
+        "rejected": 1,
+    }
+    assert stats["fast.example"]["utilisation"] == 0.5
+
+    bulkhead.after_response(first)
+    assert bulkhead.stats()["slow.example"]["in_flight"] == 1
+
+
+def test_bounded_queue_waits_then_rejects() -> None:
+    bulkhead = BulkheadPolicy(max_concurrent=1, max_queue=1, queue_timeout=0.05)
+    bulkhead.before_request(_ctx("https://a.example/"))
+    errors = []
+
+    def queued() -> None:
+        try:
+            bulkhead.before_request(_ctx("https://a.example/"))
+        except BulkheadFullError as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=queued)
+    waiter.start()
+    time.sleep(0.01)
+    # the queue holds one request: the next one fails at once
+    with pytest.raises(BulkheadFullError):
+        bulkhead.before_request(_ctx("https://a.example/"))
+    waiter.join()
+    assert len(errors) == 1  # the queued one timed out
+    assert bulkhead.stats()["a.example"]["rejected"] == 2
+
+
+def test_slow_dependency_cannot_starve_others() -> None:
+    transport = HostTransport(delay=0.2)
+    bulkhead = BulkheadPolicy(max_concurrent=2, max_queue=10, queue_timeout=5.0)
+    client = SyncClient(transport=transport, policies=[bulkhead])
+
+    slow = [
+        threading.Thread(target=client.get, args=("https://slow.example/",)) for _ in range(6)
+    ]
+    for t in slow:
+        t.start()
+    time.sleep(0.02)
+    start = time.perf_counter()
+    client.get("https://fast.example/")
+    assert time.perf_counter() - start < 0.1
+    assert bulkhead.stats()["slow.example"]["waiting"] == 4
+    for t in slow:
+        t.join()
+    assert transport.peak["slow.example"] == 2
+    assert bulkhead.stats()["slow.example"]["in_flight"] == 0
+
+
+def test_custom_key_and_per_key_limits() -> None:
+    bulkhead = BulkheadPolicy(
+        max_concurrent=1,
+        key_fn=lambda ctx: ctx.request.url.rsplit("/", 1)[-1],
+        limits={"search": 2},
+    )
+    for _ in range(2):
+        bulkhead.before_request(_ctx("https://api.example/v1/search"))
+    with pytest.raises(BulkheadFullError):
+        bulkhead.before_request(_ctx("https://api.example/v2/search"))
+    bulkhead.before_request(_ctx("https://api.example/v1/orders"))
+    with pytest.raises(ValueError):
+        BulkheadPolicy(max_concurrent=0)
+
+
+def test_async_bulkhead_queues_per_host() -> None:
+    transport = AsyncHostTransport(delay=0.02)
+    bulkhead = AsyncBulkheadPolicy(max_concurrent=3, max_queue=20, queue_timeout=5.0)
+
+    async def run() -> list:
+        client = AsyncClient(transport=transport, policies=[bulkhead])
+        urls = ["https://a.example/"] * 10 + ["https://b.example/"] * 2
+        return await asyncio.gather(*(client.get(u) for u in urls))
+
+    assert len(asyncio.run(run())) == 12
+    assert transport.peak == Counter({"a.example": 3, "b.example": 2})
+    assert bulkhead.stats()["a.example"]["in_flight"] == 0
+
+
+def test_async_full_queue_rejects() -> None:
+    bulkhead = AsyncBulkheadPolicy(max_concurrent=1, max_queue=1, queue_timeout=5.0)
+
+    async def run() -> list:
+        client = AsyncClient(transport=AsyncHostTransport(delay=0.05), policies=[bulkhead])
+        return await asyncio.gather(
+            *(client.get("https://a.example/") for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert [type(r) for r in results] == [Response, Response, BulkheadFullError]
+    stats = bulkhead.stats()["a.example"]
+    assert (stats["in_flight"], stats["waiting"], stats["peak"], stats["rejected"]) == (0, 0, 1, 1)
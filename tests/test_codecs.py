@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 11:58
+# @Author  : fzf
+# @FileName: test_codecs.py
+# @Software: PyCharm
+from typing import Any, List, Union
+
+import pytest
+
+from relihttp.client.SyncClient import SyncClient
+from relihttp.codecs import JsonCodec, StdlibJsonCodec, get_json_codec
+from relihttp.models import Context, Request, Response
+from relihttp.transport.base import Transport, prepare_body
+
+
+class CountingCodec(JsonCodec):
+    name = "counting"
+
+    def __init__(self) -> None:
+        self.dumped: List[Any] = []
+        self.loaded = 0
+
+    def dumps(self, obj: Any) -> bytes:
+        self.dumped.append(obj)
+        return StdlibJsonCodec().dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        self.loaded += 1
+        return StdlibJsonCodec().loads(data)
+
+
+class EchoTransport(Transport):
+    def send(self, ctx: Context) -> Response:
+        headers, data = prepare_body(ctx)
+        return Response(
+            status_code=200,
+            headers=dict(headers),
+            url=ctx.request.url,
+            elapsed_ms=1,
+            content=data,
+        )
+
+
+def test_get_json_codec_resolution() -> None:
+    assert get_json_codec(None).name == "json"
+    assert get_json_codec("json").name == "json"
+    codec = CountingCodec()
+    assert get_json_codec(codec) is codec
+    assert get_json_codec("auto").name in ("json", "orjson", "msgspec")
+    with pytest.raises(ValueError):
+        get_json_codec("yaml")
+
+
+def test_prepare_body_encodes_json_and_keeps_content_type() -> None:
+    req = Request(method="POST", url="https://example.com", json={"a": 1})
+    headers, data = prepare_body(Context(request=req))
+    assert data == b'{"a":1}'
+    assert headers["Content-Type"] == "application/json"
+
+    req = Request(
+        method="POST",
+        url="https://example.com",
+        headers={"content-type": "application/vnd.api+json"},
+        json=[1],
+    )
+    headers, _ = prepare_body(Context(request=req))
+    assert "Content-Type" not in headers
+    assert headers["content-type"] == "application/vnd.api+json"
+
+
+def test_client_codec_used_for_request_and_response() -> None:
+    codec = CountingCodec()
+    client = SyncClient(transport=EchoTransport(), json_codec=codec)
+
+    resp = client.post("https://example.com", json={"items": [1, 2, 3]})
+    assert codec.dumped == [{"items": [1, 2, 3]}]
+    assert resp.json() == {"items": [1, 2, 3]}
+    assert resp.json() == {"items": [1, 2, 3]}
+    assert codec.loaded == 1
+
+
+def test_orjson_codec_roundtrip() -> None:
+    pytest.importorskip("orjson")
+    codec = get_json_codec("orjson")
+    payload = {"a": [1, 2.5, "x"], 1: None}
+    assert codec.loads(codec.dumps(payload)) == {"a": [1, 2.5, "x"], "1": None}
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 21:05
+# @Author  : fzf
+# @FileName: test_concurrency.py
+# @Software: PyCharm
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+from relihttp.exceotions import TransportError
+from relihttp.models import Context, Request, Response
+from relihttp.policies.circuit import CircuitBreakerPolicy
+from relihttp.policies.concurrency import (
+    AdaptiveConcurrencyPolicy,
+    AIMDLimit,
+    AsyncAdaptiveConcurrencyPolicy,
+    ConcurrencyLimitExceeded,
+    GradientLimit,
+)
+from relihttp.policies.rate_limit import RateLimitedError, RateLimitPolicy
+from relihttp.transport.async_base import AsyncTransport
+from relihttp.transport.base import Transport
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class SlowTransport(Transport):
+    """Sleeps ``delay`` seconds per call and records the peak concurrency."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def send(self, ctx: Context) -> Response:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return Response(
+            status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b""
+        )
+
+
+class SlowAsyncTransport(AsyncTransport):
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def send(self, ctx: Context) -> Response:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return Response(
+            status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b""
+        )
+
+
+def _ctx() -> Context:
+    return Context(request=Request(method="GET", url="https://example.com/"))
+
+
+def _complete(policy: AdaptiveConcurrencyPolicy, clock: FakeClock, rtt: float, error=None) -> None:
+    ctx = _ctx()
+    policy.before_request(ctx)
+    clock.now += rtt
+    ctx.error = error
+    if error is None:
+        ctx.response = Response(status_code=200, headers={}, url="", elapsed_ms=0, content=b"")
+    policy.after_response(ctx)
+
+
+def test_aimd_grows_near_min_rtt_and_backs_off() -> None:
+    clock = FakeClock()
+    policy = AdaptiveConcurrencyPolicy(initial_limit=4, time_fn=clock)
+    held = [_ctx(), _ctx()]
+    for ctx in held:  # keep half the limit busy so growth is allowed
+        policy.before_request(ctx)
+
+    for _ in range(3):
+        _complete(policy, clock, 0.010)
+    assert policy.limit == 7
+
+    _complete(policy, clock, 0.050)  # 5x the minimum RTT
+    assert policy.limit == 6
+    _complete(policy, clock, 0.010, TransportError("http error", status_code=503))
+    timeout = TransportError("timeout")
+    timeout.__cause__ = requests.Timeout()
+    _complete(policy, clock, 0.500, timeout)
+    assert policy.limit == 5  # 7 * 0.9 ** 3
+    # fast failures are not samples, and the message alone does not make a timeout
+    _complete(policy, clock, 0.001, TransportError("connection error"))
+    _complete(policy, clock, 0.001, TransportError("timeout waiting for the pool"))
+    assert policy.stats() == {
+        "limit": 5, "in_flight": 2, "min_rtt_ms": 10.0, "rejected": 0, "dropped": 2
+    }
+
+
+def test_gradient_shrinks_on_latency_inflation() -> None:
+    clock = FakeClock()
+    policy = AdaptiveConcurrencyPolicy(
+        initial_limit=50, algorithm=GradientLimit(smoothing=1.0), time_fn=clock
+    )
+    _complete(policy, clock, 0.010)
+    assert policy.limit == 50  # app-limited: nothing learned
+    _complete(policy, clock, 0.030)
+    # gradient 1.5 * 10 / 30 = 0.5: 50 * 0.5 + sqrt(50)
+    assert policy.limit == 32
+
+
+def test_reject_mode_and_limits_validation() -> None:
+    policy = AdaptiveConcurrencyPolicy(initial_limit=1, max_limit=1, mode="reject")
+    policy.before_request(_ctx())
+    with pytest.raises(ConcurrencyLimitExceeded):
+        policy.before_request(_ctx())
+    assert policy.stats()["rejected"] == 1
+
+    with pytest.raises(ValueError):
+        AdaptiveConcurrencyPolicy(initial_limit=500)
+    with pytest.raises(ValueError):
+        AIMDLimit(backoff_ratio=1.5)
+
+
+def test_sync_client_queues_over_the_limit() -> None:
+    transport = SlowTransport(0.05)
+    policy = AdaptiveConcurrencyPolicy(initial_limit=2, max_limit=2, queue_timeout=5.0)
+    client = SyncClient(transport=transport, policies=[policy])
+
+    threads = [
+        threading.Thread(target=client.get, args=("https://example.com/",)) for _ in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert transport.peak == 2
+    assert policy.in_flight == 0
+
+
+def test_queue_timeout_rejects() -> None:
+    policy = AdaptiveConcurrencyPolicy(initial_limit=1, max_limit=1, queue_timeout=0.05)
+    policy.before_request(_ctx())
+    start = time.perf_counter()
+    with pytest.raises(ConcurrencyLimitExceeded):
+        policy.before_request(_ctx())
+    assert time.perf_counter() - start >= 0.04
+
+
+def test_inner_rejection_releases_outer_slots() -> None:
+    limiter = AdaptiveConcurrencyPolicy(initial_limit=1, max_limit=1, mode="reject")
+    breaker = CircuitBreakerPolicy(failure_threshold=1)
+    rate_limit = RateLimitPolicy(rate_limit=1, burst=1, mode="raise")
+    client = SyncClient(transport=SlowTransport(0.0), policies=[limiter, breaker, rate_limit])
+
+    client.get("https://example.com/")
+    with pytest.raises(RateLimitedError):
+        client.get("https://example.com/")
+    # the slot came back and the breaker did not count the rejection
+    assert limiter.in_flight == 0
+    assert breaker.state == "closed"
+
+
+def test_async_policy_queues_and_tags_rejection() -> None:
+    transport = SlowAsyncTransport(0.02)
+    policy = AsyncAdaptiveConcurrencyPolicy(initial_limit=2, max_limit=2, queue_timeout=5.0)
+
+    async def run() -> None:
+        client = AsyncClient(transport=transport, policies=[policy])
+        await asyncio.gather(*(client.get("https://example.com/") for _ in range(10)))
+
+    asyncio.run(run())
+    assert transport.peak == 2
+    assert policy.in_flight == 0
+
+    strict = AsyncAdaptiveConcurrencyPolicy(initial_limit=1, max_limit=1, queue_timeout=0.01)
+    seen = {}
+
+    class Spy(CircuitBreakerPolicy):
+        def after_response(self, ctx: Context) -> None:
+            seen.update(ctx.tags)
+            super().after_response(ctx)
+
+    async def run_strict() -> None:
+        client = AsyncClient(transport=SlowAsyncTransport(0.1), policies=[Spy(), strict])
+        results = await asyncio.gather(
+            client.get("https://example.com/"),
+            client.get("https://example.com/"),
+            return_exceptions=True,
+        )
+        assert isinstance(results[1], ConcurrencyLimitExceeded)
+
+    asyncio.run(run_strict())
+    assert seen["rejected_by"] == "AsyncAdaptiveConcurrencyPolicy"
+    assert strict.in_flight == 0
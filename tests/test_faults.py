@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 19:50
+# @Author  : fzf
+# @FileName: test_faults.py
+# @Software: PyCharm
+import asyncio
+import json
+from typing import List
+
+import pytest
+
+from relihttp.__main__ import main
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+from relihttp.exceotions import TransportError
+from relihttp.models import Context, Request, Response
+from relihttp.policies.retry import RetryPolicy
+from relihttp.transport.async_base import AsyncTransport
+from relihttp.transport.base import Transport
+from relihttp.transport.faults import (
+    AsyncFaultInjectionTransport,
+    Fault,
+    FaultInjectionTransport,
+    parse_faults,
+)
+
+
+class OkTransport(Transport):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def send(self, ctx: Context) -> Response:
+        self.calls += 1
+        return Response(
+            status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b"ok"
+        )
+
+
+class OkAsyncTransport(AsyncTransport):
+    async def send(self, ctx: Context) -> Response:
+        return Response(
+            status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b"ok"
+        )
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _ctx(url: str = "https://example.com/a", method: str = "GET", timeout: float = 2.0) -> Context:
+    return Context(request=Request(method=method, url=url), timeout=timeout)
+
+
+def test_failure_kinds_match_real_transports() -> None:
+    clock = FakeClock()
+    faults = [
+        Fault(match="/timeout", timeout_rate=1.0),
+        Fault(match="/reset", reset_rate=1.0),
+        Fault(match="/status", status_rate=1.0, status_codes=[502]),
+    ]
+    inner = OkTransport()
+    transport = FaultInjectionTransport(inner, faults, time_fn=clock.time, sleep_fn=clock.sleep)
+
+    with pytest.raises(TransportError, match="^timeout") as excinfo:
+        transport.send(_ctx("https://example.com/timeout", timeout=1.5))
+    assert excinfo.value.status_code is None
+    assert clock.sleeps == [1.5]  # the request's own timeout is waited out
+    with pytest.raises(TransportError, match="^connection error"):
+        transport.send(_ctx("https://example.com/reset"))
+    # error statuses come back as responses, like the real transports
+    assert transport.send(_ctx("https://example.com/status")).status_code == 502
+
+    assert transport.send(_ctx("https://example.com/fine")).text == "ok"
+    assert inner.calls == 1
+    assert transport.stats() == {"requests": 4, "delayed": 0, "timeout": 1, "reset": 1, "status": 1}
+
+
+def test_schedule_methods_and_latency() -> None:
+    clock = FakeClock()
+    faults = [
+        Fault(latency=0.05),
+        Fault(methods=["post"], after=10.0, until=20.0, reset_rate=1.0),
+    ]
+    transport = FaultInjectionTransport(
+        OkTransport(), faults, time_fn=clock.time, sleep_fn=clock.sleep
+    )
+
+    transport.send(_ctx(method="POST"))  # before the outage window
+    clock.now = 15.0
+    transport.send(_ctx(method="GET"))
+    with pytest.raises(TransportError):
+        transport.send(_ctx(method="POST"))
+    clock.now = 25.0
+    transport.send(_ctx(method="POST"))
+
+    assert clock.sleeps == [0.05] * 4
+
+
+def test_seeded_faults_are_reproducible() -> None:
+    def outcomes(seed: int) -> List[bool]:
+        transport = FaultInjectionTransport(
+            OkTransport(), [Fault(reset_rate=0.3)], seed=seed, sleep_fn=lambda s: None
+        )
+        result = []
+        for _ in range(200):
+            try:
+                transport.send(_ctx())
+                result.append(True)
+            except TransportError:
+                result.append(False)
+        return result
+
+    first = outcomes(7)
+    assert first == outcomes(7)
+    assert 40 <= first.count(False) <= 80
+
+
+def test_parse_faults_latency_dists() -> None:
+    faults = parse_faults([
+        {"latency": {"dist": "uniform", "low": 0.01, "high": 0.02}, "match": "/api"},
+        {"latency": 0.1, "status_rate": 0.5},
+    ])
+    clock = FakeClock()
+    transport = FaultInjectionTransport(OkTransport(), faults[:1], seed=1, sleep_fn=clock.sleep)
+    transport.send(_ctx("https://example.com/api/x"))
+    assert 0.01 <= clock.sleeps[0] <= 0.02
+    assert faults[1].draw_latency(None) == 0.1
+
+    with pytest.raises(ValueError):
+        parse_faults([{"latency": {"dist": "pareto"}}])
+    with pytest.raises(ValueError):
+        Fault(reset_rate=0.6, status_rate=0.6)
+
+
+def test_client_retries_through_injected_errors() -> None:
+    inner = OkTransport()
+    transport = FaultInjectionTransport(inner, [Fault(status_rate=0.5)], seed=3)
+    client = SyncClient(
+        transport=transport,
+        max_retries=20,
+        policies=[RetryPolicy(max_retries=20, base_delay=0.0, jitter=0.0)],
+    )
+
+    for _ in range(20):
+        assert client.get("https://example.com/a").status_code == 200
+    stats = transport.stats()
+    assert stats["status"] > 0
+    assert stats["requests"] == inner.calls + stats["status"]
+
+
+def test_async_fault_injection() -> None:
+    slept: List[float] = []
+
+    async def fake_sleep(seconds: float) -> None:
+        slept.append(seconds)
+
+    transport = AsyncFaultInjectionTransport(
+        OkAsyncTransport(),
+        [Fault(latency=0.2), Fault(match="/down", timeout_rate=1.0, timeout_after=0.5)],
+        sleep_fn=fake_sleep,
+    )
+
+    async def run() -> None:
+        client = AsyncClient(transport=transport, max_retries=1)
+        assert (await client.get("https://example.com/up")).text == "ok"
+        with pytest.raises(TransportError, match="^timeout"):
+            await client.get("https://example.com/down")
+
+    asyncio.run(run())
+    assert slept == [0.2, 0.2, 0.5]
+
+
+def test_bench_command_with_faults(base_url, capsys, tmp_path) -> None:
+    faults = tmp_path / "faults.json"
+    faults.write_text(json.dumps([{"status_rate": 1.0, "status_codes": [502]}]))
+    code = main([
+        "bench", base_url + "/", "--requests", "10", "--max-retries", "1", "--faults", str(faults)
+    ])
+    assert code == 1
+    assert "502=10" in capsys.readouterr().out
+
+    bad = tmp_path / "bad.json"
+    bad.write_text('{"status_rate": 1.0}')
+    assert main(["bench", base_url + "/", "--faults", str(bad)]) == 2
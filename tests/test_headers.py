@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 16:05
+# @Author  : fzf
+# @FileName: test_headers.py
+# @Software: PyCharm
+from relihttp.client.SyncClient import SyncClient
+from relihttp.models import Context, Headers, Response
+from relihttp.policies.idempotency import IdempotencyPolicy
+from relihttp.transport.base import Transport
+
+
+class CaptureTransport(Transport):
+    def __init__(self) -> None:
+        self.headers = []
+
+    def send(self, ctx: Context) -> Response:
+        self.headers.append(dict(ctx.request.headers))
+        return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0)
+
+
+def test_child_reads_through_parent_case_insensitively() -> None:
+    parent = Headers({"User-Agent": "relihttp", "Accept": "*/*"})
+    child = Headers({"accept": "application/json"}, parent=parent)
+
+    assert child["user-agent"] == "relihttp"
+    assert child["ACCEPT"] == "application/json"
+    assert dict(child) == {"User-Agent": "relihttp", "accept": "application/json"}
+    assert len(child) == 2
+    # nothing from the parent was copied into the child
+    assert list(child._store) == ["accept"]
+
+
+def test_child_writes_and_deletes_do_not_touch_parent() -> None:
+    parent = Headers({"User-Agent": "relihttp", "X-Env": "prod"})
+    child = Headers(parent=parent)
+
+    child["Idempotency-Key"] = "k1"
+    del child["x-env"]
+    assert "X-Env" not in child
+    assert "Idempotency-Key" in child
+    assert len(child) == 2
+
+    assert parent == {"User-Agent": "relihttp", "X-Env": "prod"}
+    assert child.copy() == {"user-agent": "relihttp", "idempotency-key": "k1"}
+
+
+def test_client_merges_per_call_headers_over_defaults() -> None:
+    transport = CaptureTransport()
+    client = SyncClient(
+        headers={"User-Agent": "relihttp", "Accept": "*/*"},
+        transport=transport,
+        policies=[IdempotencyPolicy()],
+    )
+
+    client.post("https://example.com", headers={"accept": "application/json"})
+    client.post("https://example.com")
+
+    first, second = transport.headers
+    assert first["accept"] == "application/json"
+    assert "Accept" not in first
+    assert second["Accept"] == "*/*"
+    assert first["Idempotency-Key"] != second["Idempotency-Key"]
+    assert "Idempotency-Key" not in client.headers
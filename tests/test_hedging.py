@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 20:30
+# @Author  : fzf
+# @FileName: test_hedging.py
+# @Software: PyCharm
+import asyncio
+import threading
+import time
+from typing import List
+
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+from relihttp.exceotions import TransportError
+from relihttp.models import Context, Request, Response
+from relihttp.transport.async_base import AsyncTransport
+from relihttp.transport.base import Transport
+from relihttp.transport.hedging import AsyncHedgingTransport, HedgingTransport
+
+
+def _response(ctx: Context, body: bytes) -> Response:
+    return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=body)
+
+
+class SlowFirstTransport(Transport):
+    """The first call takes ``slow`` seconds, later calls return at once."""
+
+    def __init__(self, slow: float = 0.3) -> None:
+        self.slow = slow
+        self.request_ids: List[str] = []
+        self._lock = threading.Lock()
+
+    def send(self, ctx: Context) -> Response:
+        with self._lock:
+            self.request_ids.append(ctx.request_id)
+            first = len(self.request_ids) == 1
+        if first:
+            time.sleep(self.slow)
+            return _response(ctx, b"slow")
+        return _response(ctx, b"fast")
+
+
+class SlowFirstAsyncTransport(AsyncTransport):
+    def __init__(self, slow: float = 0.3) -> None:
+        self.slow = slow
+        self.calls = 0
+        self.cancelled = 0
+
+    async def send(self, ctx: Context) -> Response:
+        self.calls += 1
+        if self.calls == 1:
+            try:
+                await asyncio.sleep(self.slow)
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+            return _response(ctx, b"slow")
+        return _response(ctx, b"fast")
+
+
+def test_slow_request_is_hedged_with_same_request_id() -> None:
+    inner = SlowFirstTransport()
+    transport = HedgingTransport(inner, delay=0.02)
+    client = SyncClient(transport=transport, trace=True)
+
+    start = time.perf_counter()
+    resp = client.get("https://example.com/items")
+    assert time.perf_counter() - start < 0.2
+    assert resp.text == "fast"
+    assert len(inner.request_ids) == 2 and len(set(inner.request_ids)) == 1
+    assert inner.request_ids[0]
+    assert transport.stats() == {
+        "requests": 1, "hedged": 1, "hedge_wins": 1, "budget_exhausted": 0, "capacity_exhausted": 0
+    }
+    transport.close()
+
+
+def test_unsafe_methods_and_exhausted_budget_are_not_hedged() -> None:
+    inner = SlowFirstTransport(slow=0.05)
+    transport = HedgingTransport(inner, delay=0.01, budget=0.0, burst=1.0)
+    client = SyncClient(transport=transport)
+
+    assert client.post("https://example.com/items", json={}).text == "slow"
+    assert len(inner.request_ids) == 1
+
+    inner.request_ids.clear()
+    assert client.get("https://example.com/items").text == "fast"  # spends the only token
+    inner.request_ids.clear()
+    assert client.get("https://example.com/items").text == "slow"
+    stats = transport.stats()
+    assert (stats["hedged"], stats["budget_exhausted"]) == (1, 1)
+    transport.close()
+
+
+class SleepTransport(Transport):
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+
+    def send(self, ctx: Context) -> Response:
+        time.sleep(self.seconds)
+        return _response(ctx, b"ok")
+
+
+def _concurrent_gets(transport: Transport, n: int) -> float:
+    def get() -> None:
+        transport.send(Context(request=Request(method="GET", url="https://example.com/items")))
+
+    threads = [threading.Thread(target=get) for _ in range(n)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start
+
+
+def test_concurrent_callers_are_not_queued_behind_the_pool() -> None:
+    # more callers than workers: the overflow is sent unhedged on the
+    # callers' threads instead of queueing, so all of them take one latency
+    transport = HedgingTransport(SleepTransport(0.1), delay=0.25, max_workers=4)
+    assert _concurrent_gets(transport, 32) < 0.4
+    stats = transport.stats()
+    assert stats["capacity_exhausted"] >= 28
+    assert stats["hedged"] + stats["budget_exhausted"] == 0
+    transport.close()
+
+
+def test_hedge_is_skipped_without_a_free_worker() -> None:
+    inner = SlowFirstTransport(slow=0.1)
+    transport = HedgingTransport(inner, delay=0.01, max_workers=1)
+    resp = transport.send(Context(request=Request(method="GET", url="https://example.com/items")))
+    assert resp.text == "slow" and len(inner.request_ids) == 1
+    stats = transport.stats()
+    assert (stats["hedged"], stats["capacity_exhausted"]) == (0, 1)
+    transport.close()
+
+
+class TaggingTransport(Transport):
+    """Tags each copy with its own body; the first copy is slow."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def send(self, ctx: Context) -> Response:
+        with self._lock:
+            self.calls += 1
+            body = b"slow" if self.calls == 1 else b"fast"
+        ctx.tags["copy"] = body.decode()
+        if body == b"slow":
+            time.sleep(0.1)
+        return _response(ctx, body)
+
+
+def test_only_the_winning_copy_tags_the_context() -> None:
+    transport = HedgingTransport(TaggingTransport(), delay=0.02)
+    ctx = Context(request=Request(method="GET", url="https://example.com/items"))
+    assert transport.send(ctx).text == "fast"
+    time.sleep(0.15)  # let the losing copy finish
+    assert ctx.tags == {"hedged": True, "hedge_won": True, "copy": "fast"}
+    transport.close()
+
+
+class FailingTransport(Transport):
+    """The slow first copy raises; the hedge answers 503 at once."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def send(self, ctx: Context) -> Response:
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(0.05)
+            raise TransportError("connection error", url=ctx.request.url)
+        return Response(status_code=503, headers={}, url=ctx.request.url, content=b"")
+
+
+class FailingAsyncTransport(AsyncTransport):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def send(self, ctx: Context) -> Response:
+        self.calls += 1
+        if self.calls == 1:
+            await asyncio.sleep(0.05)
+            raise TransportError("connection error", url=ctx.request.url)
+        return Response(status_code=503, headers={}, url=ctx.request.url, content=b"")
+
+
+def test_both_copies_failing_returns_the_response_over_the_exception() -> None:
+    transport = HedgingTransport(FailingTransport(), delay=0.01)
+    ctx = Context(request=Request(method="GET", url="https://example.com/items"))
+    assert transport.send(ctx).status_code == 503
+    transport.close()
+
+    async_transport = AsyncHedgingTransport(FailingAsyncTransport(), delay=0.01)
+    ctx = Context(request=Request(method="GET", url="https://example.com/items"))
+    assert asyncio.run(async_transport.send(ctx)).status_code == 503
+
+
+def test_percentile_delay_tracks_endpoint_latency() -> None:
+    transport = HedgingTransport(
+        SlowFirstTransport(slow=0.0), delay=10.0, percentile=95, min_samples=5
+    )
+    client = SyncClient(transport=transport)
+
+    ctx = Context(request=Request(method="GET", url="https://example.com/a?page=1"))
+    assert transport._hedger.delay_for(ctx) == 10.0
+    for page in range(5):
+        client.get("https://example.com/a", params={"page": page})
+    assert transport._hedger.delay_for(ctx) < 0.1
+    other = Context(request=Request(method="GET", url="https://example.com/b"))
+    assert transport._hedger.delay_for(other) == 10.0
+    transport.close()
+
+
+def test_async_hedge_cancels_the_slow_copy() -> None:
+    inner = SlowFirstAsyncTransport()
+    transport = AsyncHedgingTransport(inner, delay=0.02)
+
+    async def run() -> Response:
+        client = AsyncClient(transport=transport)
+        return await client.get("https://example.com/items")
+
+    start = time.perf_counter()
+    resp = asyncio.run(run())
+    assert time.perf_counter() - start < 0.2
+    assert resp.text == "fast"
+    assert inner.cancelled == 1
+    assert transport.stats()["hedge_wins"] == 1
+
+
+def test_async_fast_request_is_not_hedged() -> None:
+    inner = SlowFirstAsyncTransport(slow=0.0)
+    transport = AsyncHedgingTransport(inner, delay=0.05)
+
+    async def run() -> None:
+        client = AsyncClient(transport=transport)
+        for _ in range(3):
+            await client.get("https://example.com/items")
+
+    asyncio.run(run())
+    assert inner.calls == 3
+    assert transport.stats() == {
+        "requests": 3, "hedged": 0, "hedge_wins": 0, "budget_exhausted": 0, "capacity_exhausted": 0
+    }
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 11:05
+# @Author  : fzf
+# @FileName: test_models.py
+# @Software: PyCharm
+from multidict import CIMultiDict
+
+from relihttp.models import HeadersView, Response
+
+
+def make_response(content: bytes, content_type: str) -> Response:
+    return Response(
+        status_code=200,
+        headers={"Content-Type": content_type},
+        url="https://example.com",
+        elapsed_ms=1,
+        content=content,
+    )
+
+
+def test_text_is_decoded_lazily_with_header_charset() -> None:
+    resp = make_response("héllo".encode("latin-1"), "text/plain; charset=ISO-8859-1")
+    assert resp._text is None
+    assert resp.encoding == "ISO-8859-1"
+    assert resp.text == "héllo"
+    assert resp.content == "héllo".encode("latin-1")
+
+
+def test_json_is_parsed_from_bytes_once() -> None:
+    resp = make_response(b'{"a": [1, 2]}', "application/json")
+    first = resp.json()
+    assert first == {"a": [1, 2]}
+    assert resp.json() is first
+    # the decoded text was never needed
+    assert resp._text is None
+
+
+def test_text_only_response_still_works() -> None:
+    resp = Response(status_code=200, headers={}, text='{"ok": true}', url="u", elapsed_ms=0)
+    assert resp.json() == {"ok": True}
+    assert resp.content == b'{"ok": true}'
+
+
+def test_headers_view_is_case_insensitive_without_copy() -> None:
+    raw = {"Content-Type": "application/json", "X-Trace": "abc"}
+    view = HeadersView(raw)
+    assert view["content-type"] == "application/json"
+    assert "x-trace" in view
+    assert "missing" not in view
+    assert view.get("X-TRACE") == "abc"
+    assert list(view) == ["Content-Type", "X-Trace"]
+    assert view._raw is raw
+
+
+def test_headers_view_counts_repeated_names_once() -> None:
+    view = HeadersView(CIMultiDict([("Set-Cookie", "a=1"), ("set-cookie", "b=2"), ("Vary", "Accept")]))
+    assert list(view) == ["Set-Cookie", "Vary"]
+    assert len(view) == 2
+    assert dict(view) == {"Set-Cookie": "a=1", "Vary": "Accept"}
+
+
+def test_responses_compare_by_status_headers_url_and_body() -> None:
+    resp = make_response(b"ok", "text/plain")
+    assert resp == make_response(b"ok", "text/plain")
+    assert resp != make_response(b"no", "text/plain")
+    assert resp != make_response(b"ok", "application/json")
+    # a text-only response equals the same body given as bytes
+    assert Response(200, {"Content-Type": "text/plain"}, "ok", "https://example.com") == resp
+    assert repr(resp) == (
+        "Response(status_code=200, url='https://example.com', "
+        "headers=HeadersView({'Content-Type': 'text/plain'}), content=b'ok')"
+    )
+
+
+def test_unread_streams_are_not_read_to_compare() -> None:
+    stream = Response(status_code=200, url="u", stream=iter(()))
+    assert stream != Response(status_code=200, url="u", stream=iter(()))
+    assert stream == stream
+    assert repr(stream).endswith("content=<stream>)")
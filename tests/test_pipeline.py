@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 16:50
+# @Author  : fzf
+# @FileName: test_pipeline.py
+# @Software: PyCharm
+import asyncio
+from typing import List
+
+import pytest
+
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+from relihttp.models import Context, Response
+from relihttp.policies.base import Policy
+from relihttp.policies.pipeline import compile_pipeline
+from relihttp.policies.rate_limit import AsyncRateLimitPolicy
+from relihttp.policies.retry import RetryPolicy
+from relihttp.policies.timeout import TimeoutPolicy
+from relihttp.policies.tracing import TracingPolicy
+from relihttp.transport.async_base import AsyncTransport
+from relihttp.transport.base import Transport
+
+
+class Recorder(Policy):
+    def __init__(self, name: str, calls: List[str]) -> None:
+        self.name = name
+        self.calls = calls
+
+    def before_request(self, ctx: Context) -> None:
+        self.calls.append(f"{self.name}.before")
+
+    def after_response(self, ctx: Context) -> None:
+        self.calls.append(f"{self.name}.after")
+
+
+class OkTransport(Transport):
+    def send(self, ctx: Context) -> Response:
+        return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b"")
+
+
+class OkAsyncTransport(AsyncTransport):
+    async def send(self, ctx: Context) -> Response:
+        return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b"")
+
+
+def test_only_overridden_hooks_are_compiled() -> None:
+    timeout, retry, tracing = TimeoutPolicy(), RetryPolicy(), TracingPolicy()
+    pipeline = compile_pipeline([timeout, retry, tracing])
+
+    assert [h.__self__ for h in pipeline.before] == [timeout, tracing]
+    assert pipeline.after == ()
+    assert [h.__self__ for h, _ in pipeline.retry] == [retry]
+    assert pipeline.after_stream == ()
+    # sync hooks are not wrapped in coroutines for the async path
+    assert [is_async for _, is_async in pipeline.async_before] == [False, False]
+
+
+def test_async_override_is_awaited() -> None:
+    limiter = AsyncRateLimitPolicy(rate_limit=10)
+    pipeline = compile_pipeline([TimeoutPolicy(), limiter])
+
+    hook, is_async = pipeline.async_before[-1]
+    assert is_async and hook == limiter.async_before_request
+    # the sync path keeps the inherited blocking hook
+    assert pipeline.before[-1] == limiter.before_request
+
+
+def test_inactive_hooks_are_not_compiled() -> None:
+    limiter, adaptive = AsyncRateLimitPolicy(rate_limit=10), AsyncRateLimitPolicy(10, adaptive=True)
+    pipeline = compile_pipeline([limiter, adaptive])
+
+    assert [h.__self__ for h in pipeline.after] == [adaptive]
+    assert [h.__self__ for h, _ in pipeline.async_after] == [adaptive]
+    assert len(pipeline.before) == 2
+
+
+def test_hook_order_and_recompile_on_assignment() -> None:
+    calls: List[str] = []
+    client = SyncClient(transport=OkTransport(), policies=[Recorder("a", calls), Recorder("b", calls)])
+    client.get("https://example.com")
+    assert calls == ["a.before", "b.before", "b.after", "a.after"]
+
+    calls.clear()
+    client.policies = [Recorder("c", calls)]
+    client.get("https://example.com")
+    assert calls == ["c.before", "c.after"]
+
+
+def test_in_place_policy_changes_recompile() -> None:
+    calls: List[str] = []
+    client = SyncClient(transport=OkTransport(), policies=[Recorder("a", calls)])
+    client.policies.append(Recorder("b", calls))
+    client.get("https://example.com")
+    assert calls == ["a.before", "b.before", "b.after", "a.after"]
+
+    calls.clear()
+    client.policies[0] = Recorder("c", calls)
+    del client.policies[1]
+    client.get("https://example.com")
+    assert calls == ["c.before", "c.after"]
+
+    calls.clear()
+    client.policies.clear()
+    client.get("https://example.com")
+    assert calls == []
+
+
+class Rejecter(Recorder):
+    def before_request(self, ctx: Context) -> None:
+        super().before_request(ctx)
+        raise RuntimeError("rejected")
+
+
+def test_rejection_unwinds_outer_policies_only() -> None:
+    calls: List[str] = []
+    client = SyncClient(
+        transport=OkTransport(),
+        policies=[Recorder("a", calls), Recorder("b", calls), Rejecter("r", calls), Recorder("c", calls)],
+    )
+
+    with pytest.raises(RuntimeError):
+        client.get("https://example.com")
+    assert calls == ["a.before", "b.before", "r.before", "b.after", "a.after"]
+
+
+def test_async_client_runs_compiled_hooks() -> None:
+    calls: List[str] = []
+
+    async def run() -> None:
+        client = AsyncClient(transport=OkAsyncTransport(), policies=[Recorder("a", calls), Recorder("b", calls)])
+        resp = await client.get("https://example.com")
+        assert resp.status_code == 200
+
+    asyncio.run(run())
+    assert calls == ["a.before", "b.before", "b.after", "a.after"]
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 13:45
+# @Author  : fzf
+# @FileName: test_pool.py
+# @Software: PyCharm
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from relihttp.client.SyncClient import SyncClient
+from relihttp.exceotions import TransportError
+from relihttp.transport import pool
+from relihttp.transport.pool import _missing_pool_hooks
+
+
+def host_stats(client: SyncClient, base_url: str) -> dict:
+    stats = client.pool_stats()
+    assert list(stats) == [base_url]
+    return stats[base_url]
+
+
+def test_sequential_requests_reuse_one_connection(base_url: str) -> None:
+    client = SyncClient(policies=[])
+    for _ in range(5):
+        client.get(base_url + "/")
+
+    stats = host_stats(client, base_url)
+    assert stats["created"] == 1
+    assert stats["reused"] == 4
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 1
+    assert stats["maxsize"] == 10
+
+
+def test_blocking_pool_times_out_waiting_for_connection(base_url: str) -> None:
+    client = SyncClient(policies=[], pool_maxsize=1, pool_block=True, pool_timeout=0.05)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        slow = executor.submit(client.get, base_url + "/slow")
+        time.sleep(0.1)
+        with pytest.raises(TransportError) as exc_info:
+            client.get(base_url + "/")
+        slow.result()
+
+    assert "pool timeout" in str(exc_info.value)
+    stats = host_stats(client, base_url)
+    assert stats["acquire_timeouts"] == 1
+    assert stats["created"] == 1
+
+
+def test_non_blocking_pool_counts_discarded_connections(base_url: str) -> None:
+    client = SyncClient(policies=[], pool_maxsize=1)
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        list(executor.map(lambda _: client.get(base_url + "/slow"), range(3)))
+
+    stats = host_stats(client, base_url)
+    assert stats["created"] == 3
+    assert stats["discarded"] == 2
+    assert stats["idle"] == 1
+
+
+def test_urllib3_still_has_the_pool_hooks() -> None:
+    # the instrumented pools override these private urllib3 names: a rename
+    # upstream must fail here, not silently turn pool stats off
+    assert _missing_pool_hooks() == []
+
+
+def test_missing_pool_hooks_fall_back_to_plain_pools(base_url: str, monkeypatch, caplog) -> None:
+    monkeypatch.setattr(pool, "_POOL_HOOKS", pool._POOL_HOOKS + ("_renamed_upstream",))
+    with caplog.at_level(logging.WARNING, logger="relihttp"):
+        client = SyncClient(policies=[])
+    assert "_renamed_upstream" in caplog.text
+
+    assert client.get(base_url + "/").status_code == 200
+    assert client.pool_stats() == {}
@@ -3,9 +3,10 @@
 # @Author  : fzf
 # @FileName: test_ratelimit.py
 # @Software: PyCharm
+from relihttp.exceotions import TransportError
 from relihttp.utils import TokenBucket
-from relihttp.policies.rate_limit import RateLimitPolicy, RateLimitedError
-from relihttp.models import Context, Request
+from relihttp.policies.rate_limit import RateLimitPolicy, RateLimitedError, parse_rate_limit
+from relihttp.models import Context, Request, Response
 
 
 class FakeClock:
@@ -64,3 +65,91 @@ def test_ratelimit_policy_raise_mode_raises():
         assert False, "expected RateLimitedError"
     except RateLimitedError:
         pass
+
+
+def _with_headers(status, headers):
+    ctx = make_ctx()
+    ctx.response = Response(status_code=status, headers=headers, url="", elapsed_ms=0, content=b"")
+    return ctx
+
+
+def test_parse_rate_limit_headers():
+    assert parse_rate_limit({"RateLimit-Limit": "100, 100;w=60", "RateLimit-Remaining": "40",
+                             "RateLimit-Reset": "20"}) == (100.0, 40.0, 20.0)
+    quota = parse_rate_limit(
+        {"X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "1800000010"}, now=1_800_000_000.0
+    )
+    assert quota == (None, 5.0, 10.0)  # reset given as a Unix timestamp
+    assert parse_rate_limit({"X-RateLimit-Limit": "100"}) is None
+
+
+def test_adaptive_policy_follows_server_quota():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100.0, capacity=10.0, time_fn=clock.now)
+    policy = RateLimitPolicy(rate_limit=100.0, bucket=bucket, sleep_fn=clock.sleep, adaptive=True)
+
+    # 20 requests left for the next 10s: 2/s, and no more than 20 in hand
+    policy.after_response(_with_headers(200, {
+        "RateLimit-Limit": "600", "RateLimit-Remaining": "20", "RateLimit-Reset": "10"
+    }))
+    assert bucket.rate == 2.0
+    assert policy.stats() == {"rate": 2.0, "limit": 600.0, "remaining": 20.0, "reset": 10.0}
+
+    # quota spent: pause until the window resets
+    policy.after_response(_with_headers(200, {
+        "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "4"
+    }))
+    policy.before_request(make_ctx())
+    assert clock.t == 4.0
+
+
+def test_adaptive_policy_backs_off_on_429_error():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=50.0, capacity=50.0, time_fn=clock.now)
+    policy = RateLimitPolicy(
+        rate_limit=50.0, bucket=bucket, sleep_fn=clock.sleep, adaptive=True, max_rate=20.0
+    )
+    ctx = make_ctx()
+    ctx.error = TransportError("http error", status_code=429, headers={"Retry-After": "5"})
+    policy.after_response(ctx)
+    policy.before_request(make_ctx())
+    assert clock.t == 5.0
+
+    policy.after_response(_with_headers(200, {
+        "RateLimit-Remaining": "1000", "RateLimit-Reset": "10"
+    }))
+    assert bucket.rate == 20.0  # capped by max_rate
+
+    # not adaptive: headers are ignored
+    static = RateLimitPolicy(rate_limit=3.0)
+    static.after_response(_with_headers(200, {"RateLimit-Remaining": "1", "RateLimit-Reset": "1"}))
+    assert static.bucket.rate == 3.0
+
+
+def test_adaptive_policy_ignores_non_finite_and_clamps_far_resets():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10.0, capacity=10.0, time_fn=clock.now)
+    policy = RateLimitPolicy(
+        rate_limit=10.0, bucket=bucket, sleep_fn=clock.sleep, adaptive=True, max_reset=30.0
+    )
+    assert parse_rate_limit({"RateLimit-Remaining": "5", "RateLimit-Reset": "inf"}) is None
+    policy.after_response(_with_headers(200, {"RateLimit-Remaining": "nan", "RateLimit-Reset": "5"}))
+    ctx = make_ctx()
+    ctx.error = TransportError("http error", status_code=429, headers={"Retry-After": "inf"})
+    policy.after_response(ctx)
+    assert bucket.rate == 10.0
+
+    # a day-long Retry-After pauses for max_reset, not 24h
+    ctx.error = TransportError("http error", status_code=429, headers={"Retry-After": "86400"})
+    policy.after_response(ctx)
+    policy.before_request(make_ctx())
+    assert clock.t == 30.0
+
+
+def test_adaptive_rate_keeps_a_floor():
+    bucket = TokenBucket(rate=100.0, capacity=100.0)
+    policy = RateLimitPolicy(rate_limit=100.0, bucket=bucket, adaptive=True, min_rate=5.0)
+    policy.after_response(_with_headers(200, {"RateLimit-Remaining": "1", "RateLimit-Reset": "10"}))
+    assert bucket.rate == 5.0
+    # default floor: 0.1% of rate_limit
+    assert RateLimitPolicy(rate_limit=100.0).min_rate == 0.1
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 19:25
+# @Author  : fzf
+# @FileName: test_replay.py
+# @Software: PyCharm
+import asyncio
+import base64
+import time
+from typing import Iterator
+
+import pytest
+from multidict import CIMultiDict
+
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+from relihttp.exceotions import TransportError
+from relihttp.models import Context, Request, Response
+from relihttp.transport.base import Transport
+from relihttp.transport.replay import (
+    AsyncReplayTransport,
+    Cassette,
+    CassetteMissError,
+    RecordingTransport,
+    ReplayTransport,
+)
+from relihttp.transport.requests import RequestsTransport
+
+
+def _exchange(url: str, body: str, elapsed_ms: int = 0) -> dict:
+    return {
+        "method": "GET",
+        "url": url,
+        "body_sha256": "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855",
+        "elapsed_ms": elapsed_ms,
+        "status_code": 200,
+        "headers": {"Content-Type": "text/plain"},
+        "body_b64": base64.b64encode(body.encode()).decode(),
+    }
+
+
+def test_record_then_replay_without_network(base_url, tmp_path) -> None:
+    path = str(tmp_path / "cassette.jsonl")
+    recorder = SyncClient(
+        transport=RecordingTransport(RequestsTransport(), path),
+        max_retries=0,
+        raise_for_status=True,
+    )
+    assert recorder.get(base_url + "/items", params={"page": 2}).text == "ok"
+    # the stub server has no POST handler: the 501 response is recorded too
+    with pytest.raises(TransportError):
+        recorder.post(base_url + "/items", json={"sku": 1})
+
+    cassette = Cassette.load(path)
+    assert len(cassette) == 2
+    client = SyncClient(transport=ReplayTransport(cassette), max_retries=0, raise_for_status=True)
+
+    resp = client.get(base_url + "/items", params={"page": 2})
+    assert (resp.status_code, resp.text) == (200, "ok")
+    assert resp.headers["content-length"] == "2"
+    with pytest.raises(TransportError) as excinfo:
+        client.post(base_url + "/items", json={"sku": 1})
+    assert excinfo.value.status_code == 501
+
+    # a different body or query is a different exchange
+    with pytest.raises(CassetteMissError):
+        client.post(base_url + "/items", json={"sku": 2})
+    with pytest.raises(CassetteMissError):
+        client.get(base_url + "/items", params={"page": 3})
+
+
+def test_repeated_requests_replay_in_recorded_order() -> None:
+    cassette = Cassette([_exchange("https://example.com/n", "1"), _exchange("https://example.com/n", "2")])
+    client = SyncClient(transport=ReplayTransport(cassette))
+
+    assert [client.get("https://example.com/n").text for _ in range(5)] == ["1", "2", "1", "2", "1"]
+
+
+def test_async_replay_with_recorded_latency() -> None:
+    cassette = Cassette([_exchange("https://example.com/slow", "late", elapsed_ms=50)])
+
+    async def run() -> float:
+        client = AsyncClient(transport=AsyncReplayTransport(cassette, latency_scale=1.0))
+        start = time.perf_counter()
+        resp = await client.get("https://example.com/slow", stream=True)
+        assert await resp.aread() == b"late"
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) >= 0.045
+
+
+class CookieTransport(Transport):
+    def send(self, ctx: Context) -> Response:
+        headers = CIMultiDict([("Set-Cookie", "a=1"), ("Set-Cookie", "b=2"), ("Content-Type", "text/plain")])
+        return Response(status_code=200, headers=headers, url=ctx.request.url, elapsed_ms=0, content=b"ok")
+
+
+class BrokenStream:
+    def __init__(self) -> None:
+        self.closed = False
+
+    def iter_bytes(self, chunk_size: int) -> Iterator[bytes]:
+        raise ValueError("connection reset")
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class BrokenBodyTransport(Transport):
+    def __init__(self) -> None:
+        self.stream = BrokenStream()
+
+    def send(self, ctx: Context) -> Response:
+        return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, stream=self.stream)
+
+
+def test_repeated_headers_survive_the_cassette(tmp_path) -> None:
+    path = str(tmp_path / "cassette.jsonl")
+    recorder = RecordingTransport(CookieTransport(), path)
+    SyncClient(transport=recorder).get("https://example.com/login")
+    recorder.close()
+
+    client = SyncClient(transport=ReplayTransport(path))
+    resp = client.get("https://example.com/login")
+    assert [v for k, v in resp.headers.raw_items() if k == "Set-Cookie"] == ["a=1", "b=2"]
+    assert resp.headers["content-type"] == "text/plain"
+
+
+def test_failed_body_read_closes_the_response(tmp_path) -> None:
+    inner = BrokenBodyTransport()
+    recorder = RecordingTransport(inner, str(tmp_path / "cassette.jsonl"))
+    with pytest.raises(ValueError):
+        recorder.send(Context(request=Request(method="GET", url="https://example.com/items")))
+    assert inner.stream.closed
+    recorder.close()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 22:30
+# @Author  : fzf
+# @FileName: test_retry_after.py
+# @Software: PyCharm
+from email.utils import formatdate
+
+from relihttp.client.SyncClient import SyncClient
+from relihttp.exceotions import TransportError
+from relihttp.models import Context, Request, Response
+from relihttp.policies.retry import RetryPolicy
+from relihttp.transport.base import Transport
+from relihttp.utils import parse_retry_after
+
+
+def _ctx(**kwargs) -> Context:
+    return Context(request=Request(method="GET", url="https://example.com/"), **kwargs)
+
+
+def test_parse_retry_after_forms() -> None:
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(" 1.5 ") == 1.5
+    assert parse_retry_after("-3") == 0.0
+    now = 1_800_000_000.0
+    assert parse_retry_after(formatdate(now + 30, usegmt=True), now=now) == 30.0
+    assert parse_retry_after(formatdate(now - 30, usegmt=True), now=now) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_delay_honors_retry_after_on_errors_and_responses() -> None:
+    policy = RetryPolicy(base_delay=0.2, jitter=0.0, max_retry_after=10.0)
+    ctx = _ctx(attempt=1)
+    ctx.error = TransportError("http error", status_code=429, headers={"retry-after": "3"})
+    assert policy.get_retry_delay_seconds(ctx) == 3.0
+    assert ctx.tags["retry_after"] == 3.0
+
+    ctx.error = TransportError("http error", status_code=503, headers={"Retry-After": "3600"})
+    assert policy.get_retry_delay_seconds(ctx) == 10.0  # capped
+
+    ctx.error = None
+    ctx.response = Response(
+        status_code=503, headers={"Retry-After": "2"}, url="", elapsed_ms=0, content=b""
+    )
+    assert policy.get_retry_delay_seconds(ctx) == 2.0
+
+    # no header, or disabled: the usual backoff
+    ctx.response = Response(status_code=503, headers={}, url="", elapsed_ms=0, content=b"")
+    assert policy.get_retry_delay_seconds(ctx) == 0.2
+    ctx.response = Response(
+        status_code=503, headers={"Retry-After": "2"}, url="", elapsed_ms=0, content=b""
+    )
+    assert RetryPolicy(jitter=0.0, respect_retry_after=False).get_retry_delay_seconds(ctx) == 0.2
+
+
+def test_client_retries_after_server_hint() -> None:
+    class ThrottledOnce(Transport):
+        def __init__(self) -> None:
+            self.calls = 0
+
+        def send(self, ctx: Context) -> Response:
+            self.calls += 1
+            if self.calls == 1:
+                raise TransportError(
+                    "http error", status_code=429, headers={"Retry-After": "0"}
+                )
+            return Response(status_code=200, headers={}, url="", elapsed_ms=0, content=b"")
+
+    transport = ThrottledOnce()
+    client = SyncClient(transport=transport, policies=[RetryPolicy(base_delay=30.0)])
+    # would sleep 30s on the backoff; Retry-After says retry now
+    assert client.get("https://example.com/").status_code == 200
+    assert transport.calls == 2
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 22:05
+# @Author  : fzf
+# @FileName: test_retry_budget.py
+# @Software: PyCharm
+import logging
+from typing import List, Tuple
+
+import pytest
+
+from relihttp.client.SyncClient import SyncClient
+from relihttp.exceotions import TransportError
+from relihttp.models import Context, Request, Response
+from relihttp.policies.retry import RetryBudget, RetryPolicy
+from relihttp.transport.base import Transport
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FailingTransport(Transport):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def send(self, ctx: Context) -> Response:
+        self.calls += 1
+        raise TransportError("http error | 503", status_code=503)
+
+
+def _ctx(url: str = "https://a.example/") -> Context:
+    return Context(request=Request(method="GET", url=url))
+
+
+def _client(budget: RetryBudget, transport: Transport) -> SyncClient:
+    policy = RetryPolicy(base_delay=0.0, max_delay=0.0, jitter=0.0, budget=budget)
+    return SyncClient(transport=transport, max_retries=3, policies=[policy])
+
+
+def test_budget_caps_retries_at_ratio_plus_floor() -> None:
+    clock = FakeClock()
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, window=10.0, time_fn=clock)
+    for _ in range(4):
+        budget.record_request(_ctx())
+    assert [budget.try_retry(_ctx()) for _ in range(3)] == [True, True, False]
+    assert budget.stats() == {"*": {"requests": 4, "retries": 2, "exhausted": 1}}
+
+    # the floor alone allows min_per_second * window retries
+    floor = RetryBudget(ratio=0.0, min_per_second=0.2, window=10.0, time_fn=clock)
+    assert [floor.try_retry(_ctx()) for _ in range(3)] == [True, True, False]
+
+
+def test_window_slides() -> None:
+    clock = FakeClock()
+    budget = RetryBudget(ratio=1.0, min_per_second=0.0, window=10.0, time_fn=clock)
+    budget.record_request(_ctx())
+    assert budget.try_retry(_ctx())
+    clock.now = 5.0
+    budget.record_request(_ctx())
+    assert budget.try_retry(_ctx())
+    assert not budget.try_retry(_ctx())
+    clock.now = 10.5  # the first second's request and retry have expired
+    assert budget.stats()["*"]["requests"] == 1
+    assert not budget.try_retry(_ctx())
+    budget.record_request(_ctx())
+    assert budget.try_retry(_ctx())
+
+
+def test_per_host_budgets_are_independent() -> None:
+    budget = RetryBudget(ratio=1.0, min_per_second=0.0, per_host=True, time_fn=FakeClock())
+    budget.record_request(_ctx("https://a.example/"))
+    assert budget.try_retry(_ctx("https://a.example/x"))
+    assert not budget.try_retry(_ctx("https://a.example/x"))
+    assert not budget.try_retry(_ctx("https://b.example/"))
+    assert set(budget.stats()) == {"a.example", "b.example"}
+    with pytest.raises(ValueError):
+        RetryBudget(window=0)
+
+
+def test_exhausted_budget_stops_client_retries() -> None:
+    transport = FailingTransport()
+    budget = RetryBudget(ratio=0.5, min_per_second=0.0, time_fn=FakeClock())
+    client = _client(budget, transport)
+
+    for _ in range(4):
+        with pytest.raises(TransportError):
+            client.get("https://a.example/")
+    # 16 calls without a budget; with it, retries stay at half the first attempts
+    assert transport.calls == 4 + 2
+    assert budget.stats()["*"] == {"requests": 4, "retries": 2, "exhausted": 4}
+
+
+def test_budget_exhaustion_is_tagged() -> None:
+    budget = RetryBudget(ratio=0.0, min_per_second=0.0, time_fn=FakeClock())
+    policy = RetryPolicy(budget=budget)
+    ctx = _ctx()
+    ctx.max_retries = 3
+    ctx.attempt = 1
+    ctx.error = TransportError("http error | 503", status_code=503)
+    assert not policy.should_retry(ctx)
+    assert ctx.tags["retry_budget_exhausted"] is True
+    # a request that would not retry anyway does not touch the budget
+    ok = _ctx()
+    ok.max_retries = 3
+    ok.attempt = 1
+    ok.response = Response(status_code=200, headers={}, url="", elapsed_ms=0, content=b"")
+    assert not policy.should_retry(ok)
+    assert "retry_budget_exhausted" not in ok.tags
+    assert budget.stats()["*"] == {"requests": 2, "retries": 0, "exhausted": 1}
+
+
+def test_budget_exhaustion_is_logged_and_reported(caplog) -> None:
+    denied: List[Tuple[str, str]] = []
+    budget = RetryBudget(
+        ratio=0.0,
+        min_per_second=0.0,
+        per_host=True,
+        time_fn=FakeClock(),
+        on_exhausted=lambda ctx, key: denied.append((ctx.request_id, key)),
+    )
+    ctx = _ctx()
+    with caplog.at_level(logging.WARNING, logger="relihttp"):
+        assert not budget.try_retry(ctx)
+    assert denied == [(ctx.request_id, "a.example")]
+    (record,) = caplog.records
+    assert record.getMessage() == "http.retry_budget_exhausted"
+    assert record.budget_key == "a.example" and record.url == "https://a.example/"
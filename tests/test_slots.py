@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 21:45
+# @Author  : fzf
+# @FileName: test_slots.py
+# @Software: PyCharm
+import asyncio
+import threading
+from typing import List
+
+import pytest
+
+from relihttp.policies.slots import AsyncSlotQueue
+
+
+class Slots:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.used = size  # start full
+        self.lock = threading.Lock()
+        self.queue = AsyncSlotQueue(self.lock)
+
+    def take(self) -> bool:
+        if self.used >= self.size:
+            return False
+        self.used += 1
+        return True
+
+    def free(self) -> None:
+        with self.lock:
+            self.used -= 1
+            self.queue.hand_off(self.take)
+
+    async def acquire(self, timeout: float) -> None:
+        with self.lock:
+            waiter = self.queue.enqueue()
+        await self.queue.wait(waiter, timeout, lambda: TimeoutError("full"), self._release)
+
+    def _release(self) -> None:
+        self.used -= 1
+        self.queue.hand_off(self.take)
+
+
+def test_slots_are_handed_off_in_arrival_order() -> None:
+    slots = Slots(1)
+    order: List[int] = []
+
+    async def worker(i: int) -> None:
+        await slots.acquire(5.0)
+        order.append(i)
+
+    async def run() -> None:
+        tasks = [asyncio.ensure_future(worker(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        for _ in range(3):
+            slots.free()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == [0, 1, 2]
+    assert len(slots.queue) == 0
+
+
+def test_timeout_rejects_and_cancel_after_grant_gives_the_slot_back() -> None:
+    slots = Slots(1)
+
+    async def run() -> None:
+        with pytest.raises(TimeoutError, match="full"):
+            await slots.acquire(0.01)
+        assert len(slots.queue) == 0
+
+        # granted, but cancelled before it could resume: the slot moves on
+        first = asyncio.ensure_future(slots.acquire(5.0))
+        second = asyncio.ensure_future(slots.acquire(5.0))
+        await asyncio.sleep(0)
+        slots.free()
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        if not first.cancelled():
+            # some Python versions let a completed wait_for win over the cancel
+            slots.free()
+        await second
+        assert slots.used == 1 and len(slots.queue) == 0
+
+    asyncio.run(run())
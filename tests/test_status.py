@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 22:55
+# @Author  : fzf
+# @FileName: test_status.py
+# @Software: PyCharm
+import asyncio
+
+import pytest
+
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+from relihttp.exceotions import TransportError
+from relihttp.models import Context, Response
+from relihttp.policies.circuit import CircuitBreakerPolicy
+from relihttp.policies.retry import RetryPolicy
+from relihttp.transport.base import Transport
+
+
+class StatusTransport(Transport):
+    def __init__(self, *statuses: int) -> None:
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def send(self, ctx: Context) -> Response:
+        status = self.statuses[min(self.calls, len(self.statuses) - 1)]
+        self.calls += 1
+        return Response(
+            status_code=status, headers={"X-Reason": "busy"}, url=ctx.request.url, content=b"nope"
+        )
+
+
+def test_error_status_comes_back_as_response(base_url) -> None:
+    # the stub server has no POST handler
+    resp = SyncClient(policies=[]).post(base_url + "/", json={})
+    assert (resp.status_code, resp.ok) == (501, False)
+    assert resp.text  # the body is kept
+    with pytest.raises(TransportError) as excinfo:
+        resp.raise_for_status()
+    assert excinfo.value.status_code == 501
+    assert SyncClient(policies=[]).get(base_url + "/").raise_for_status().ok
+
+
+def test_policies_classify_responses_then_client_raises() -> None:
+    transport = StatusTransport(503, 503, 503)
+    breaker = CircuitBreakerPolicy(failure_threshold=3)
+    client = SyncClient(
+        transport=transport,
+        max_retries=3,
+        raise_for_status=True,
+        policies=[RetryPolicy(base_delay=0.0, jitter=0.0), breaker],
+    )
+    with pytest.raises(TransportError) as excinfo:
+        client.get("https://example.com/")
+    assert transport.calls == 3  # retried before raising
+    assert excinfo.value.status_code == 503
+    assert excinfo.value.headers["x-reason"] == "busy"
+    assert breaker.state == "open"
+
+    recovered = SyncClient(
+        transport=StatusTransport(503, 200),
+        raise_for_status=True,
+        policies=[RetryPolicy(base_delay=0.0, jitter=0.0)],
+    )
+    assert recovered.get("https://example.com/").status_code == 200
+
+
+def test_async_client_status_modes(base_url) -> None:
+    async def run() -> None:
+        async with AsyncClient(policies=[]) as client:
+            resp = await client.post(base_url + "/", json={})
+            assert resp.status_code == 501
+        async with AsyncClient(policies=[], raise_for_status=True) as client:
+            with pytest.raises(TransportError) as excinfo:
+                await client.post(base_url + "/", json={})
+            assert excinfo.value.status_code == 501
+            streamed = await client.get(base_url + "/", stream=True)
+            assert await streamed.aread() == b"ok"
+
+    asyncio.run(run())
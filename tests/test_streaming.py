@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 10:12
+# @Author  : fzf
+# @FileName: test_streaming.py
+# @Software: PyCharm
+import asyncio
+from typing import List
+
+from relihttp.client.AsyncClient import AsyncClient
+from relihttp.client.SyncClient import SyncClient
+from relihttp.models import Context, Response
+from relihttp.policies.base import Policy
+from relihttp.transport.async_base import AsyncTransport
+from relihttp.transport.base import Transport
+
+
+class FakeStream:
+    def __init__(self, chunks: List[bytes], fail_after: int = -1):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.closed = False
+
+    def iter_bytes(self, chunk_size: int):
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise ConnectionResetError("boom")
+            yield chunk
+
+    async def aiter_bytes(self, chunk_size: int):
+        for chunk in self.iter_bytes(chunk_size):
+            yield chunk
+
+    def close(self) -> None:
+        self.closed = True
+
+    async def aclose(self) -> None:
+        self.close()
+
+
+class StreamTransport(Transport):
+    def __init__(self, stream: FakeStream):
+        self.stream = stream
+
+    def send(self, ctx: Context) -> Response:
+        assert ctx.stream
+        return Response(
+            status_code=200,
+            headers={},
+            url=ctx.request.url,
+            elapsed_ms=1,
+            stream=self.stream,
+        )
+
+
+class AsyncStreamTransport(AsyncTransport):
+    def __init__(self, stream: FakeStream):
+        self.stream = stream
+
+    async def send(self, ctx: Context) -> Response:
+        return StreamTransport(self.stream).send(ctx)
+
+
+class RecordingPolicy(Policy):
+    def __init__(self) -> None:
+        self.events: List[tuple] = []
+
+    def after_response(self, ctx: Context) -> None:
+        self.events.append(("response", ctx.response.status_code))
+
+    def after_stream(self, ctx: Context) -> None:
+        self.events.append(("stream", ctx.tags["stream_bytes"], ctx.error))
+
+
+def test_stream_iter_lines_runs_after_stream_hook() -> None:
+    stream = FakeStream([b"a\nb", b"c\r\n", b"d"])
+    policy = RecordingPolicy()
+    client = SyncClient(transport=StreamTransport(stream), policies=[policy])
+
+    resp = client.get("https://example.com/export", stream=True)
+    assert policy.events == [("response", 200)]
+
+    assert list(resp.iter_lines()) == ["a", "bc", "d"]
+    assert stream.closed
+    assert policy.events[-1] == ("stream", 7, None)
+
+
+def test_stream_error_is_reported_to_policies() -> None:
+    stream = FakeStream([b"abc", b"def"], fail_after=1)
+    policy = RecordingPolicy()
+    client = SyncClient(transport=StreamTransport(stream), policies=[policy])
+
+    resp = client.get("https://example.com/export", stream=True)
+    try:
+        for _ in resp.iter_bytes():
+            pass
+        assert False, "expected ConnectionResetError"
+    except ConnectionResetError:
+        pass
+
+    kind, num_bytes, error = policy.events[-1]
+    assert kind == "stream" and num_bytes == 3
+    assert isinstance(error, ConnectionResetError)
+
+
+def test_stream_close_without_reading() -> None:
+    stream = FakeStream([b"abc"])
+    policy = RecordingPolicy()
+    client = SyncClient(transport=StreamTransport(stream), policies=[policy])
+
+    with client.get("https://example.com/export", stream=True) as resp:
+        pass
+    assert stream.closed
+    assert policy.events[-1] == ("stream", 0, None)
+    # closing twice must not re-run the hooks
+    resp.close()
+    assert len(policy.events) == 2
+
+
+def test_async_stream_aiter_bytes() -> None:
+    async def run() -> None:
+        stream = FakeStream([b"abc", b"def"])
+        policy = RecordingPolicy()
+        client = AsyncClient(transport=AsyncStreamTransport(stream), policies=[policy])
+
+        resp = await client.get("https://example.com/export", stream=True)
+        chunks = [chunk async for chunk in resp.aiter_bytes()]
+        assert chunks == [b"abc", b"def"]
+        assert stream.closed
+        assert policy.events[-1] == ("stream", 6, None)
+
+    asyncio.run(run())
+
+
+def test_read_loads_streamed_body_into_text() -> None:
+    stream = FakeStream([b"hello ", b"world"])
+    client = SyncClient(transport=StreamTransport(stream), policies=[])
+
+    resp = client.get("https://example.com/export", stream=True)
+    assert resp.read() == b"hello world"
+    assert resp.text == "hello world"
+    assert stream.closed
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# @Time    : 2026/10/17 15:05
+# @Author  : fzf
+# @FileName: test_thread_safety.py
+# @Software: PyCharm
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from relihttp.client.SyncClient import SyncClient
+from relihttp.exceotions import TransportError
+from relihttp.models import Context, Request, Response
+from relihttp.policies.circuit import CircuitBreakerPolicy, CircuitOpenError
+from relihttp.policies.idempotency import IdempotencyPolicy
+from relihttp.policies.rate_limit import RateLimitPolicy
+from relihttp.policies.retry import RetryPolicy
+from relihttp.policies.timeout import TimeoutPolicy
+from relihttp.policies.tracing import TracingPolicy
+from relihttp.transport.base import Transport
+
+THREADS = 64
+REQUESTS = 4000
+
+
+class RecordingTransport(Transport):
+    """Fails ~10% of attempts and records the headers each attempt carried."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.seen: List[tuple] = []
+
+    def send(self, ctx: Context) -> Response:
+        headers: Dict[str, str] = dict(ctx.request.headers)
+        with self.lock:
+            self.seen.append((ctx.request_id, headers))
+        if random.random() < 0.1:
+            raise TransportError("connection error", method=ctx.request.method, url=ctx.request.url)
+        return Response(status_code=200, headers={}, url=ctx.request.url, elapsed_ms=0, content=b"")
+
+
+def test_shared_client_under_64_threads() -> None:
+    transport = RecordingTransport()
+    circuit = CircuitBreakerPolicy(failure_threshold=1000, window_size=100, failure_ratio=0.9)
+    client = SyncClient(
+        headers={"User-Agent": "relihttp-test"},
+        transport=transport,
+        policies=[
+            TimeoutPolicy(timeout=1.0),
+            RetryPolicy(max_retries=3, retry="all", base_delay=0.0),
+            RateLimitPolicy(rate_limit=1_000_000),
+            circuit,
+            IdempotencyPolicy(),
+            TracingPolicy(trace_id_header="X-Trace-ID"),
+        ],
+    )
+
+    def call(i: int) -> None:
+        try:
+            client.post("https://example.com/items", json={"i": i}, headers={"X-Call": str(i)})
+        except TransportError:
+            pass
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        list(executor.map(call, range(REQUESTS)))
+
+    # client defaults were never written to by the policies
+    assert client.headers == {"User-Agent": "relihttp-test"}
+    assert circuit.state == "closed"
+
+    keys_by_request: Dict[str, set] = {}
+    for request_id, headers in transport.seen:
+        assert headers["X-Request-ID"] == request_id
+        assert headers["X-Trace-ID"] == request_id
+        assert headers["User-Agent"] == "relihttp-test"
+        keys_by_request.setdefault(request_id, set()).add(headers["Idempotency-Key"])
+
+    assert len(keys_by_request) == REQUESTS
+    # one key per logical request, reused across its retries, never shared
+    assert all(len(keys) == 1 for keys in keys_by_request.values())
+    all_keys = [next(iter(keys)) for keys in keys_by_request.values()]
+    assert len(set(all_keys)) == REQUESTS
+
+
+def test_half_open_admits_exactly_one_probe() -> None:
+    clock = [0.0]
+    policy = CircuitBreakerPolicy(failure_threshold=1, recovery_timeout=10.0, time_fn=lambda: clock[0])
+
+    ctx = Context(request=Request(method="GET", url="https://example.com"))
+    policy.before_request(ctx)
+    ctx.error = TransportError("boom")
+    policy.after_response(ctx)
+    assert policy.state == "open"
+
+    clock[0] = 10.0
+    barrier = threading.Barrier(THREADS)
+    admitted: List[Context] = []
+    lock = threading.Lock()
+
+    def probe() -> None:
+        c = Context(request=Request(method="GET", url="https://example.com"))
+        barrier.wait()
+        try:
+            policy.before_request(c)
+        except CircuitOpenError:
+            return
+        with lock:
+            admitted.append(c)
+
+    threads = [threading.Thread(target=probe) for _ in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(admitted) == 1
+    # a late result from a non-probe request must not close the circuit
+    late = Context(request=Request(method="GET", url="https://example.com"))
+    late.response = Response(status_code=200, headers={}, url="", elapsed_ms=0)
+    policy.after_response(late)
+    assert policy.state == "half_open"
+
+    admitted[0].response = Response(status_code=200, headers={}, url="", elapsed_ms=0)
+    policy.after_response(admitted[0])
+    assert policy.state == "closed"